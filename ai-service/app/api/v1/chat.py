@@ -1,6 +1,7 @@
 import json
 import logging
 import asyncio
+import time
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from app.services.memory_service import memory_service
@@ -33,84 +34,37 @@ async def chat(request: ChatRequest):
 
         if request.stream:
             async def event_generator():
-                # 1. Start with emotion detection (sequential but fast)
+                # Same graph as the non-streaming path: parallel context fetch,
+                # token streaming from generate_response, write-behind persistence.
+                start = time.perf_counter()
+                timings = {}
                 try:
-                    from app.services.brain.nodes.emotion import detect_emotion
-                    emotion_res = await detect_emotion(initial_state)
-                    detected_emotion = emotion_res.get("emotion", "neutral")
-                    yield f"data: {json.dumps({'emotion': detected_emotion})}\n\n"
-                except Exception as ex:
-                    logger.warning(f"Emotion detection failed: {ex}")
-                    detected_emotion = "neutral"
-
-                # 2. Setup the full context for generation
-                from app.services.brain.nodes.generate import session_history_window
-                from app.services.llm import llm_service
-                from app.services.persona import persona_engine
-                from app.services.settings_service import settings_service
-                from datetime import datetime
-                from uuid import UUID
-
-                # Fetch context
-                user_msg = request.message
-                history_model, memories, facts = await asyncio.gather(
-                    memory_service.get_history(UUID(conversation_id), session_history_window),
-                    memory_service.search(query=user_msg, limit=3),
-                    memory_service.get_long_term_memories(identity=request.identity or "anonymous", limit=5),
-                )
-                
-                # Build Persona
-                db_settings = settings_service.get_settings()
-                custom_sys = (db_settings.get("system_prompt") or "").strip()
-                persona = custom_sys if custom_sys else persona_engine.get_persona()
-                time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                system_content = (
-                    "You are AURA (Advanced Universal Responsive Avatar), steward of the ASE Lab.\n\n"
-                    f"{persona}\n\n"
-                    "IMPORTANT: Do NOT include bracketed emotions like [happy] or [sad] in your response content. "
-                    "I have already detected your emotion separately.\n\n"
-                    f"**Context:**\n- Current Time: {time_str}"
-                )
-                if facts: system_content += f"\nWhat I know about you:\n{facts}\n"
-                if memories:
-                    memory_block = "\n".join(f"- {m}" for m in memories)
-                    system_content += f"\nRelevant past snippets:\n{memory_block}\n"
+                    async for mode, chunk in brain.astream(initial_state, config=config, stream_mode=["updates", "custom"]):
+                        if mode == "custom":
+                            # {"text": ...} deltas and the reply's {"emotion": ...} tag
+                            yield f"data: {json.dumps(chunk)}\n\n"
+                            continue
 
-                messages_format = [{"role":"system", "content":system_content}] + history_model + [{"role":"user", "content":user_msg}]
-
-                import re
-                full_text = ""
-                # 3. Stream from the registry directly
-                from app.services.providers.base import TextDelta
-                async for chunk in llm_service.stream(messages_format):
-                    # Only yield incremental deltas to the dashboard
-                    if isinstance(chunk, TextDelta):
-                        txt = chunk.text
-                        full_text += txt
-                        yield f"data: {json.dumps({'text': txt})}\n\n"
-                    # StreamDone is handled silently for background persistence below
-
-                # 4. Final sync/persistence - SCRUBBED
-                scrubbed_final = re.sub(r'\[.*?\]', '', full_text).strip()
-                asyncio.create_task(memory_service.add_interaction(
-                    conversation_id=UUID(conversation_id),
-                    user_text=user_msg,
-                    assistant_text=scrubbed_final,
-                    user_emotion=detected_emotion,
-                    assistant_emotion="neutral"
-                ))
-                asyncio.create_task(memory_service.store(
-                    text=f"User: {user_msg} \n AURA: {scrubbed_final}",
-                    metadata={"conversation_id": str(conversation_id)}
-                ))
+                        for node, update in chunk.items():
+                            if not update:
+                                continue
+                            timings.update(update.get("timings", {}))
+                            if node == "detect_emotion":
+                                yield f"data: {json.dumps({'emotion': update.get('emotion', 'neutral')})}\n\n"
+                except Exception as ex:
+                    logger.error(f"Chat stream error: {ex}", exc_info=True)
+                    yield f"data: {json.dumps({'text': f'Brain Freeze: {str(ex)}', 'emotion': 'confused'})}\n\n"
 
+                timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+                yield f"data: {json.dumps({'timings': timings})}\n\n"
                 yield "data: [DONE]\n\n"
 
             return StreamingResponse(event_generator(), media_type="text/event-stream")
 
         # Non-streaming fallback
+        start = time.perf_counter()
         result = await brain.ainvoke(initial_state, config=config)
+        timings = {**result.get("timings", {}), "total": round((time.perf_counter() - start) * 1000, 1)}
         
         # Extract response
         last_msg = result["messages"][-1].content
@@ -130,7 +84,8 @@ async def chat(request: ChatRequest):
             text=last_msg,
             emotion=emotion,
             conversation_id=conversation_id,
-            tools_used=tools_used if tools_used else None
+            tools_used=tools_used if tools_used else None,
+            timings=timings,
         )
     
     except Exception as e:
@@ -1,7 +1,40 @@
 from fastapi import APIRouter
+from app.services.embedding_cache import embedding_cache
+from app.services.history_cache import history_cache
+from app.services.memory_compaction import memory_compactor
+from app.services.memory_service import memory_service
+from app.services.providers.registry import provider_registry
 
 router = APIRouter()
 
 @router.get("/")
 def health():
     return {"status": "ok"}
+
+@router.get("/cache")
+def cache_stats():
+    """Hit/miss counters for the shared caches."""
+    return {
+        "embeddings": embedding_cache.stats(),
+        "responses": provider_registry.responses.stats(),
+        "history": history_cache.stats(),
+        "memory_reads": memory_service.reads.stats(),
+    }
+
+@router.get("/writes")
+def write_queue_stats():
+    """Pending / flushed counts of the write-behind persistence queues."""
+    return {
+        "messages": memory_service.message_writes.stats(),
+        "memories": memory_service.memory_writes.stats(),
+    }
+
+@router.get("/compaction")
+def compaction_stats():
+    """Counters of the background memory compaction job."""
+    return memory_compactor.stats()
+
+@router.get("/providers")
+def provider_health():
+    """Circuit breaker state and rolling latency per LLM provider."""
+    return provider_registry.health()
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from app.services.extraction import extraction_engine
 from app.services.memory_service import memory_service
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-import io
 import logging
-from pypdf import PdfReader
+import os
+import tempfile
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -17,14 +18,17 @@ async def upload_memory(file: UploadFile = File(...)):
     content = await file.read()
     text = ""
 
-    # 1. Extract Text
-    if filename.endswith(".pdf"):
-        try:
-            pdf = PdfReader(io.BytesIO(content))
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid PDF: {str(e)}")
+    # 1. Extract Text (process pool, off the event loop)
+    suffix = os.path.splitext(filename)[1].lower()
+    if suffix in (".pdf", ".pptx"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"upload{suffix}")
+            with open(path, "wb") as f:
+                f.write(content)
+            try:
+                text = await extraction_engine.extract_text(path)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid {suffix[1:].upper()}: {str(e)}")
     else:
         # Assume text
         text = content.decode("utf-8")
@@ -39,22 +43,16 @@ async def upload_memory(file: UploadFile = File(...)):
     )
     chunks = splitter.split_text(text)
 
-    # 3. Store Vectors
-    count = 0
-    
-    for chunk in chunks:
-        await memory_service.store(
-            text=chunk,
-            metadata={"source": filename, "type": "document"}
-        )
-        count += 1
+    # 3. Store Vectors — batched embeddings + multi-row inserts
+    count = await memory_service.store_many(chunks, metadata={"source": filename, "type": "document"})
 
     return {"status": "success", "file": filename, "chunks_ingested": count}
 
 @router.get("/search")
-async def search_memory(query: str, limit: int = 3):
+async def search_memory(query: str, limit: int = 3, identity: str | None = None, conversation_id: str | None = None):
     """
-    Debug: Search Qdrant for context.
+    Debug: Search memories for context, as seen by this identity / conversation
+    (shared documents only when neither is given).
     """
-    results = await memory_service.search(query, limit)
+    results = await memory_service.search(query, limit, identity=identity, conversation_id=conversation_id)
     return {"query": query, "results": results}
@@ -1,34 +1,57 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
 from app.services.rag_service import rag_service, UPLOAD_DIR
+from app.core.config import settings
+from app.services.ingestion import ingestion_jobs
 import shutil
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def process_document_background(filepath):
+async def process_document_background(filepath, job):
     try:
-        logger.info(f"Starting background indexing for {filepath.name}...")
-        rag_service.add_document(filepath)
+        logger.info(f"Starting background indexing for {filepath.name} (job {job.id})...")
+        await rag_service.add_document(filepath, job)
     except Exception as e:
         logger.error(f"Background indexing failed for {filepath.name}: {e}")
 
 @router.post("/upload")
-async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def upload_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    incremental: bool | None = None,
+):
     try:
         filepath = UPLOAD_DIR / file.filename
         with open(filepath, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        # Dispatch processing to a background threadpool so the asyncio loop isn't blocked
-        background_tasks.add_task(process_document_background, filepath)
+        # Index after the response is sent; extraction runs in worker threads,
+        # embedding and inserts run as concurrent async calls
+        # incremental=false re-embeds every chunk without touching existing rows
+        if incremental is None:
+            incremental = settings.RAG_INCREMENTAL_INGEST
+        job = ingestion_jobs.create(file.filename, incremental=incremental)
+        background_tasks.add_task(process_document_background, filepath, job)
         
-        return {"status": "processing", "filename": file.filename, "message": "Document is being indexed in the background."}
+        return {
+            "status": "processing",
+            "filename": file.filename,
+            "job_id": job.id,
+            "message": "Document is being indexed in the background.",
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search")
-def search(q: str):
-    # def instead of async def pushes it to a threadpool, preventing synchronous embed_query from blocking the loop
-    results = rag_service.search(q)
+async def search(q: str):
+    # Embedding and the match_documents RPC are both awaited; nothing blocks the loop
+    results = await rag_service.search(q)
     return {"results": results}
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return job.to_dict()
@@ -38,6 +38,94 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str = ""
     VITE_SUPABASE_URL: str = ""
     VITE_SUPABASE_ANON_KEY: str = ""
+    # Shared async PostgREST connection pool (app/core/database.py)
+    SUPABASE_HTTP2: bool = True
+    SUPABASE_MAX_CONNECTIONS: int = 20
+    SUPABASE_MAX_KEEPALIVE: int = 10
+    SUPABASE_TIMEOUT: float = 10.0
+    # Identical concurrent memory reads share one request; results reused this many seconds
+    MEMORY_READ_TTL: float = 5.0
+    # Facts kept in each identity's consolidated long-term profile (most recently confirmed)
+    MEMORY_PROFILE_MAX_FACTS: int = 40
+
+    # In-process memory index (Supabase stays the durable store)
+    MEMORY_LOCAL_INDEX: bool = False
+    MEMORY_INDEX_NPROBE: int = 8
+    # MemoryService.store_many: texts per embed / insert request, batches in flight
+    MEMORY_STORE_BATCH: int = 100
+    MEMORY_STORE_CONCURRENCY: int = 4
+
+    # Write-behind persistence of chat messages + per-turn memories (journal dir "" = off)
+    MEMORY_WRITE_BEHIND: bool = True
+    MEMORY_WRITE_BATCH: int = 200
+    MEMORY_WRITE_INTERVAL: float = 1.0
+    MEMORY_WRITE_MAX_RETRIES: int = 5
+    MEMORY_WRITE_JOURNAL: str = ""
+
+    # Background compaction of per-turn memories (app/services/memory_compaction.py):
+    # near-duplicates (cosine >= SIMILARITY) merge into one row, rows whose
+    # importance = times seen × 0.5^(days since last seen / HALF_LIFE) falls below MIN_IMPORTANCE are dropped.
+    # Off by default (deletes are irreversible); needs sql/maintenance_leases.sql so only one worker runs a pass
+    MEMORY_COMPACTION: bool = False
+    MEMORY_COMPACT_INTERVAL: float = 21600.0
+    MEMORY_COMPACT_BATCH: int = 500
+    MEMORY_COMPACT_PAUSE: float = 1.0
+    MEMORY_COMPACT_SIMILARITY: float = 0.95
+    MEMORY_COMPACT_MAX_CLUSTERS: int = 2000
+    MEMORY_RETENTION_HALF_LIFE_DAYS: float = 30.0
+    MEMORY_RETENTION_MIN_IMPORTANCE: float = 0.1
+
+    # Hybrid retrieval: local BM25 index fused with vector results (memory + RAG search)
+    HYBRID_SEARCH: bool = False
+    HYBRID_CANDIDATES: int = 20
+    HYBRID_RRF_K: int = 10
+
+    # Conversation history: recent messages verbatim under a token budget, older ones summarized
+    HISTORY_TOKEN_BUDGET: int = 3000
+    HISTORY_MAX_MESSAGES: int = 40
+    HISTORY_FETCH_MESSAGES: int = 80
+    HISTORY_SUMMARY_BATCH: int = 6
+    HISTORY_SUMMARY_TOKENS: int = 300
+    # Recent messages cached per conversation (keep >= HISTORY_FETCH_MESSAGES), LRU across conversations
+    HISTORY_CACHE_MESSAGES: int = 100
+    HISTORY_CACHE_CONVERSATIONS: int = 500
+
+    # Embedding cache shared by memory + RAG (empty path = memory-only)
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PATH: str = ""
+
+    # Emotion detection: "lexicon" | "model" | "llm"
+    EMOTION_ENGINE: str = "lexicon"
+    EMOTION_MODEL_PATH: str = ""
+    EMOTION_MIN_CONFIDENCE: float = 0.5
+    EMOTION_LLM_FALLBACK: bool = False
+
+    # LLM routing: "ordered" (fallback chain) | "latency" (ranked + hedged)
+    LLM_ROUTING_MODE: str = "ordered"
+    LLM_HEDGE_MIN_DELAY: float = 0.5
+    LLM_HEDGE_MAX_DELAY: float = 4.0
+    # Circuit breaker: consecutive failed calls before a provider is skipped, and for how long
+    LLM_BREAKER_FAILURES: int = 3
+    LLM_BREAKER_COOLDOWN: float = 30.0
+    # Streaming: fail over when a provider sends nothing for this long (seconds)
+    LLM_STREAM_FIRST_TOKEN_TIMEOUT: float = 10.0
+    LLM_STREAM_STALL_TIMEOUT: float = 5.0
+    # Response cache for deterministic (temperature 0) calls
+    LLM_RESPONSE_CACHE: bool = False
+    LLM_RESPONSE_CACHE_SIZE: int = 1000
+    LLM_RESPONSE_CACHE_TTL: float = 3600.0
+
+    # RAG ingestion pipeline
+    RAG_EMBED_BATCH: int = 100
+    RAG_EMBED_CONCURRENCY: int = 4
+    RAG_INSERT_BATCH: int = 500
+    RAG_INGEST_QUEUE_SIZE: int = 8
+    # Re-uploads only embed new / changed chunks and delete stale ones
+    RAG_INCREMENTAL_INGEST: bool = True
+
+    # PDF / PPTX extraction pool: 0 workers = one per CPU, 1 = inline
+    EXTRACTION_WORKERS: int = 0
+    EXTRACTION_PAGES_PER_SHARD: int = 16
 
     class Config:
         env_file = str(ENV_PATH)
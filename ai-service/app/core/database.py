@@ -0,0 +1,34 @@
+"""
+Shared async Supabase client for this process.
+
+MemoryService, RAGService and SettingsService all use the one AsyncClient
+built here (aura_memory.create_async_client: a single pooled
+httpx.AsyncClient, HTTP/2 by default), so every query is
+`await ....execute()` and nothing blocks the event loop. Pool size and
+timeouts come from the SUPABASE_* settings. close_database() is awaited
+from the FastAPI lifespan on shutdown.
+"""
+from __future__ import annotations
+
+from aura_memory import close_async_client, create_async_client
+from supabase import AsyncClient
+
+from app.core.config import settings
+
+
+def create_database() -> AsyncClient | None:
+    return create_async_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_SERVICE_KEY,
+        http2=settings.SUPABASE_HTTP2,
+        max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+        max_keepalive=settings.SUPABASE_MAX_KEEPALIVE,
+        timeout=settings.SUPABASE_TIMEOUT,
+    )
+
+
+async def close_database() -> None:
+    await close_async_client(database)
+
+
+database = create_database()
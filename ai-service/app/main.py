@@ -1,8 +1,16 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import chat, health, memory, rag
 from app.api.v1 import settings as settings_router
 from app.core.config import settings
+from app.core.database import close_database
+from app.services.extraction import extraction_engine
+from app.services.history import history_manager
+from app.services.memory_compaction import memory_compactor
+from app.services.memory_service import memory_service
+from app.services.rag_service import rag_service
 import logging
 
 logging.basicConfig(
@@ -10,7 +18,30 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-app = FastAPI(title="AURA AI Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the local memory / BM25 indexes in the background so startup isn't delayed
+    warm_tasks = [
+        asyncio.create_task(memory_service.warm_local_index()),
+        asyncio.create_task(rag_service.warm_lexical_index()),
+        asyncio.create_task(asyncio.to_thread(history_manager.tokens.load)),
+    ]
+    # Flush anything journaled by a previous run that did not shut down cleanly
+    memory_service.message_writes.start()
+    memory_service.memory_writes.start()
+    # Periodic near-duplicate merge + retention of per-turn memories, in bounded batches
+    memory_compactor.start()
+    yield
+    for task in warm_tasks:
+        task.cancel()
+    await memory_compactor.aclose()
+    await memory_service.close()
+    await close_database()
+    extraction_engine.shutdown()
+
+
+app = FastAPI(title="AURA AI Service", lifespan=lifespan)
 
 # CORS Configuration
 origins = [
@@ -12,3 +12,4 @@ class ChatResponse(BaseModel):
     emotion: str = "neutral"
     conversation_id: Optional[str] = None
     tools_used: list[dict] | None = None
+    timings: dict[str, float] | None = None  # per-node latency in ms
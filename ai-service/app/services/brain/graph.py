@@ -1,20 +1,32 @@
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 
 from app.services.brain.state import BrainState
+from app.services.brain.timing import timed
 from app.services.brain.nodes.emotion import detect_emotion
+from app.services.brain.nodes.context import load_history, search_memories, load_facts
 from app.services.brain.nodes.generate import generate_response
 
+# Nodes that only depend on the incoming message — run concurrently
+FAN_OUT = {
+    "detect_emotion":  detect_emotion,
+    "load_history":    load_history,
+    "search_memories": search_memories,
+    "load_facts":      load_facts,
+}
+
 # Build Brain Graph
 workflow = StateGraph(BrainState)
 
 # Add nodes
-workflow.add_node("detect_emotion", detect_emotion)
-workflow.add_node("generate_response", generate_response)
+for name, node in FAN_OUT.items():
+    workflow.add_node(name, timed(name)(node))
+workflow.add_node("generate_response", timed("generate_response")(generate_response))
 
-# Add edges
-workflow.set_entry_point("detect_emotion")
-workflow.add_edge("detect_emotion", "generate_response")
+# Add edges: fan out from START, join before generation
+for name in FAN_OUT:
+    workflow.add_edge(START, name)
+workflow.add_edge(list(FAN_OUT), "generate_response")
 workflow.add_edge("generate_response", END)
 
 # Compile graph
-brain = workflow.compile()
\ No newline at end of file
+brain = workflow.compile()
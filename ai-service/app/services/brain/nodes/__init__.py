@@ -1,4 +1,5 @@
 from app.services.brain.nodes.emotion import detect_emotion
+from app.services.brain.nodes.context import load_history, search_memories, load_facts
 from app.services.brain.nodes.generate import generate_response
 
-__all__ = ["detect_emotion", "generate_response"]
\ No newline at end of file
+__all__ = ["detect_emotion", "load_history", "search_memories", "load_facts", "generate_response"]
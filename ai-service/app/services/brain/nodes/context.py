@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.brain.state import BrainState
+from app.services.history import history_manager
+from app.services.memory_service import memory_service
+
+
+def _user_message(state: BrainState) -> str:
+    messages = state.get("messages") or []
+    return messages[-1].content if messages else ""
+
+
+# Nodes fanned out in parallel with detect_emotion; generate_response joins them
+
+async def load_history(state: BrainState) -> dict:
+    raw_id = state.get("conversation_id") or ""
+    if not raw_id or raw_id == "default":
+        return {"history": [], "summary": "", "history_pending": []}
+    history = await memory_service.get_history(UUID(raw_id), settings.HISTORY_FETCH_MESSAGES)
+    window = history_manager.window(raw_id, history)
+    # Row ids stay on the pending messages (the summary boundary), not in the LLM payload
+    messages = [{"role": m["role"], "content": m["content"]} for m in window.messages]
+    return {"history": messages, "summary": window.summary, "history_pending": window.pending}
+
+
+async def search_memories(state: BrainState) -> dict:
+    memories = await memory_service.search(
+        query=_user_message(state), limit=3,
+        identity=state.get("identity", "anonymous"), conversation_id=state.get("conversation_id") or None,
+    )
+    return {"memories": memories}
+
+
+async def load_facts(state: BrainState) -> dict:
+    facts = await memory_service.get_long_term_memories(identity=state.get("identity", "anonymous"), limit=5)
+    return {"facts": facts}
@@ -1,19 +1,13 @@
 from app.services.brain.state import BrainState
-from app.services.llm import llm_service
+from app.services.emotion_classifier import emotion_classifier
 
-# Node to detect emotion 
+# Node to detect emotion
 async def detect_emotion(state: BrainState) -> dict:
     # Get last user message
-    last_message = state["messages"][-1].content 
-   
-    # Prompt LLM to detect emotion
-    prompt = f"""
-            Analyze emotion in this message: "{last_message}"
-            Respond with only the emotion in square brackets : [happy], [sad], [confused], [excited], [dizzy], [serious].
-    """
-    
-    # Call LLM to detect emotion
-    response = await llm_service.generate([{"role": "system", "content": prompt}])
+    last_message = state["messages"][-1].content
+
+    # Classify locally; the LLM is only a configurable fallback
+    emotion = await emotion_classifier.classify(last_message)
 
     # Return detected emotion
-    return {"emotion": response.get("emotion", "neutral").strip().lower()}
\ No newline at end of file
+    return {"emotion": emotion}
@@ -1,15 +1,22 @@
 import asyncio
 import concurrent.futures
 import logging
+import time
 
 from uuid import UUID
+from langgraph.config import get_stream_writer
 from app.services.brain.state import BrainState
 from app.services.llm import llm_service
 from app.services.prompter import prompter
 from app.services.memory_service import memory_service
+from app.services.history import history_manager
+from app.services.providers.base import TextDelta, StreamDone, parse_emotion
 from langchain_core.messages import AIMessage, HumanMessage
 
-session_history_window = 9999
+_MAX_TAG_LEN = 64   # give up waiting for "]" after this many chars
+
+# Strong refs for write-behind persistence tasks
+_background_tasks: set[asyncio.Task] = set()
 
 async def generate_response(state: BrainState) -> dict:
     """Async wrapper for the generation node."""
@@ -44,16 +51,13 @@ async def generate(state: BrainState) -> dict:
     else:
         user_message = ""
 
-    # Load History & Long-term memories
-    history_model, memories, facts = await asyncio.gather(
-        memory_service.get_history(conversation_id, session_history_window),
-        memory_service.search(query=user_message, limit=3),
-        memory_service.get_long_term_memories(identity=state.get("identity", "anonymous"), limit=5),
-    )
-
-    history = history_model
+    # History & long-term memories were fetched in parallel by the fan-out nodes
+    history = state.get("history") or []
+    summary = state.get("summary") or ""
+    memories = state.get("memories") or []
+    facts = state.get("facts") or ""
 
-    # Save User message IMMEDIATELY to DB so it persists even if AI fails or disconnects
+    # Queue the user message IMMEDIATELY so it persists even if AI fails or disconnects
     await memory_service.add_interaction(
         conversation_id=conversation_id,
         user_text=user_message,
@@ -64,7 +68,7 @@ async def generate(state: BrainState) -> dict:
 
     # System Prompt (Pulling from DB via settings_service)
     from app.services.settings_service import settings_service
-    db_settings = settings_service.get_settings()
+    db_settings = await settings_service.get_settings()
     custom_sys = (db_settings.get("system_prompt") or "").strip()
     
     from app.services.persona import persona_engine
@@ -90,34 +94,33 @@ async def generate(state: BrainState) -> dict:
 
     if combined_memory:
         system_content += f"\n\n**Memory Retrieval:**{combined_memory}"
+    if summary:
+        system_content += f"\n\n**Earlier in this conversation:**\n{summary}"
 
     system_message = {"role": "system", "content": system_content}
     
     # Build payload
     messages_format = [system_message] + history + current_message
 
-    # Check for stream request
-    is_stream = state.get("stream", False)
-
-    if is_stream:
-        # For streaming, we yield chunks. 
-        # But this is a node, so we return the final state but can use callbacks?
-        # Actually, chat.py will call brain.astream().
-        # We handle the stream here if we want to return the stream object, 
-        # but LangGraph nodes should return the update.
-        # So we update chat.py to use a different strategy.
-        pass
-
-    # Generate response from LLM
-    response = await llm_service.generate(messages_format)
-    text = response.get("text", "")
-    emotion = response.get("emotion", "neutral")
-    
-    await asyncio.gather(
-        # Complete the interaction in DB
+    # Generate response from LLM — token by token when the caller is streaming
+    llm_start = time.perf_counter()
+    timings = {}
+    if state.get("stream", False):
+        text, emotion, ttft = await _stream_tokens(messages_format)
+        if ttft is not None:
+            timings["ttft"] = round((ttft - llm_start) * 1000, 1)
+    else:
+        response = await llm_service.generate(messages_format)
+        text = response.get("text", "")
+        emotion = response.get("emotion", "neutral")
+    timings["llm"] = round((time.perf_counter() - llm_start) * 1000, 1)
+
+    # Write-behind: complete the interaction in DB without holding up the reply
+    # (the user message was already written above)
+    _in_background(asyncio.gather(
         memory_service.add_interaction(
             conversation_id=conversation_id,
-            user_text=user_message,
+            user_text=None,
             assistant_text=text,
             user_emotion=detected_emotion,
             assistant_emotion=emotion
@@ -125,9 +128,72 @@ async def generate(state: BrainState) -> dict:
 
         memory_service.store(
             text=f"User: {user_message} \n AURA: {text}",
-            metadata={"conversation_id": str(conversation_id)},
+            metadata={"conversation_id": str(conversation_id), "identity": state.get("identity", "anonymous")},
         ),
-    )
+    ))
+    # Off the hot path: fold turns that left the window into the rolling summary
+    history_manager.schedule_summary(raw_id, summary, state.get("history_pending") or [])
 
     # Return response
-    return {"messages": [AIMessage(content=text)], "emotion": emotion}
\ No newline at end of file
+    return {"messages": [AIMessage(content=text)], "emotion": emotion, "timings": timings}
+
+
+async def _stream_tokens(messages_format: list[dict]) -> tuple[str, str, float | None]:
+    """
+    Stream the registry's deltas to the graph's custom stream channel.
+    The leading [emotion] tag is held back and emitted as its own event,
+    mirroring what make_result does for the non-streaming path.
+    Returns (text, emotion, perf_counter time of the first delta).
+    """
+    writer = get_stream_writer()
+    pending = ""          # buffered text while we are still inside a leading tag
+    tag_resolved = False
+    emotion = "neutral"
+    text = ""
+    first_token_at = None
+
+    async for chunk in llm_service.stream(messages_format):
+        if isinstance(chunk, StreamDone):
+            break
+
+        if not isinstance(chunk, TextDelta):
+            continue
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+
+        if tag_resolved:
+            text += chunk.text
+            writer({"text": chunk.text})
+            continue
+
+        pending += chunk.text
+        stripped = pending.lstrip()
+        if not stripped:
+            continue
+        if stripped.startswith("[") and "]" not in stripped and len(stripped) < _MAX_TAG_LEN:
+            continue
+
+        tag_resolved = True
+        emotion, rest = parse_emotion(stripped)
+        if stripped.startswith("["):
+            writer({"emotion": emotion})
+        else:
+            rest = pending
+        text = rest
+        if rest:
+            writer({"text": rest})
+
+    if not tag_resolved and pending.strip():
+        # Stream ended while still buffering — flush whatever we held
+        emotion, text = parse_emotion(pending)
+        writer({"emotion": emotion})
+        if text:
+            writer({"text": text})
+
+    return text.strip(), emotion, first_token_at
+
+
+def _in_background(coro) -> None:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
@@ -3,9 +3,26 @@ from langchain_core.messages import BaseMessage
 
 import operator
 
+
+def merge_timings(left: dict, right: dict) -> dict:
+    """Reducer so parallel nodes can each report their own timing."""
+    return {**(left or {}), **(right or {})}
+
+
 # BrainState for conversation history and emotion tracking
 class BrainState(TypedDict):
     messages: Annotated[List[BaseMessage], operator.add]
     emotion: str
     conversation_id: str
-    identity: str
\ No newline at end of file
+    identity: str
+    stream: bool
+
+    # Context fetched in parallel before generation
+    history: List[dict]
+    summary: str                 # rolling summary of turns older than `history`
+    history_pending: List[dict]  # out of the window, waiting to be summarized
+    memories: List[str]
+    facts: str
+
+    # Per-node wall time in milliseconds
+    timings: Annotated[dict, merge_timings]
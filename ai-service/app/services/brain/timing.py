@@ -0,0 +1,15 @@
+import functools
+import time
+
+
+def timed(name: str):
+    """Wrap an async graph node so its wall time lands in state["timings"][name]."""
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(state):
+            start = time.perf_counter()
+            update = await node(state)
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+            return {**update, "timings": {**update.get("timings", {}), name: elapsed_ms}}
+        return wrapper
+    return decorator
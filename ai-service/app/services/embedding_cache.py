@@ -0,0 +1,232 @@
+"""
+Content-addressed embedding cache shared by MemoryService and RAGService.
+
+Two tiers:
+  1. A bounded in-memory LRU (OrderedDict) — hit costs a dict lookup.
+  2. An optional SQLite file (EMBEDDING_CACHE_PATH) — survives restarts, so
+     re-uploaded documents and common greetings are never re-embedded.
+
+Keys are sha256(model + text), so the same text embedded by a different model
+never collides. The provider prefix is dropped from the model name
+("openai/text-embedding-3-small" via OpenRouter is the same model as
+"text-embedding-3-small" direct), so both services share entries. Vectors
+are stored as raw float32 bytes.
+
+`CachedEmbeddings` wraps any LangChain `Embeddings` object and exposes the same
+embed_query / embed_documents (sync + async) methods, so services swap it in
+without touching call sites. The async methods check the memory tier on the
+event loop and run SQLite reads and writes in a worker thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(namespace: str, text: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 10_000, path: str | None = None):
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        # RAG ingestion runs in worker threads, chat runs on the event loop.
+        # Separate locks, so a memory lookup never waits behind a disk query.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+                self._db.commit()
+                logger.info(f"Embedding cache persisted at {path}")
+            except sqlite3.Error as e:
+                logger.error(f"Embedding cache disk tier disabled ({path}): {e}")
+                self._db = None
+
+    def get(self, key: str) -> list[float] | None:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: list[str]) -> list[list[float] | None]:
+        vectors = self._get_memory(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            self._fill_from_disk(keys, vectors, missing, self._read_disk([keys[i] for i in missing]))
+        return vectors
+
+    async def aget_many(self, keys: list[str]) -> list[list[float] | None]:
+        """get_many() with the SQLite lookup in a worker thread."""
+        vectors = self._get_memory(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            wanted = [keys[i] for i in missing]
+            found = await asyncio.to_thread(self._read_disk, wanted) if self._db is not None else {}
+            self._fill_from_disk(keys, vectors, missing, found)
+        return vectors
+
+    def put_many(self, items: list[tuple[str, list[float]]]) -> None:
+        if not items:
+            return
+        self._remember_many(items)
+        self._write_disk(items)
+
+    async def aput_many(self, items: list[tuple[str, list[float]]]) -> None:
+        """put_many() with the SQLite write in a worker thread; the memory tier is updated first."""
+        if not items:
+            return
+        self._remember_many(items)
+        if self._db is not None:
+            await asyncio.to_thread(self._write_disk, items)
+
+    def put(self, key: str, vector: list[float]) -> None:
+        self.put_many([(key, vector)])
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _get_memory(self, keys: list[str]) -> list[list[float] | None]:
+        vectors = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                vectors.append(vector)
+        return vectors
+
+    def _read_disk(self, keys: list[str]) -> dict[str, list[float]]:
+        if self._db is None:
+            return {}
+        found = {}
+        with self._db_lock:
+            for key in keys:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    found[key] = np.frombuffer(row[0], dtype=np.float32).tolist()
+        return found
+
+    def _fill_from_disk(self, keys, vectors, missing, found: dict[str, list[float]]) -> None:
+        with self._lock:
+            for i in missing:
+                vector = found.get(keys[i])
+                if vector is None:
+                    self.misses += 1
+                    continue
+                vectors[i] = vector
+                self._remember(keys[i], vector)
+                self.disk_hits += 1
+
+    def _write_disk(self, items: list[tuple[str, list[float]]]) -> None:
+        if self._db is None:
+            return
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        with self._db_lock:
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache disk write failed: {e}")
+
+    def _remember_many(self, items: list[tuple[str, list[float]]]) -> None:
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+class CachedEmbeddings:
+    """Drop-in wrapper around a LangChain Embeddings instance."""
+
+    def __init__(self, embeddings, cache: EmbeddingCache, namespace: str | None = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.namespace = namespace or getattr(embeddings, "model", "").rsplit("/", 1)[-1]
+
+    # ── Async ─────────────────────────────────────────────────────────────────
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = embedding_key(self.namespace, text)
+        [vector] = await self.cache.aget_many([key])
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self.cache.aput_many([(key, vector)])
+        return vector
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [embedding_key(self.namespace, t) for t in texts]
+        vectors = await self.cache.aget_many(keys)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await self.cache.aput_many(self._fill(keys, vectors, missing, fresh))
+        return vectors
+
+    # ── Sync ──────────────────────────────────────────────────────────────────
+
+    def embed_query(self, text: str) -> list[float]:
+        key = embedding_key(self.namespace, text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(key, vector)
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [embedding_key(self.namespace, t) for t in texts]
+        vectors = self.cache.get_many(keys)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self._fill(keys, vectors, missing, fresh))
+        return vectors
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _fill(keys, vectors, missing, fresh) -> list[tuple[str, list[float]]]:
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+        return [(keys[i], vectors[i]) for i in missing]
+
+
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_CACHE_SIZE,
+    path=settings.EMBEDDING_CACHE_PATH or None,
+)
@@ -0,0 +1,91 @@
+"""
+Emotion classification for the brain's detect_emotion node.
+
+Engines (EMOTION_ENGINE):
+  lexicon — keyword matching via app.system.emotion_mapper (default, ~µs)
+  model   — a small scikit-learn text pipeline loaded from EMOTION_MODEL_PATH
+            (joblib file exposing predict_proba / classes_), runs on CPU
+  llm     — the original provider round-trip
+
+When the local engine has no opinion, or its confidence is below
+EMOTION_MIN_CONFIDENCE, the LLM is consulted only if EMOTION_LLM_FALLBACK is on.
+Otherwise the local guess stands ("neutral" when there is none).
+"""
+from __future__ import annotations
+
+import logging
+
+from app.core.config import settings
+from app.system.emotion_mapper import emotion_mapper
+
+logger = logging.getLogger(__name__)
+
+class LexiconEngine:
+    name = "lexicon"
+
+    def classify(self, text: str) -> tuple[str | None, float]:
+        return emotion_mapper.classify(text)
+
+
+class SklearnEngine:
+    name = "model"
+
+    def __init__(self, path: str):
+        try:
+            import joblib
+        except ImportError:
+            raise RuntimeError("The 'model' emotion engine requires scikit-learn/joblib. Run: pip install scikit-learn")
+        self._model = joblib.load(path)
+        logger.info(f"[emotion] loaded classifier from {path}")
+
+    def classify(self, text: str) -> tuple[str | None, float]:
+        probs = self._model.predict_proba([text])[0]
+        best = int(probs.argmax())
+        return str(self._model.classes_[best]), float(probs[best])
+
+
+async def llm_classify(text: str) -> str:
+    """The original classification prompt — one full provider round-trip."""
+    from app.services.llm import llm_service
+
+    prompt = f"""
+            Analyze emotion in this message: "{text}"
+            Respond with only the emotion in square brackets : [happy], [sad], [confused], [excited], [dizzy], [serious].
+    """
+    # Temperature 0 keeps the label stable and makes repeats eligible for the response cache
+    response = await llm_service.generate([{"role": "system", "content": prompt}], temperature=0.0)
+    return response.get("emotion", "neutral").strip().lower()
+
+
+class EmotionClassifier:
+    def __init__(self):
+        self.engine = self._build_engine(settings.EMOTION_ENGINE.lower())
+
+    async def classify(self, text: str) -> str:
+        if self.engine is None:
+            return await llm_classify(text)
+
+        emotion, confidence = self.engine.classify(text)
+        if emotion and confidence >= settings.EMOTION_MIN_CONFIDENCE:
+            return emotion
+
+        if settings.EMOTION_LLM_FALLBACK:
+            return await llm_classify(text)
+        return emotion or "neutral"
+
+    @staticmethod
+    def _build_engine(name: str):
+        if name == "llm":
+            return None
+        if name == "model":
+            if settings.EMOTION_MODEL_PATH:
+                try:
+                    return SklearnEngine(settings.EMOTION_MODEL_PATH)
+                except Exception as e:
+                    logger.warning(f"[emotion] model engine unavailable, using lexicon: {e}")
+            else:
+                logger.warning("[emotion] EMOTION_MODEL_PATH not set, using lexicon")
+        return LexiconEngine()
+
+
+emotion_classifier = EmotionClassifier()
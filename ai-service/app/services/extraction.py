@@ -0,0 +1,137 @@
+"""
+Text extraction engine shared by the RAG and memory upload endpoints.
+
+pypdf page extraction is pure-Python and CPU-bound, so threads do not help.
+The engine splits a PDF into shards of EXTRACTION_PAGES_PER_SHARD pages and
+runs them in a ProcessPoolExecutor. It yields page texts back **in document
+order** while later shards are still being extracted. Only a few shards per
+worker are in flight at a time, so a slow consumer holds back extraction of
+a 1000-page book instead of buffering it.
+
+Page texts are yielded ready to concatenate: PDF pages and PPTX slides end
+with "\\n", and empty pages come through as "" so callers can count them.
+
+EXTRACTION_WORKERS: 0 = one per CPU, 1 = extract inline (no pool).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import pypdf
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TEXT_BLOCK = 64 * 1024   # plain-text files are read in blocks of this many chars
+_SHARDS_PER_WORKER = 2    # in-flight shards per worker (read-ahead bound)
+
+# Worker-side cache: consecutive shards of the same file reuse one parsed reader
+_reader: tuple[tuple[str, float], pypdf.PdfReader] | None = None
+
+
+# ── Worker functions (run in the pool, must be top-level / picklable) ─────────
+
+def _open_pdf(path: str) -> pypdf.PdfReader:
+    global _reader
+    key = (path, os.path.getmtime(path))
+    if _reader is None or _reader[0] != key:
+        _reader = (key, pypdf.PdfReader(path))
+    return _reader[1]
+
+
+def _extract_pdf_range(path: str, start: int, end: int) -> list[str]:
+    pdf = _open_pdf(path)
+    pages = []
+    for i in range(start, end):
+        extracted = pdf.pages[i].extract_text()
+        pages.append(extracted + "\n" if extracted else "")
+    return pages
+
+
+def _extract_pptx(path: str) -> list[str]:
+    from pptx import Presentation
+
+    slides = []
+    for slide in Presentation(path).slides:
+        texts = [shape.text for shape in slide.shapes if hasattr(shape, "text") and shape.text]
+        slides.append("\n".join(texts) + "\n" if texts else "")
+    return slides
+
+
+# ── Engine ────────────────────────────────────────────────────────────────────
+
+class ExtractionEngine:
+    def __init__(self, workers: int | None = None, pages_per_shard: int | None = None):
+        configured = settings.EXTRACTION_WORKERS if workers is None else workers
+        self.workers = configured or os.cpu_count() or 1
+        self.pages_per_shard = max(1, pages_per_shard or settings.EXTRACTION_PAGES_PER_SHARD)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _executor(self) -> ProcessPoolExecutor | None:
+        if self.workers <= 1:
+            return None
+        if self._pool is None:
+            # spawn, not fork: the service process has event-loop and client threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Extraction pool started ({self.workers} workers, {self.pages_per_shard} pages/shard)")
+        return self._pool
+
+    def iter_pages(self, path: Path | str) -> Iterator[str]:
+        """Blocking, ordered page iterator. Call it from a worker thread, not the event loop."""
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix == ".pdf":
+            yield from self._iter_pdf(str(path))
+        elif suffix == ".pptx":
+            pool = self._executor()
+            yield from (pool.submit(_extract_pptx, str(path)).result() if pool else _extract_pptx(str(path)))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield from iter(lambda: f.read(_TEXT_BLOCK), "")
+
+    def _iter_pdf(self, path: str) -> Iterator[str]:
+        total = len(pypdf.PdfReader(path).pages)
+        shards = ((start, min(start + self.pages_per_shard, total)) for start in range(0, total, self.pages_per_shard))
+
+        pool = self._executor()
+        if pool is None:
+            for start, end in shards:
+                yield from _extract_pdf_range(path, start, end)
+            return
+
+        window: deque[Future] = deque(
+            pool.submit(_extract_pdf_range, path, *shard)
+            for shard in islice(shards, self.workers * _SHARDS_PER_WORKER)
+        )
+        try:
+            while window:
+                pages = window.popleft().result()
+                for shard in islice(shards, 1):
+                    window.append(pool.submit(_extract_pdf_range, path, *shard))
+                yield from pages
+        finally:
+            for future in window:
+                future.cancel()
+
+    async def extract_text(self, path: Path | str) -> str:
+        """Whole-document text without blocking the event loop."""
+        return await asyncio.to_thread(lambda: "".join(self.iter_pages(path)))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+extraction_engine = ExtractionEngine()
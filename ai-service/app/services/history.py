@@ -0,0 +1,159 @@
+"""
+Conversation history window — recent turns verbatim, older turns summarized.
+
+Sending the whole conversation on every turn makes prompt size, cost and
+time-to-first-token grow without bound. The history manager keeps:
+
+  • a window of the most recent messages, newest first, that fits in
+    HISTORY_TOKEN_BUDGET (tiktoken count) and HISTORY_MAX_MESSAGES
+  • a rolling summary of everything older, kept per conversation
+
+The summary is refreshed after a reply has been sent (never on the hot
+path): messages that have fallen out of the window are folded into the
+previous summary with one LLM call. Until HISTORY_SUMMARY_BATCH such
+messages have piled up they stay in the prompt verbatim, so summarization
+runs every few turns rather than on each one and nothing is ever dropped
+without being summarized first.
+
+Each summary remembers the id of the last message folded into it, and the
+next window starts after that message. Ids, unlike content, are unique: a
+repeated "Okay!" cannot move the boundary.
+
+Summaries live in process memory (LRU by conversation). After a restart
+the first turn rebuilds one from the fetched history.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.services.llm import llm_service
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_OVERHEAD = 4        # tokens per chat message for role / separators
+_MAX_CONVERSATIONS = 1000
+
+_SUMMARY_PROMPT = (
+    "You keep a running summary of a conversation between a user and AURA. "
+    "Merge the new messages into the existing summary. Keep names, facts, preferences, "
+    "decisions and open questions; drop greetings and small talk. "
+    "Reply with the updated summary only, in at most {words} words."
+)
+
+
+class TokenCounter:
+    """tiktoken counts once the encoding is loaded; ~4 chars per token until then."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        self.encoding_name = encoding
+        self._encoding = None
+
+    def load(self) -> None:
+        # First use downloads the BPE file — call from a worker thread
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding {self.encoding_name} unavailable, estimating tokens: {e}")
+
+    def __call__(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+
+@dataclass
+class HistoryWindow:
+    messages: list[dict]                 # sent verbatim
+    summary: str = ""                    # older turns, already summarized
+    pending: list[dict] = field(default_factory=list)   # out of budget, not yet summarized
+
+
+@dataclass
+class _Summary:
+    text: str
+    marker: str | None                   # id of the last message folded into `text`
+
+
+class HistoryManager:
+    def __init__(
+        self,
+        summarize: Callable[[list[dict]], Awaitable[str]] | None = None,
+        count_tokens: Callable[[str], int] | None = None,
+    ):
+        self.tokens = count_tokens or TokenCounter()
+        self._summarize = summarize or _llm_summarize
+        self._summaries: OrderedDict[str, _Summary] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def message_tokens(self, message: dict) -> int:
+        return self.tokens(message["content"] or "") + _MESSAGE_OVERHEAD
+
+    def window(self, conversation_id: str, messages: list[dict]) -> HistoryWindow:
+        """Split fetched history (oldest first) into summary + pending + recent window."""
+        summary = self._summaries.get(conversation_id)
+        if summary is not None:
+            self._summaries.move_to_end(conversation_id)
+            ids = [m.get("id") for m in messages]
+            if summary.marker is not None and summary.marker in ids:
+                messages = messages[ids.index(summary.marker) + 1:]
+
+        budget = settings.HISTORY_TOKEN_BUDGET
+        keep = 0
+        for message in reversed(messages):
+            cost = self.message_tokens(message)
+            if keep >= settings.HISTORY_MAX_MESSAGES or (keep and cost > budget):
+                break
+            budget -= cost
+            keep += 1
+
+        split = len(messages) - keep
+        pending = messages[:split]
+        # Below a batch it is not worth a summary call yet — keep them verbatim for now
+        recent = messages if len(pending) < settings.HISTORY_SUMMARY_BATCH else messages[split:]
+        return HistoryWindow(messages=recent, summary=summary.text if summary else "", pending=pending)
+
+    def schedule_summary(self, conversation_id: str, summary: str, pending: list[dict]) -> asyncio.Task | None:
+        """Fold `pending` (from window()) into the rolling summary in the background."""
+        if len(pending) < settings.HISTORY_SUMMARY_BATCH or conversation_id in self._inflight:
+            return None
+        task = asyncio.ensure_future(self._update(conversation_id, summary, pending))
+        self._inflight[conversation_id] = task
+        task.add_done_callback(lambda _: self._inflight.pop(conversation_id, None))
+        return task
+
+    async def _update(self, conversation_id: str, previous: str, pending: list[dict]) -> None:
+        transcript = "\n".join(
+            f"{'AURA' if m['role'] == 'assistant' else 'User'}: {m['content']}" for m in pending
+        )
+        words = max(50, settings.HISTORY_SUMMARY_TOKENS * 3 // 4)
+        prompt = [
+            {"role": "system", "content": _SUMMARY_PROMPT.format(words=words)},
+            {"role": "user", "content": f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"},
+        ]
+        try:
+            text = (await self._summarize(prompt)).strip()
+        except Exception as e:
+            logger.error(f"History summary error for {conversation_id}: {e}")
+            return
+        if not text:
+            return
+
+        self._summaries[conversation_id] = _Summary(text=text, marker=pending[-1].get("id"))
+        self._summaries.move_to_end(conversation_id)
+        while len(self._summaries) > _MAX_CONVERSATIONS:
+            self._summaries.popitem(last=False)
+        logger.info(f"History summary for {conversation_id} now covers {len(pending)} more messages")
+
+
+async def _llm_summarize(prompt: list[dict]) -> str:
+    result = await llm_service.generate(prompt, temperature=0.2, max_tokens=settings.HISTORY_SUMMARY_TOKENS)
+    return result.get("text", "")
+
+
+history_manager = HistoryManager()
@@ -0,0 +1,117 @@
+"""
+Per-conversation history cache for MemoryService.get_history.
+
+Every chat turn reads the latest messages of its conversation, which this
+process wrote itself moments earlier. The cache keeps the newest
+HISTORY_CACHE_MESSAGES messages of each conversation in a ring buffer
+(deque with maxlen), LRU-bounded to HISTORY_CACHE_CONVERSATIONS:
+
+  • add_interaction appends to the ring of a cached conversation
+  • create_conversation starts an empty, complete ring — no read ever needed
+  • a miss hydrates the ring from the DB
+  • clear_conversation resets the ring to empty
+
+A ring is "complete" when it holds the whole conversation (hydrated with
+fewer rows than asked for, and nothing has rolled off since). Reads of up
+to len(ring) messages, or of any size from a complete ring, are hits.
+
+A hydrate that races with a write to the same conversation is dropped
+rather than cached, since the fetched rows may predate the write.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass
+class _Ring:
+    messages: deque
+    complete: bool
+
+
+class HistoryCache:
+    def __init__(self, max_conversations: int = 500, capacity: int = 100):
+        self.max_conversations = max_conversations
+        self.capacity = capacity
+        self._rings: OrderedDict[str, _Ring] = OrderedDict()
+        # conversation → [fetches in flight, writes seen since the first began]
+        self._fetching: dict[str, list[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, conversation_id: str, n: int) -> list[dict] | None:
+        ring = self._rings.get(conversation_id)
+        if ring is None or (len(ring.messages) < n and not ring.complete):
+            self.misses += 1
+            return None
+        self._rings.move_to_end(conversation_id)
+        self.hits += 1
+        messages = list(ring.messages)
+        return messages[-n:] if n < len(messages) else messages
+
+    def begin_fetch(self, conversation_id: str) -> int:
+        """Call before reading the DB on a miss; pass the result to fill()."""
+        state = self._fetching.setdefault(conversation_id, [0, 0])
+        state[0] += 1
+        return state[1]
+
+    def fill(self, conversation_id: str, stamp: int, messages: list[dict] | None, complete: bool = False) -> None:
+        """End a fetch begun with begin_fetch(); `messages` None means the read failed."""
+        state = self._fetching[conversation_id]
+        state[0] -= 1
+        if not state[0]:
+            del self._fetching[conversation_id]
+        if messages is None or state[1] != stamp:
+            return                      # failed, or written to while we were reading
+        ring = _Ring(deque(messages[-self.capacity:], maxlen=self.capacity), complete and len(messages) <= self.capacity)
+        self._put(conversation_id, ring)
+
+    def start(self, conversation_id: str) -> None:
+        """A brand-new (or just cleared) conversation: empty and complete."""
+        self._touch(conversation_id)
+        self._put(conversation_id, _Ring(deque(maxlen=self.capacity), complete=True))
+
+    def append(self, conversation_id: str, messages: list[dict]) -> None:
+        self._touch(conversation_id)
+        ring = self._rings.get(conversation_id)
+        if ring is None:
+            return
+        for message in messages:
+            if len(ring.messages) == self.capacity:
+                ring.complete = False   # the oldest message rolls off
+            ring.messages.append(message)
+
+    def invalidate(self, conversation_id: str) -> None:
+        self._touch(conversation_id)
+        self._rings.pop(conversation_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "conversations": len(self._rings),
+            "max_conversations": self.max_conversations,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _touch(self, conversation_id: str) -> None:
+        state = self._fetching.get(conversation_id)
+        if state is not None:
+            state[1] += 1
+
+    def _put(self, conversation_id: str, ring: _Ring) -> None:
+        self._rings[conversation_id] = ring
+        self._rings.move_to_end(conversation_id)
+        while len(self._rings) > self.max_conversations:
+            self._rings.popitem(last=False)
+
+
+history_cache = HistoryCache(
+    max_conversations=settings.HISTORY_CACHE_CONVERSATIONS,
+    capacity=settings.HISTORY_CACHE_MESSAGES,
+)
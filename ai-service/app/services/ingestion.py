@@ -0,0 +1,147 @@
+"""
+Document ingestion support — incremental splitting and job progress.
+
+RAGService.add_document runs a staged pipeline:
+
+  pages (worker thread) → IncrementalSplitter → bounded queue
+      → N concurrent embedding workers → bounded queue → batched inserts
+
+Every stage talks through a bounded asyncio.Queue, so a slow embedding API
+or database stalls extraction instead of letting chunks pile up in memory.
+Progress is tracked on an IngestionJob and served by GET /api/v1/rag/jobs/{id}.
+
+Incremental mode: every chunk row carries metadata.chunk_hash. Before a
+re-upload, the rows already stored for the source are loaded into a
+SourceManifest. Chunks whose hash is already present are skipped. Only new
+or changed chunks are embedded and inserted, and rows the new version no
+longer contains are deleted at the end.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+_MAX_JOBS = 100   # finished jobs kept for polling
+
+
+class IncrementalSplitter:
+    """
+    Feeds page text through a LangChain text splitter without ever holding the
+    whole document. Text is buffered until it reaches `flush_at` characters,
+    split, and every chunk except the last is emitted. The last chunk is carried
+    over so a sentence crossing a page boundary still lands in one chunk.
+    """
+
+    def __init__(self, splitter, flush_at: int = 8000):
+        self.splitter = splitter
+        self.flush_at = flush_at
+        self._buffer: list[str] = []
+        self._size = 0
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size < self.flush_at:
+            return []
+
+        chunks = self.splitter.split_text("".join(self._buffer))
+        if len(chunks) < 2:
+            return []
+        tail = chunks[-1]
+        self._buffer = [tail]
+        self._size = len(tail)
+        return chunks[:-1]
+
+    def flush(self) -> list[str]:
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._size = 0
+        return self.splitter.split_text(text) if text.strip() else []
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SourceManifest:
+    """The chunk hashes already indexed for one source, and the row ids that hold them."""
+
+    def __init__(self, rows: list[dict]):
+        self._ids: dict[str, list] = {}
+        self._legacy: list = []      # rows indexed before chunk hashing existed
+        for row in rows:
+            digest = (row.get("metadata") or {}).get("chunk_hash")
+            if digest:
+                self._ids.setdefault(digest, []).append(row["id"])
+            else:
+                self._legacy.append(row["id"])
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids.values()) + len(self._legacy)
+
+    def claim(self, digest: str) -> bool:
+        """True if an indexed row already holds this chunk (that row is kept)."""
+        ids = self._ids.get(digest)
+        if not ids:
+            return False
+        ids.pop()
+        return True
+
+    def stale_ids(self) -> list:
+        """Rows no chunk of the new version claimed."""
+        return [i for ids in self._ids.values() for i in ids] + self._legacy
+
+
+@dataclass
+class IngestionJob:
+    source: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"        # queued | running | done | failed
+    incremental: bool = True
+    pages: int = 0
+    chunks: int = 0               # produced by the splitter so far
+    embedded: int = 0
+    inserted: int = 0
+    failed: int = 0               # chunks dropped by a failed embed / insert batch
+    unchanged: int = 0            # incremental: chunks already indexed, skipped
+    deleted: int = 0              # incremental: stale rows removed
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    def finish(self) -> None:
+        self.status = "done"
+        self.finished_at = time.time()
+
+    def fail(self, error: str) -> None:
+        self.status = "failed"
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        end = self.finished_at or time.time()
+        data["elapsed_s"] = round(end - self.created_at, 2)
+        return data
+
+
+class JobStore:
+    def __init__(self, max_jobs: int = _MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+
+    def create(self, source: str, incremental: bool = True) -> IngestionJob:
+        job = IngestionJob(source=source, incremental=incremental)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> IngestionJob | None:
+        return self._jobs.get(job_id)
+
+
+ingestion_jobs = JobStore()
@@ -0,0 +1,165 @@
+"""
+Compact in-process BM25 index, fused with vector search by reciprocal rank fusion.
+
+Vector search alone misses exact names, course codes and Japanese terms:
+a query for "ASE-3012" embeds close to every other course description. BM25
+matches the literal token. The services run both and merge the two rankings
+with RRF (score = Σ 1 / (k + rank)), which needs no score calibration
+between the two retrievers.
+
+Storage is kept compact for large corpora:
+  • postings are per-term `array('I')` doc ids + `array('H')` term frequencies,
+    scored through zero-copy NumPy views
+  • document lengths are one `array('I')`
+  • only row ids are stored — the caller keeps the text in Supabase
+
+Deletes are tombstones and the index compacts itself once half the slots
+are dead.
+
+Tokenization: lowercase alphanumeric runs for Latin text; CJK runs (no
+spaces) become overlapping character bigrams, so 東京大学 matches 東京.
+"""
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from typing import Hashable, Iterable
+
+import numpy as np
+
+_WORD = re.compile(r"[0-9a-z]+|[぀-ヿ㐀-䶿一-鿿가-힯ｦ-ﾟ]+")
+_CJK = re.compile(r"[^0-9a-z]")
+_TF_MAX = 65535
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    for run in _WORD.findall(text.lower()):
+        if _CJK.match(run):
+            tokens.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._keys: list[Hashable | None] = []        # slot → key (None = deleted)
+        self._slots: dict[Hashable, int] = {}         # key → slot
+        self._lengths = array("I")
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def add(self, key: Hashable, text: str) -> None:
+        if key in self._slots:
+            self.remove(key)
+
+        slot = len(self._keys)
+        counts: dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+
+        for token, tf in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array("I"), array("H"))
+            postings[0].append(slot)
+            postings[1].append(min(tf, _TF_MAX))
+
+        length = sum(counts.values())
+        self._keys.append(key)
+        self._slots[key] = slot
+        self._lengths.append(length)
+        self._total_length += length
+
+    def add_many(self, items: Iterable[tuple[Hashable, str]]) -> None:
+        for key, text in items:
+            self.add(key, text)
+
+    def remove(self, key: Hashable) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        self._keys[slot] = None
+        self._total_length -= self._lengths[slot]
+        self._deleted += 1
+        if self._deleted > len(self._slots):
+            self._compact()
+
+    def search(self, query: str, k: int = 10) -> list[tuple[Hashable, float]]:
+        """Top-k (key, score) by BM25, best first. Documents sharing no term are not returned."""
+        n_docs = len(self._slots)
+        if not n_docs or k <= 0:
+            return []
+
+        avg_length = self._total_length / n_docs or 1.0
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        scores = np.zeros(len(self._keys), dtype=np.float32)
+
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            slots = np.frombuffer(postings[0], dtype=np.uint32)
+            tf = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+            df = len(slots)   # tombstones included — close enough, fixed on compaction
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm[slots])
+
+        hits = np.flatnonzero(scores > 0)
+        hits = hits[[self._keys[i] is not None for i in hits]] if self._deleted else hits
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self._keys[i], float(scores[i])) for i in hits]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by postings and lengths (excluding dict / key overhead)."""
+        postings = sum(ids.itemsize * len(ids) + tf.itemsize * len(tf) for ids, tf in self._postings.values())
+        return postings + self._lengths.itemsize * len(self._lengths)
+
+    def _compact(self) -> None:
+        remap = array("i", [-1]) * len(self._keys)
+        keys, lengths = [], array("I")
+        for slot, key in enumerate(self._keys):
+            if key is not None:
+                remap[slot] = len(keys)
+                keys.append(key)
+                lengths.append(self._lengths[slot])
+
+        postings: dict[str, tuple[array, array]] = {}
+        for token, (ids, tfs) in self._postings.items():
+            new_ids, new_tfs = array("I"), array("H")
+            for slot, tf in zip(ids, tfs):
+                if remap[slot] >= 0:
+                    new_ids.append(remap[slot])
+                    new_tfs.append(tf)
+            if new_ids:
+                postings[token] = (new_ids, new_tfs)
+
+        self._keys = keys
+        self._slots = {key: slot for slot, key in enumerate(keys)}
+        self._lengths = lengths
+        self._postings = postings
+        self._deleted = 0
+
+
+def rrf_fuse(*rankings: list, k: int = 60, limit: int | None = None) -> list:
+    """Reciprocal rank fusion of several best-first key lists."""
+    scores: dict = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit is not None else fused
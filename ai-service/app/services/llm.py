@@ -18,12 +18,14 @@ class LLMService:
         model: str | None = None,
         temperature: float | None = None,
         max_tokens: int | None = None,
+        cache: bool | None = None,
     ) -> dict:
         return await provider_registry.generate(
             messages,
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
+            cache=cache,
         )
 
     def stream(self, *args, **kwargs):
@@ -0,0 +1,280 @@
+"""
+Background compaction of per-turn memories.
+
+Every chat turn stores "User: ... AURA: ..." as one embedded row, so
+`memories` grows forever and fills up with near-duplicates ("hi" /
+"hello"). MemoryCompactor walks the table in MEMORY_COMPACT_BATCH-row
+pages (oldest first, keyset-paged on created_at, id; pausing
+MEMORY_COMPACT_PAUSE seconds between pages) every MEMORY_COMPACT_INTERVAL
+seconds:
+
+  1. Cluster — within each search partition (partitioned_index), a row whose
+     embedding is within MEMORY_COMPACT_SIMILARITY cosine of an earlier
+     row's is a near-duplicate. Earlier rows are the cluster representatives,
+     kept in one small VectorIndex per partition for the pass (at most
+     MEMORY_COMPACT_MAX_CLUSTERS each, oldest evicted first).
+  2. Merge — the duplicate is deleted; the representative keeps its text
+     and records metadata.merged (times seen) and metadata.last_seen.
+  3. Retain — importance = merged × 0.5^(days since last_seen /
+     MEMORY_RETENTION_HALF_LIFE_DAYS). Rows below
+     MEMORY_RETENTION_MIN_IMPORTANCE (0 = never) are deleted, so a one-off
+     remark fades after a few months while recurring topics stay.
+
+Only per-turn memories are touched: uploaded documents and rows with a
+metadata.type (facts, profiles, session pointers) are never compacted.
+Deletes are mirrored into the service's local indexes.
+
+Deletes cannot be undone, so compaction is off unless MEMORY_COMPACTION is
+set. With several uvicorn workers (or replicas) each process runs the loop,
+but a pass only starts after taking the `memory_compaction` lease through
+the try_maintenance_lease RPC (sql/maintenance_leases.sql), and renews it
+before every further page, so a pass longer than the lease TTL is never
+joined by a second worker; if the lease is lost mid-pass the pass stops.
+If the RPC is missing, no pass runs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.services.memory_service import MemoryService, _parse_embedding, memory_service
+from app.services.partitioned_index import memory_partition
+from app.services.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+_UPDATE_CONCURRENCY = 8
+_LEASE = "memory_compaction"
+
+
+def _timestamp(value) -> datetime:
+    """created_at / last_seen as an aware datetime; unparsable values count as now (kept)."""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return datetime.now(timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def importance(merged: int, last_seen: datetime, now: datetime) -> float:
+    days = max(0.0, (now - last_seen).total_seconds() / 86400)
+    return merged * 0.5 ** (days / settings.MEMORY_RETENTION_HALF_LIFE_DAYS)
+
+
+class _Clusters:
+    """Representatives of one partition during a pass, FIFO-bounded."""
+
+    def __init__(self, limit: int):
+        self.index = VectorIndex(train_threshold=max(limit + 1, 4096))
+        self.limit = limit
+        self.order: deque = deque()
+
+    def nearest(self, vector: list[float]) -> tuple[float, dict] | None:
+        if not len(self.index) or self.index.dim != len(vector):
+            return None
+        _, score, state = self.index.search(vector, 1)[0]
+        return score, state
+
+    def add(self, vector: list[float], state: dict) -> None:
+        self.index.add(state["id"], vector, state)
+        self.order.append(state["id"])
+        while len(self.order) > self.limit:
+            self.index.remove(self.order.popleft())
+
+    def remove(self, row_id) -> None:
+        self.index.remove(row_id)
+
+
+class MemoryCompactor:
+    def __init__(self, memory: MemoryService):
+        self.memory = memory
+        self._worker: asyncio.Task | None = None
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.passes = 0
+        self.skipped = 0
+        self.scanned = 0
+        self.merged = 0
+        self.expired = 0
+        self.last_pass_seconds: float | None = None
+
+    def start(self) -> None:
+        """Start the periodic compaction loop (idempotent; needs a running event loop)."""
+        if not settings.MEMORY_COMPACTION or not self.memory.client:
+            return
+        if self._worker is not None and not self._worker.done():
+            return
+        self._worker = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "passes": self.passes,
+            "skipped": self.skipped,
+            "scanned": self.scanned,
+            "merged": self.merged,
+            "expired": self.expired,
+            "last_pass_seconds": self.last_pass_seconds,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.compact_if_leader()
+            except Exception as e:
+                logger.error(f"Memory compaction error: {e}")
+            await asyncio.sleep(settings.MEMORY_COMPACT_INTERVAL)
+
+    async def compact_if_leader(self) -> dict | None:
+        """Run a pass only if this process holds the lease; None when another worker does."""
+        if not await self._acquire_lease():
+            self.skipped += 1
+            return None
+        return await self.compact(renew=self._acquire_lease)
+
+    async def _acquire_lease(self) -> bool:
+        # Lasts one interval; the holder renews it per page and at its next pass, anyone may take it once it lapses
+        try:
+            result = await self.memory.client.rpc("try_maintenance_lease", {
+                "lease_name": _LEASE,
+                "lease_holder": self.holder,
+                "ttl_seconds": int(settings.MEMORY_COMPACT_INTERVAL),
+            }).execute()
+        except Exception as e:
+            logger.warning(f"Memory compaction skipped, lease unavailable (apply sql/maintenance_leases.sql): {e}")
+            return False
+        return result.data is True
+
+    # ── One pass ──────────────────────────────────────────────────────────────
+
+    async def compact(self, renew: Callable[[], Awaitable[bool]] | None = None) -> dict:
+        """
+        One full pass over the per-turn memories, batch by batch. Returns this
+        pass's counts. `renew` is awaited before every page after the first;
+        the pass stops when it returns False.
+        """
+        start = time.perf_counter()
+        clusters: dict[str, _Clusters] = {}
+        counts = {"scanned": 0, "merged": 0, "expired": 0}
+        cursor, boundary = None, set()
+        while True:
+            rows = await self._load_batch(cursor, boundary)
+            if not rows:
+                break
+            # Keyset on (created_at, id): rows at the last timestamp already seen are excluded next page
+            last = rows[-1]["created_at"]
+            if last != cursor:
+                cursor, boundary = last, set()
+            boundary.update(row["id"] for row in rows if row["created_at"] == last)
+            merged, expired = await self._compact_batch(rows, clusters)
+            counts["scanned"] += len(rows)
+            counts["merged"] += merged
+            counts["expired"] += expired
+            if len(rows) < settings.MEMORY_COMPACT_BATCH:
+                break
+            await asyncio.sleep(settings.MEMORY_COMPACT_PAUSE)
+            if renew is not None and not await renew():
+                logger.warning("Memory compaction: lease lost mid-pass, stopping")
+                break
+
+        self.passes += 1
+        self.scanned += counts["scanned"]
+        self.merged += counts["merged"]
+        self.expired += counts["expired"]
+        self.last_pass_seconds = round(time.perf_counter() - start, 3)
+        logger.info(f"Memory compaction: scanned {counts['scanned']}, merged {counts['merged']}, "
+                    f"expired {counts['expired']} in {self.last_pass_seconds}s")
+        return counts
+
+    async def _load_batch(self, cursor: str | None, boundary: set) -> list[dict]:
+        query = self.memory.client.table("memories") \
+            .select("id, content, metadata, embedding, created_at") \
+            .is_("metadata->>type", "null") \
+            .not_.is_("embedding", "null")
+        if cursor is not None:
+            query = query.gte("created_at", cursor).not_.in_("id", list(boundary))
+        result = await query.order("created_at").order("id").limit(settings.MEMORY_COMPACT_BATCH).execute()
+        return result.data or []
+
+    async def _compact_batch(self, rows: list[dict], clusters: dict[str, _Clusters]) -> tuple[int, int]:
+        now = datetime.now(timezone.utc)
+        duplicates: list = []
+        touched: dict = {}       # representative id → state, metadata to write back
+        fresh: list[dict] = []   # representatives created in this batch
+
+        for row in rows:
+            vector = _parse_embedding(row["embedding"])
+            metadata = row.get("metadata") or {}
+            partition = memory_partition(metadata)
+            state = {
+                "id": row["id"],
+                "partition": partition,
+                "metadata": metadata,
+                "merged": int(metadata.get("merged", 1)),
+                "last_seen": _timestamp(metadata.get("last_seen") or row.get("created_at")),
+            }
+            group = clusters.setdefault(partition, _Clusters(settings.MEMORY_COMPACT_MAX_CLUSTERS))
+            nearest = group.nearest(vector)
+            if nearest is not None and nearest[0] >= settings.MEMORY_COMPACT_SIMILARITY:
+                keeper = nearest[1]
+                keeper["merged"] += state["merged"]
+                keeper["last_seen"] = max(keeper["last_seen"], state["last_seen"])
+                touched[keeper["id"]] = keeper
+                duplicates.append(row["id"])
+            elif group.index.dim in (None, len(vector)):
+                group.add(vector, state)
+                fresh.append(state)
+            # else: embedded by a different model than the partition so far; left alone
+
+        expired = []
+        if settings.MEMORY_RETENTION_MIN_IMPORTANCE > 0:
+            candidates = {state["id"]: state for state in fresh}
+            candidates.update(touched)
+            for state in candidates.values():
+                if importance(state["merged"], state["last_seen"], now) < settings.MEMORY_RETENTION_MIN_IMPORTANCE:
+                    expired.append(state["id"])
+                    clusters[state["partition"]].remove(state["id"])
+                    touched.pop(state["id"], None)
+
+        await self._write_back(list(touched.values()))
+        await self._delete(duplicates + expired)
+        return len(duplicates), len(expired)
+
+    async def _write_back(self, states: list[dict]) -> None:
+        limit = asyncio.Semaphore(_UPDATE_CONCURRENCY)
+
+        async def update(state: dict) -> None:
+            metadata = {**state["metadata"], "merged": state["merged"], "last_seen": state["last_seen"].isoformat()}
+            async with limit:
+                await self.memory.client.table("memories").update({"metadata": metadata}).eq("id", state["id"]).execute()
+            state["metadata"] = metadata
+
+        await asyncio.gather(*(update(state) for state in states))
+
+    async def _delete(self, ids: list) -> None:
+        if not ids:
+            return
+        await self.memory.client.table("memories").delete().in_("id", ids).execute()
+        for index in (self.memory.index, self.memory._index_loading, self.memory.lexical, self.memory._lexical_loading):
+            if index is not None:
+                for row_id in ids:
+                    index.remove(row_id)
+
+
+memory_compactor = MemoryCompactor(memory_service)
@@ -1,22 +1,54 @@
 """
 Memory service using Supabase pgvector for semantic search.
 Replaces the previous Qdrant-based implementation — zero Docker containers needed.
+
+Conversation, message and long-term-fact queries come from the shared
+aura_memory.MemoryStore (also used by the voice agent); this subclass adds
+embeddings, the local vector / BM25 indexes, the history ring cache and
+write-behind persistence.
+
+Memory search is scoped to the caller: rows are partitioned by
+metadata.identity (older rows by conversation_id, documents shared), both
+in the local indexes (one shard per partition) and in pgvector
+(`match_memories_partitioned`, sql/memory_partitions.sql).
 """
 from __future__ import annotations
 from typing import List
+import asyncio
+import json
 import urllib.request
-from supabase import create_client
+from pathlib import Path
+from uuid import uuid4
+from aura_memory import MemoryStore, chat_message
 from langchain_openai import OpenAIEmbeddings
 from app.core.config import settings
+from app.core.database import database
+from app.services.lexical_index import rrf_fuse
+from app.services.partitioned_index import (
+    PartitionedBM25Index, PartitionedVectorIndex, memory_partition, search_partitions,
+)
+from app.services.embedding_cache import CachedEmbeddings, embedding_cache
+from app.services.history_cache import history_cache
+from app.services.write_behind import WriteBehindQueue
 from uuid import UUID
 
-
-from app.models.database import (Conversation, CreateConversation, Message, CreateMesssage, Memory, CreateMemory)
-
 import logging
 
 logger = logging.getLogger(__name__)
 
+_WARM_LOAD_PAGE = 1000
+# match_memories fallback ranks every user's rows; over-fetch before the partition filter
+_FALLBACK_OVERFETCH = 4
+
+
+def _parse_embedding(raw) -> list[float] | None:
+    """pgvector columns come back from PostgREST as a '[0.1,0.2,...]' string."""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return json.loads(raw)
+    return list(raw)
+
 
 def _ollama_is_running(base_url: str) -> bool:
     """Return True if an Ollama server is reachable at base_url."""
@@ -26,14 +58,41 @@ def _ollama_is_running(base_url: str) -> bool:
     except Exception:
         return False
 
-class MemoryService:
+
+class MemoryService(MemoryStore):
     def __init__(self):
-        self.client = None
+        # Shared async Supabase client (one pooled connection set for all services)
+        super().__init__(database, read_ttl=settings.MEMORY_READ_TTL, profile_max_facts=settings.MEMORY_PROFILE_MAX_FACTS)
         self.embeddings = None
-
-        # Initialize Supabase client
-        if settings.SUPABASE_URL and settings.SUPABASE_SERVICE_KEY:
-            self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        self.history = history_cache
+
+        # Write-behind queues for chat messages and per-turn memories
+        journal = Path(settings.MEMORY_WRITE_JOURNAL) if settings.MEMORY_WRITE_JOURNAL else None
+        self.message_writes = WriteBehindQueue(
+            "messages", self.write_messages,
+            max_batch=settings.MEMORY_WRITE_BATCH,
+            interval=settings.MEMORY_WRITE_INTERVAL,
+            max_retries=settings.MEMORY_WRITE_MAX_RETRIES,
+            journal=journal / "messages.jsonl" if journal else None,
+        )
+        self.memory_writes = WriteBehindQueue(
+            "memories", self._write_memories,
+            max_batch=settings.MEMORY_STORE_BATCH,
+            interval=settings.MEMORY_WRITE_INTERVAL,
+            max_retries=settings.MEMORY_WRITE_MAX_RETRIES,
+            journal=journal / "memories.jsonl" if journal else None,
+        )
+
+        # Optional in-process ANN index, one shard per partition; None until warm_local_index() completes
+        self.index: PartitionedVectorIndex | None = None
+        self._index_loading: PartitionedVectorIndex | None = None
+        # Optional BM25 index for hybrid search (HYBRID_SEARCH); same sharding and lifecycle
+        self.lexical: PartitionedBM25Index | None = None
+        self._lexical_loading: PartitionedBM25Index | None = None
+        # False once match_memories_partitioned is found missing (sql/memory_partitions.sql not applied)
+        self.partitioned_rpc = True
+
+        if self.client:
             logger.info("Memory Service connected to Supabase")
         else:
             logger.warning("Supabase credentials not set. Memory service disabled.")
@@ -69,199 +128,328 @@ class MemoryService:
                 "Memory store/search disabled."
             )
 
-    async def create_conversation(self, title: str = "New Conversation") -> UUID | None:
-        if not self.client:
-            return None
-        
-        try:
-            result = self.client.table("conversations").insert(
-                CreateConversation(title=title).model_dump()
-            ).execute()
+        if self.embeddings:
+            self.embeddings = CachedEmbeddings(self.embeddings, embedding_cache)
 
-            if result.data:
-                return UUID(result.data[0]["id"])
-            else:
-                return None
-        
-        except Exception as error:
-            logger.error(f"Memory Service Create Conversation Error: {error}")
-            return None
-    
-    async def get_conversation(self, conversation_id: UUID) -> Conversation | None:
-        if not self.client:
-            return None
-        
-        try:
-            result = self.client.table("conversations") \
-                .select("*") \
-                .eq("id", str(conversation_id)) \
-                .single() \
-                .execute()
-            
-            if result.data:
-                return Conversation(**result.data)
-            else:
-                return None
-        
-        except Exception as error:
-            logger.error(f"Memory Service Get Conversation Error: {error}")
-            return None
-    
-    async def add_interaction(self, conversation_id: UUID, user_text: str, assistant_text: str | None, user_emotion: str = "neutral", assistant_emotion: str = "neutral") -> None:
+    async def create_conversation(self, title: str = "New Conversation") -> UUID | None:
+        conversation_id = await super().create_conversation(title)
+        if conversation_id:
+            self.history.start(str(conversation_id))
+        return conversation_id
+
+    async def add_interaction(self, conversation_id: UUID, user_text: str | None, assistant_text: str | None, user_emotion: str = "neutral", assistant_emotion: str = "neutral") -> None:
+        """
+        Persist one or both sides of a turn. With MEMORY_WRITE_BEHIND the rows
+        are queued and this returns at once; the history cache sees them immediately.
+        """
         if not self.client:
             return None
 
-        try:
-            msgs = []
-            if user_text:
-                msgs.append(CreateMesssage(
-                    conversation_id=conversation_id,
-                    role="user",
-                    content=user_text,
-                    emotion=user_emotion,
-                ).model_dump(mode="json"))
-
-            if assistant_text:
-                msgs.append(CreateMesssage(
-                    conversation_id=conversation_id,
-                    role="aura",
-                    content=assistant_text,
-                    emotion=assistant_emotion
-                ).model_dump(mode="json"))
-            
-            if msgs:
-                self.client.table("messages").insert(msgs).execute() 
-
-            self.client.table("conversations") \
-                .update({"updated_at": "now()"}) \
-                .eq("id", str(conversation_id)) \
-                .execute()
-
-        except Exception as error:
-            logger.error(f"Memory Service Add Interaction Error: {error}")
-
-    async def get_history(self, conversation_id: UUID, n: int = 30) -> List[Message]:
+        msgs = self.message_rows(conversation_id, user_text, assistant_text, user_emotion, assistant_emotion)
+        if settings.MEMORY_WRITE_BEHIND:
+            for msg in msgs:
+                self.message_writes.put(msg)
+            self.reads.invalidate(("history", str(conversation_id)))
+        else:
+            try:
+                await self.write_messages(msgs)
+            except Exception as error:
+                logger.error(f"Memory Service Add Interaction Error: {error}")
+                return
+        self.history.append(str(conversation_id), [chat_message(m) for m in msgs])
+
+    async def get_history(self, conversation_id: UUID, n: int = 30) -> List[dict]:
         if not self.client or n <= 0:
             return []     
-        
+
+        key = str(conversation_id)
+        cached = self.history.get(key, n)
+        if cached is not None:
+            return cached
+
+        stamp = self.history.begin_fetch(key)
+        history = None
+        # Rows still in the write-behind queue are not in the DB yet. Taken before
+        # and after the read, so a batch committed meanwhile is in one or the other.
+        queued = self._queued_messages(key)
+        complete = False
         try:
-            result = self.client.table("messages") \
-                        .select("role, content, emotion, created_at") \
-                        .eq("conversation_id", str(conversation_id)) \
-                        .order("created_at", desc=True) \
-                        .limit(n) \
-                        .execute()
-            
-            rows = result.data or []
-            rows.reverse()
-            
-            return [{"role": "assistant" if row["role"] == "aura" else row["role"], "content": row["content"]} for row in rows]
-        
+            fetched = await self.fetch_history(conversation_id, n)
+            queued += self._queued_messages(key)
+            complete = len(fetched) < n and not queued
+            seen = {m["id"] for m in fetched}
+            history = fetched + [m for m in {m["id"]: m for m in queued}.values() if m["id"] not in seen]
+            history = history[-n:]
+            return history
         except Exception as error:
             logger.error(f"Memory Service Get History Error : {error}")
             return []
-    
-    async def get_last_n_message(self, conversation_id: UUID, n: int) -> List[Message]:
-        if not self.client or n <= 0:
-            return []     
-        
-        try:
-            result = self.client.table("messages") \
-                .select("id, role, content, emotion, created_at") \
-                .eq("conversation_id", str(conversation_id)) \
-                .order("created_at", desc=True) \
-                .limit(n) \
-                .execute()
-
-            rows = result.data or []
-            rows.reverse()
-            return rows
-        
-        except Exception as error:
-            logger.error(f"Memory Service Get Last N Message Error: {error}")
-            return []
+        finally:
+            self.history.fill(key, stamp, history, complete=complete)
+
+    def _queued_messages(self, conversation_id: str) -> list[dict]:
+        return [
+            chat_message(row) for row in self.message_writes.pending()
+            if row["conversation_id"] == conversation_id
+        ]
+
+    async def clear_conversation(self, conversation_id: UUID) -> bool:
+        cleared = await super().clear_conversation(conversation_id)
+        if cleared:
+            self.history.start(str(conversation_id))
+        else:
+            self.history.invalidate(str(conversation_id))
+        return cleared
 
-    async def get_summary(self, conversation_id: UUID, n: int = 20) -> List[Message]:
-        return await self.get_last_n_message(conversation_id, n)
+    async def _write_memories(self, items: list[dict]) -> None:
+        await self._insert_memories([(item["content"], item["metadata"]) for item in items], ids=[item["id"] for item in items])
 
-    async def clear_conversation(self, conversation_id: UUID) -> None:
-        if not self.client:
-            return []
+    async def flush_writes(self) -> None:
+        await asyncio.gather(self.message_writes.flush(), self.memory_writes.flush())
 
-        try:
-            self.client.table("messages") \
-                .delete() \
-                .eq("conversation_id", str(conversation_id)) \
-                .execute()
+    async def close(self) -> None:
+        """Flush and stop the write-behind queues (lifespan shutdown)."""
+        await asyncio.gather(self.message_writes.aclose(), self.memory_writes.aclose())
 
-            logger.info(f"Memory Service: Conversation {conversation_id} Cleared.")
-
-        except Exception as error:
-            logger.error(f"Memory Service Clear Conversation Error: {error}")           
-            
     async def store(self, text: str, metadata: dict = None):
-        """Embed and store a memory in Supabase pgvector."""
+        """Embed and store a memory in Supabase pgvector (queued with MEMORY_WRITE_BEHIND)."""
         if not self.client or not self.embeddings or not text.strip():
             return
 
+        if settings.MEMORY_WRITE_BEHIND:
+            self.memory_writes.put({"id": str(uuid4()), "content": text, "metadata": metadata or {}})
+            return
+
         try:
             vector = await self.embeddings.aembed_query(text)
 
-            self.client.table("memories").insert({
+            result = await self.client.table("memories").insert({
                 "content": text,
                 "embedding": vector,
                 "metadata": metadata or {},
             }).execute()
 
+            if result.data:
+                self._index_rows([result.data[0]["id"]], [vector], [text], [metadata or {}])
+
             logger.info(f"Stored memory: {text[:40]}...")
         except Exception as e:
             logger.error(f"Memory store error: {e}")
 
-    async def search(self, query: str, limit: int = 3) -> list[str]:
-        """Retrieve relevant memories via cosine similarity."""
+    async def store_many(self, texts: list[str], metadata: dict | list[dict] | None = None) -> int:
+        """
+        Bulk store. Texts are embedded with one aembed_documents call per
+        MEMORY_STORE_BATCH and inserted as one multi-row request per batch,
+        with at most MEMORY_STORE_CONCURRENCY batches in flight.
+        `metadata` is shared by every text, or given per text as a list.
+        Returns the number of memories stored.
+        """
+        if not self.client or not self.embeddings:
+            return 0
+
+        metadatas = metadata if isinstance(metadata, list) else [metadata] * len(texts)
+        items = [(text, meta or {}) for text, meta in zip(texts, metadatas) if text.strip()]
+        size = max(1, settings.MEMORY_STORE_BATCH)
+        limit = asyncio.Semaphore(max(1, settings.MEMORY_STORE_CONCURRENCY))
+
+        async def store_batch(batch: list[tuple[str, dict]]) -> int:
+            async with limit:
+                try:
+                    return await self._insert_memories(batch)
+                except Exception as e:
+                    logger.error(f"Memory store_many batch error ({len(batch)} items): {e}")
+                    return 0
+
+        stored = sum(await asyncio.gather(*(
+            store_batch(items[i:i + size]) for i in range(0, len(items), size)
+        )))
+        logger.info(f"Stored {stored}/{len(items)} memories in bulk")
+        return stored
+
+    async def _insert_memories(self, batch: list[tuple[str, dict]], ids: list[str] | None = None) -> int:
+        """
+        Embed and insert one batch with a single request each; raises on failure.
+        With client-side `ids` the insert skips rows that already exist (journal replay).
+        """
+        contents = [text for text, _ in batch]
+        vectors = await self.embeddings.aembed_documents(contents)
+        rows = [
+            {"content": text, "embedding": vector, "metadata": meta}
+            for (text, meta), vector in zip(batch, vectors)
+        ]
+        if ids is None:
+            query = self.client.table("memories").insert(rows)
+        else:
+            for row, row_id in zip(rows, ids):
+                row["id"] = row_id
+            query = self.client.table("memories").upsert(rows, on_conflict="id", ignore_duplicates=True)
+        result = await query.execute()
+
+        # Rows come back in insert order (only the new ones for an upsert)
+        vector_of = dict(zip(contents, vectors))
+        inserted = result.data or []
+        self._index_rows([row["id"] for row in inserted], [vector_of[row["content"]] for row in inserted],
+                         [row["content"] for row in inserted], [row.get("metadata") for row in inserted])
+        return len(rows)
+
+    def _index_rows(self, ids: list, vectors: list, texts: list[str], metadatas: list[dict | None]) -> None:
+        """Keep the local indexes in sync (including ones that are still warming up)."""
+        if not ids:
+            return
+        partitions = [memory_partition(meta) for meta in metadatas]
+        for index in (self.index, self._index_loading):
+            if index is not None:
+                index.add_many(partitions, ids, vectors, texts)
+        for lexical in (self.lexical, self._lexical_loading):
+            if lexical is not None:
+                lexical.add_many(partitions, zip(ids, texts))
+
+    async def search(
+        self, query: str, limit: int = 3, identity: str | None = None, conversation_id: str | None = None,
+    ) -> list[str]:
+        """
+        Retrieve relevant memories via cosine similarity, from this identity's
+        and conversation's partitions plus shared documents only. Once the BM25
+        index is loaded, the top HYBRID_CANDIDATES of both retrievers are merged
+        by reciprocal rank fusion, so exact names and codes are not lost.
+        """
         if not self.client or not self.embeddings:
             return []
 
+        partitions = search_partitions(identity, str(conversation_id) if conversation_id else None)
         try:
             vector = await self.embeddings.aembed_query(query)
+            hybrid = self.lexical is not None and len(self.lexical) > 0
+            candidates = max(limit, settings.HYBRID_CANDIDATES) if hybrid else limit
 
-            # Use Supabase RPC for pgvector similarity search
-            result = self.client.rpc("match_memories", {
-                "query_embedding": vector,
-                "match_count": limit,
-            }).execute()
-
-            return [row["content"] for row in (result.data or [])]
+            if self.index is not None and len(self.index) and self.index.dim == len(vector):
+                hits = [(key, content) for key, _, content in self.index.search(partitions, vector, candidates)]
+            else:
+                rows = await self._match_rows(vector, candidates, partitions)
+                hits = [(row.get("id", row["content"]), row["content"]) for row in rows]
+
+            if not hybrid:
+                return [content for _, content in hits[:limit]]
+
+            # One BM25 ranking per shard: scores from different shards are not on one scale
+            lexical = self.lexical.rankings(partitions, query, candidates)
+            fused = rrf_fuse([key for key, _ in hits], *lexical, k=settings.HYBRID_RRF_K, limit=limit)
+            contents = dict(hits)
+            missing = [key for key in fused if key not in contents]
+            if missing:
+                rows = await self.client.table("memories").select("id, content").in_("id", missing).execute()
+                contents.update((row["id"], row["content"]) for row in (rows.data or []))
+            return [contents[key] for key in fused if key in contents]
         except Exception as e:
             logger.error(f"Memory search error: {e}")
             return []
 
+    async def _match_rows(self, vector: list[float], count: int, partitions: list[str]) -> list[dict]:
+        """
+        Exact pgvector ranking within the caller's partitions
+        (match_memories_partitioned). Falls back to the global match_memories
+        RPC, filtered by partition, when that call fails; a missing function
+        switches to the fallback for good. Rows it returns without metadata
+        are looked up by id, and dropped if that fails, never assumed shared.
+        """
+        if self.partitioned_rpc:
+            try:
+                result = await self.client.rpc("match_memories_partitioned", {
+                    "query_embedding": vector,
+                    "match_count": count,
+                    "partitions": partitions,
+                }).execute()
+                return result.data or []
+            except Exception as e:
+                if getattr(e, "code", None) in ("PGRST202", "42883"):
+                    self.partitioned_rpc = False
+                    logger.warning("match_memories_partitioned is missing (apply sql/memory_partitions.sql); "
+                                   "using match_memories with a partition filter")
+                else:
+                    logger.error(f"match_memories_partitioned error, using match_memories: {e}")
+
+        result = await self.client.rpc("match_memories", {
+            "query_embedding": vector,
+            "match_count": count * _FALLBACK_OVERFETCH,
+        }).execute()
+        rows = result.data or []
+        unknown = [row["id"] for row in rows if "metadata" not in row and "id" in row]
+        metadata = {}
+        if unknown:
+            try:
+                found = await self.client.table("memories").select("id, metadata").in_("id", unknown).execute()
+                metadata = {row["id"]: row.get("metadata") for row in (found.data or [])}
+            except Exception as e:
+                logger.error(f"match_memories fallback: metadata lookup failed, dropping {len(unknown)} rows: {e}")
+
+        wanted = set(partitions)
+        scoped = []
+        for row in rows:
+            if "metadata" in row:
+                row_metadata = row["metadata"]
+            elif row.get("id") in metadata:
+                row_metadata = metadata[row["id"]]
+            else:
+                continue            # partition unknown: another user's memory must not leak
+            if memory_partition(row_metadata) in wanted:
+                scoped.append(row)
+        return scoped[:count]
+
+    async def warm_local_index(self) -> None:
+        """
+        Load every embedded row of `memories` into the in-process vector index
+        (MEMORY_LOCAL_INDEX) and / or BM25 index (HYBRID_SEARCH).
+        Searches keep using the `match_memories_partitioned` RPC alone until loading finishes.
+        """
+        if not (settings.MEMORY_LOCAL_INDEX or settings.HYBRID_SEARCH) or not self.client or not self.embeddings:
+            return
 
-    async def get_long_term_memories(self, identity: str, limit: int = 10) -> str:
-        """Retrieve the last N non-embedded 'user_facts' memories for this identity."""
-        if not self.client:
-            return ""
-
+        index = PartitionedVectorIndex(nprobe=settings.MEMORY_INDEX_NPROBE) if settings.MEMORY_LOCAL_INDEX else None
+        lexical = PartitionedBM25Index() if settings.HYBRID_SEARCH else None
+        self._index_loading = index
+        self._lexical_loading = lexical
+        columns = "id, content, metadata, embedding" if index is not None else "id, content, metadata"
+        offset = 0
         try:
-            result = self.client.table("memories") \
-                .select("content, created_at") \
-                .eq("metadata->>type", "user_facts") \
-                .eq("metadata->>identity", identity) \
-                .order("created_at", desc=True) \
-                .limit(limit) \
-                .execute()
-
-            rows = result.data or []
-            if not rows:
-                return ""
-
-            # Reverse to get chronological order in the prompt
-            facts_list = [row["content"] for row in reversed(rows)]
-            return "\n---\n".join(facts_list)
-
+            while True:
+                query = self.client.table("memories") \
+                    .select(columns) \
+                    .not_.is_("embedding", "null") \
+                    .order("created_at") \
+                    .range(offset, offset + _WARM_LOAD_PAGE - 1)
+                result = await query.execute()
+                rows = result.data or []
+
+                if index is not None:
+                    fresh = [row for row in rows if row["id"] not in index]
+                    if fresh:
+                        index.add_many(
+                            [memory_partition(row.get("metadata")) for row in fresh],
+                            [row["id"] for row in fresh],
+                            [_parse_embedding(row["embedding"]) for row in fresh],
+                            [row["content"] for row in fresh],
+                        )
+                if lexical is not None:
+                    fresh = [row for row in rows if row["id"] not in lexical]
+                    lexical.add_many(
+                        [memory_partition(row.get("metadata")) for row in fresh],
+                        ((row["id"], row["content"]) for row in fresh),
+                    )
+                if len(rows) < _WARM_LOAD_PAGE:
+                    break
+                offset += _WARM_LOAD_PAGE
+
+            if index is not None:
+                self.index = index
+                logger.info(f"Memory Service: local index ready ({len(index)} memories, {index.partitions} partitions)")
+            if lexical is not None:
+                self.lexical = lexical
+                logger.info(f"Memory Service: BM25 index ready ({len(lexical)} memories, {lexical.partitions} partitions)")
         except Exception as e:
-            logger.error(f"Memory Service Get Long Term Memories error: {e}")
-            return ""
+            logger.error(f"Memory Service warm local index error: {e}")
+        finally:
+            self._index_loading = None
+            self._lexical_loading = None
 
 
 memory_service = MemoryService()
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Identity-partitioned shards for the in-process memory indexes.
+
+Memories belong to whoever the conversation was with. A single global
+index ranks every query against every user's rows, so search cost (and
+the chance of surfacing someone else's memory) grows with total traffic.
+Here each partition gets its own VectorIndex / BM25Index shard and a
+search only touches the shards of the caller:
+
+  identity:<name>         memories stored with metadata.identity
+  conversation:<id>       older rows that only carry metadata.conversation_id
+  shared                  everything else (uploaded documents)
+
+A search for (identity, conversation_id) reads its identity shard, its
+conversation shard and the shared shard, so latency depends on that user's
+data only. memory_partition() mirrors the SQL function of the same name in
+sql/memory_partitions.sql, which backs the pgvector path.
+"""
+from __future__ import annotations
+
+import heapq
+from itertools import chain
+from typing import Any, Callable, Hashable, Iterable
+
+from app.services.lexical_index import BM25Index
+from app.services.vector_index import VectorIndex
+
+SHARED = "shared"
+_ANONYMOUS = {"", "anonymous"}
+
+
+def memory_partition(metadata: dict | None) -> str:
+    """Partition a `memories` row belongs to, from its metadata."""
+    metadata = metadata or {}
+    identity = metadata.get("identity") or ""
+    if identity not in _ANONYMOUS:
+        return f"identity:{identity}"
+    if metadata.get("conversation_id"):
+        return f"conversation:{metadata['conversation_id']}"
+    return SHARED
+
+
+def search_partitions(identity: str | None = None, conversation_id: str | None = None) -> list[str]:
+    """Partitions a search on behalf of this identity / conversation may read."""
+    partitions = []
+    if identity and identity not in _ANONYMOUS:
+        partitions.append(f"identity:{identity}")
+    if conversation_id:
+        partitions.append(f"conversation:{conversation_id}")
+    partitions.append(SHARED)
+    return partitions
+
+
+class _Partitioned:
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._shards: dict[str, Any] = {}
+        self._partition_of: dict[Hashable, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._partition_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._partition_of
+
+    @property
+    def partitions(self) -> int:
+        return len(self._shards)
+
+    def shard(self, partition: str):
+        shard = self._shards.get(partition)
+        if shard is None:
+            shard = self._shards[partition] = self._factory()
+        return shard
+
+    def remove(self, key: Hashable) -> None:
+        partition = self._partition_of.pop(key, None)
+        if partition is not None:
+            self._shards[partition].remove(key)
+
+    def _group(self, partitions: list[str], keys: list[Hashable]) -> dict[str, list[int]]:
+        """Record each key's partition (moving re-partitioned keys); row positions per shard."""
+        groups: dict[str, list[int]] = {}
+        for i, (partition, key) in enumerate(zip(partitions, keys)):
+            previous = self._partition_of.get(key)
+            if previous is not None and previous != partition:
+                self._shards[previous].remove(key)
+            self._partition_of[key] = partition
+            groups.setdefault(partition, []).append(i)
+        return groups
+
+    def _searched(self, partitions: Iterable[str]) -> list:
+        return [self._shards[p] for p in dict.fromkeys(partitions) if p in self._shards]
+
+
+class PartitionedVectorIndex(_Partitioned):
+    """One VectorIndex per partition; results of the searched shards merged by cosine score."""
+
+    def __init__(self, nprobe: int = 8):
+        super().__init__(lambda: VectorIndex(nprobe=nprobe))
+        self.dim: int | None = None
+
+    def add_many(self, partitions: list[str], keys: list[Hashable], vectors, payloads: list[Any]) -> None:
+        vectors = list(vectors)
+        for partition, rows in self._group(partitions, keys).items():
+            shard = self.shard(partition)
+            shard.add_many([keys[i] for i in rows], [vectors[i] for i in rows], [payloads[i] for i in rows])
+            self.dim = shard.dim
+
+    def search(self, partitions: Iterable[str], query, k: int = 3) -> list[tuple[Hashable, float, Any]]:
+        hits = chain.from_iterable(shard.search(query, k) for shard in self._searched(partitions))
+        return heapq.nlargest(k, hits, key=lambda hit: hit[1])
+
+
+class PartitionedBM25Index(_Partitioned):
+    """
+    One BM25Index per partition. Each shard has its own IDF and average
+    length, so BM25 scores are not comparable across shards: searches return
+    one ranking per shard, for the caller to fuse by rank (rrf_fuse).
+    """
+
+    def __init__(self):
+        super().__init__(BM25Index)
+
+    def add_many(self, partitions: list[str], items: Iterable[tuple[Hashable, str]]) -> None:
+        items = list(items)
+        for partition, rows in self._group(partitions, [key for key, _ in items]).items():
+            self.shard(partition).add_many(items[i] for i in rows)
+
+    def rankings(self, partitions: Iterable[str], query: str, k: int = 10) -> list[list[Hashable]]:
+        """Best-first keys of each searched shard (up to `k` each); empty shards are skipped."""
+        rankings = ([key for key, _ in shard.search(query, k)] for shard in self._searched(partitions))
+        return [ranking for ranking in rankings if ranking]
@@ -4,11 +4,11 @@ from app.services.settings_service import settings_service
 
 
 class Prompter:
-    def build(self, message: str, context: dict = None) -> list:
+    async def build(self, message: str, context: dict = None) -> list:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Custom system_prompt from admin panel overrides the hardcoded persona
-        db = settings_service.get_settings()
+        db = await settings_service.get_settings()
         custom = (db.get("system_prompt") or "").strip()
         persona = custom if custom else persona_engine.get_persona()
 
@@ -95,6 +95,33 @@ class AnthropicProvider(LLMProvider):
         max_tokens: int,
         tools: list[dict] | None = None,
     ) -> dict:
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
+        try:
+            response = self._client.messages.create(**kwargs)
+        except Exception as e:
+            raise self._translate_error(e) from e
+        return self._to_result(response, model)
+
+    # ── Async ─────────────────────────────────────────────────────────────────
+
+    async def agenerate(
+        self,
+        messages: list[dict],
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict] | None = None,
+    ) -> dict:
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
+        try:
+            response = await self._async_client.messages.create(**kwargs)
+        except Exception as e:
+            raise self._translate_error(e) from e
+        return self._to_result(response, model)
+
+    @staticmethod
+    def _request_kwargs(messages, model, temperature, max_tokens, tools) -> dict:
         system, user_messages = _split_system(messages)
         kwargs = dict(
             model=model,
@@ -105,35 +132,35 @@ class AnthropicProvider(LLMProvider):
         )
         if tools:
             kwargs["tools"] = _openai_tools_to_anthropic(tools)
+        return kwargs
 
-        _a = self._anthropic  # local ref so except clauses can reference it
-        try:
-            response = self._client.messages.create(**kwargs)
-
-            # Text from text blocks
-            raw = "".join(
-                block.text for block in response.content
-                if getattr(block, "type", None) == "text"
-            )
-            tool_calls = _extract_tool_calls(response.content)
-
-            if tool_calls and not raw:
-                raw = f"[tool_call: {tool_calls[0]['name']}]"
-
-            return make_result(raw, self.name, model, tool_calls=tool_calls)
-
-        except _a.RateLimitError as e:
-            raise RetryableError(str(e), status_code=429)
-        except (_a.APIConnectionError, _a.APITimeoutError) as e:
-            raise RetryableError(str(e))
-        except _a.InternalServerError as e:
-            raise RetryableError(str(e), status_code=getattr(e, "status_code", 500))
-        except _a.AuthenticationError as e:
-            raise NonRetryableError(str(e), status_code=401)
-        except _a.BadRequestError as e:
-            raise NonRetryableError(str(e), status_code=400)
-        except Exception as e:
-            raise RetryableError(str(e))
+    def _to_result(self, response, model: str) -> dict:
+        # Text from text blocks
+        raw = "".join(
+            block.text for block in response.content
+            if getattr(block, "type", None) == "text"
+        )
+        tool_calls = _extract_tool_calls(response.content)
+
+        if tool_calls and not raw:
+            raw = f"[tool_call: {tool_calls[0]['name']}]"
+
+        return make_result(raw, self.name, model, tool_calls=tool_calls)
+
+    def _translate_error(self, e: Exception) -> Exception:
+        """Map Anthropic SDK exceptions onto the registry's retry semantics."""
+        _a = self._anthropic
+        if isinstance(e, _a.RateLimitError):
+            return RetryableError(str(e), status_code=429)
+        if isinstance(e, (_a.APIConnectionError, _a.APITimeoutError)):
+            return RetryableError(str(e))
+        if isinstance(e, _a.InternalServerError):
+            return RetryableError(str(e), status_code=getattr(e, "status_code", 500))
+        if isinstance(e, _a.AuthenticationError):
+            return NonRetryableError(str(e), status_code=401)
+        if isinstance(e, _a.BadRequestError):
+            return NonRetryableError(str(e), status_code=400)
+        return RetryableError(str(e))
 
     # ── Streaming ─────────────────────────────────────────────────────────────
 
@@ -146,17 +173,8 @@ class AnthropicProvider(LLMProvider):
         max_tokens: int,
         tools: list[dict] | None = None,
     ) -> AsyncGenerator[TextDelta | StreamDone, None]:
-        system, user_messages = _split_system(messages)
         assembled = ""
-        kwargs = dict(
-            model=model,
-            system=system,
-            messages=user_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        if tools:
-            kwargs["tools"] = _openai_tools_to_anthropic(tools)
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
 
         try:
             async with self._async_client.messages.stream(**kwargs) as stream:
@@ -171,7 +189,9 @@ class AnthropicProvider(LLMProvider):
                             assembled += chunk
                             yield TextDelta(text=chunk)
         except Exception as e:
-            logger.error(f"[anthropic] stream error: {e}")
+            # Surface the failure — the registry decides whether to resume elsewhere
+            logger.error(f"[anthropic] stream error after {len(assembled)} chars: {e}")
+            raise self._translate_error(e) from e
 
         result = make_result(assembled, self.name, model)
         yield StreamDone(
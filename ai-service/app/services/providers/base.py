@@ -18,6 +18,7 @@ Stream events (for future streaming endpoints):
 """
 from __future__ import annotations
 
+import asyncio
 import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
@@ -55,6 +56,10 @@ class RetryableError(Exception):
         self.status_code = status_code
 
 
+class StreamStalled(RetryableError):
+    """A stream produced no delta within its deadline. The registry fails over."""
+
+
 class NonRetryableError(Exception):
     """
     Auth failure (401) or bad request (400).
@@ -103,8 +108,11 @@ def make_result(
 class LLMProvider(ABC):
     """
     All providers implement this interface.
-    `generate` is the blocking path used by the brain pipeline.
-    `stream`   is the async-generator path for future streaming endpoints.
+    `generate`  is the blocking path.
+    `agenerate` is the async path the registry prefers. The default runs
+                `generate` in a worker thread; providers with an async SDK
+                client override it so a call never occupies an executor thread.
+    `stream`    is the async-generator path used by streaming chat.
 
     Tool definitions follow the OpenAI schema:
       [{ "type": "function", "function": { "name": ..., "description": ...,
@@ -130,6 +138,25 @@ class LLMProvider(ABC):
           { text, emotion, raw, provider, model, tool_calls }
         """
 
+    async def agenerate(
+        self,
+        messages: list[dict],
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict] | None = None,
+    ) -> dict:
+        """Async generation. Same result dict and error types as `generate`."""
+        return await asyncio.to_thread(
+            self.generate,
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=tools,
+        )
+
     @abstractmethod
     async def stream(
         self,
@@ -0,0 +1,88 @@
+"""
+Per-provider circuit breakers for the Provider Registry.
+
+Without a breaker every request re-discovers an outage by paying for the
+full retry + backoff schedule in `_call_with_retry`. A breaker remembers the
+outcome across requests:
+
+  closed     → calls flow normally; consecutive failures are counted
+  open       → tripped after LLM_BREAKER_FAILURES consecutive failures;
+               calls are skipped instantly for LLM_BREAKER_COOLDOWN seconds
+  half_open  → cooldown elapsed; exactly one probe call (single attempt,
+               no backoff) is let through. Success closes the breaker,
+               failure re-opens it for another cooldown.
+
+Only provider faults count as failures (exhausted retries, auth errors).
+A 400 means our request was malformed and says nothing about provider health.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now. In half-open this claims the single
+        probe slot, so only call it right before actually calling the provider.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """The call ended with no verdict (e.g. cancelled) — free the probe slot."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        state = self.state
+        retry_in = None
+        if state == OPEN:
+            retry_in = round(self.cooldown - (self._clock() - self._opened_at), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_in_s": retry_in,
+        }
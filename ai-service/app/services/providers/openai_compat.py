@@ -45,6 +45,22 @@ def _extract_tool_calls(response_message) -> list | None:
     ]
 
 
+def _translate_error(e: Exception) -> Exception:
+    """Map OpenAI SDK exceptions onto the registry's retry semantics."""
+    if isinstance(e, _openai_lib.RateLimitError):
+        return RetryableError(str(e), status_code=429)
+    if isinstance(e, (_openai_lib.APIConnectionError, _openai_lib.APITimeoutError)):
+        return RetryableError(str(e))
+    if isinstance(e, _openai_lib.InternalServerError):
+        return RetryableError(str(e), status_code=getattr(e, "status_code", 500))
+    if isinstance(e, _openai_lib.AuthenticationError):
+        return NonRetryableError(str(e), status_code=401)
+    if isinstance(e, (_openai_lib.BadRequestError, _openai_lib.NotFoundError)):
+        return NonRetryableError(str(e), status_code=getattr(e, "status_code", 400))
+    # Unknown error — treat as retryable so the registry can decide
+    return RetryableError(str(e))
+
+
 class OpenAICompatProvider(LLMProvider):
 
     def __init__(
@@ -71,6 +87,32 @@ class OpenAICompatProvider(LLMProvider):
         max_tokens: int,
         tools: list[dict] | None = None,
     ) -> dict:
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
+        try:
+            response = self._client.chat.completions.create(**kwargs)
+        except Exception as e:
+            raise _translate_error(e) from e
+        return self._to_result(response, model)
+
+    # ── Async ─────────────────────────────────────────────────────────────────
+
+    async def agenerate(
+        self,
+        messages: list[dict],
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict] | None = None,
+    ) -> dict:
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
+        try:
+            response = await self._async_client.chat.completions.create(**kwargs)
+        except Exception as e:
+            raise _translate_error(e) from e
+        return self._to_result(response, model)
+
+    def _request_kwargs(self, messages, model, temperature, max_tokens, tools) -> dict:
         kwargs = dict(
             model=model,
             messages=messages,
@@ -81,33 +123,19 @@ class OpenAICompatProvider(LLMProvider):
         if tools:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
+        return kwargs
 
-        try:
-            response = self._client.chat.completions.create(**kwargs)
-            msg = response.choices[0].message
-            raw = msg.content or ""
-            tool_calls = _extract_tool_calls(msg)
-
-            # When the model only returns a tool call (no text), give a placeholder
-            # so make_result always has something to parse.
-            if tool_calls and not raw:
-                raw = f"[tool_call: {tool_calls[0]['name']}]"
-
-            return make_result(raw, self.name, model, tool_calls=tool_calls)
-
-        except _openai_lib.RateLimitError as e:
-            raise RetryableError(str(e), status_code=429)
-        except (_openai_lib.APIConnectionError, _openai_lib.APITimeoutError) as e:
-            raise RetryableError(str(e))
-        except _openai_lib.InternalServerError as e:
-            raise RetryableError(str(e), status_code=getattr(e, "status_code", 500))
-        except _openai_lib.AuthenticationError as e:
-            raise NonRetryableError(str(e), status_code=401)
-        except (_openai_lib.BadRequestError, _openai_lib.NotFoundError) as e:
-            raise NonRetryableError(str(e), status_code=getattr(e, "status_code", 400))
-        except Exception as e:
-            # Unknown error — treat as retryable so the registry can decide
-            raise RetryableError(str(e))
+    def _to_result(self, response, model: str) -> dict:
+        msg = response.choices[0].message
+        raw = msg.content or ""
+        tool_calls = _extract_tool_calls(msg)
+
+        # When the model only returns a tool call (no text), give a placeholder
+        # so make_result always has something to parse.
+        if tool_calls and not raw:
+            raw = f"[tool_call: {tool_calls[0]['name']}]"
+
+        return make_result(raw, self.name, model, tool_calls=tool_calls)
 
     # ── Streaming ─────────────────────────────────────────────────────────────
 
@@ -121,16 +149,7 @@ class OpenAICompatProvider(LLMProvider):
         tools: list[dict] | None = None,
     ) -> AsyncGenerator[TextDelta | StreamDone, None]:
         assembled = ""
-        kwargs = dict(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            extra_headers=self._extra_headers,
-        )
-        if tools:
-            kwargs["tools"] = tools
-            kwargs["tool_choice"] = "auto"
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, tools)
 
         try:
             response = await self._async_client.chat.completions.create(**kwargs, stream=True)
@@ -151,7 +170,9 @@ class OpenAICompatProvider(LLMProvider):
                     assembled += txt
                     yield TextDelta(text=txt)
         except Exception as e:
-            logger.error(f"[{self.name}] stream error: {e}")
+            # Surface the failure — the registry decides whether to resume elsewhere
+            logger.error(f"[{self.name}] stream error after {len(assembled)} chars: {e}")
+            raise _translate_error(e) from e
 
         result = make_result(assembled, self.name, model)
         yield StreamDone(
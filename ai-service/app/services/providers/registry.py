@@ -5,7 +5,23 @@ Responsibilities:
   1. Read active model / provider / temperature / max_tokens from settings_service
   2. Read the matching API key from settings_service (DB) or fall back to env vars
   3. Instantiate the right LLMProvider
-  4. Call provider.generate() and return the normalized result
+  4. Call provider.agenerate() and return the normalized result
+
+Routing (LLM_ROUTING_MODE):
+  ordered  → try candidates strictly in fallback order (default)
+  latency  → rank candidates by measured latency and hedge slow calls
+             (see providers/routing.py)
+
+Every provider also has a circuit breaker (see providers/circuit.py): once
+it has failed LLM_BREAKER_FAILURES calls in a row it is skipped instantly
+until LLM_BREAKER_COOLDOWN has passed, instead of each request paying for
+retries + backoff during an outage.
+
+Deterministic calls can be served from an in-process response cache
+(LLM_RESPONSE_CACHE, see providers/response_cache.py).
+
+Streaming fails over mid-response: a provider that errors or stalls is
+replaced by the next candidate, primed with the partial reply.
 
 Provider inference (when `provider` field is "auto" or missing):
   model starts with "claude-"        → anthropic
@@ -22,14 +38,24 @@ import asyncio
 import os
 import random
 import time
+from contextlib import aclosing
+from typing import AsyncGenerator
 
-from app.services.providers.base import LLMProvider, RetryableError, NonRetryableError
+from app.core.config import settings
+from app.services.providers.base import (
+    LLMProvider, RetryableError, NonRetryableError, StreamStalled, StreamDone, TextDelta, make_result,
+)
+from app.services.providers.circuit import CircuitBreaker, HALF_OPEN
+from app.services.providers.response_cache import ResponseCache, response_key
+from app.services.providers.routing import LatencyTracker, StreamStats
 
 logger = logging.getLogger(__name__)
 
 _MAX_ATTEMPTS  = 3        # attempts per provider before giving up on it
 _BACKOFF_BASE  = 1.0      # seconds; delay = base * 2^attempt + jitter
 
+_UNAVAILABLE_RAW = "[confused] I seem to be having trouble connecting right now. Please try again in a moment."
+
 # Ordered fallback chain — first provider with an available key wins
 _FALLBACK_ORDER = ["openrouter", "openai", "groq", "ollama"]
 
@@ -62,6 +88,13 @@ class ProviderRegistry:
 
     def __init__(self):
         self._cache: dict[str, LLMProvider] = {}
+        self.latency = LatencyTracker()
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.stream_stats = StreamStats()
+        self.responses = ResponseCache(
+            max_entries=settings.LLM_RESPONSE_CACHE_SIZE,
+            ttl=settings.LLM_RESPONSE_CACHE_TTL,
+        )
 
     # ── Public API ────────────────────────────────────────────────────────────
 
@@ -73,12 +106,54 @@ class ProviderRegistry:
         temperature: float | None = None,
         max_tokens: int | None = None,
         tools: list[dict] | None = None,
+        cache: bool | None = None,
     ) -> dict:
+        """
+        `cache` — None: use the response cache only for temperature 0 calls;
+                  True / False: force it on / off for this call.
+                  Has no effect unless LLM_RESPONSE_CACHE is enabled.
+        """
+        primary, candidates, keys, call_kwargs = await self._plan(model, temperature, max_tokens, tools)
+        actual_model = call_kwargs["model"]
+
+        cache_key = None
+        if settings.LLM_RESPONSE_CACHE:
+            if self.responses.should_cache(call_kwargs["temperature"], cache):
+                cache_key = response_key(messages=messages, **call_kwargs)
+                cached = self.responses.get(cache_key)
+                if cached is not None:
+                    return cached
+            else:
+                self.responses.bypass()
+
+        if settings.LLM_ROUTING_MODE.lower() == "latency":
+            candidates = self.latency.rank(candidates, actual_model)
+            result = await self._hedged_generate(candidates, keys, messages, call_kwargs)
+        else:
+            result = await self._ordered_generate(candidates, keys, messages, call_kwargs)
+
+        if result is not None:
+            if cache_key is not None:
+                self.responses.put(cache_key, result)
+            if result["provider"] != primary:
+                logger.warning(f"[registry] answered by {result['provider']} (primary={primary})")
+            return result
+
+        return {
+            "text": "I seem to be having trouble connecting right now. Please try again in a moment.",
+            "emotion": "confused",
+            "raw": "",
+            "provider": primary,
+            "model": actual_model,
+            "tool_calls": None,
+        }
+
+    async def _plan(self, model, temperature, max_tokens, tools) -> tuple[str, list[str], dict, dict]:
+        """Resolve settings into (primary, candidates, keys, call_kwargs)."""
         # Lazy import avoids circular imports at module load time
         from app.services.settings_service import settings_service
 
-        db = settings_service.get_settings()
-        keys = settings_service.get_api_keys()
+        db, keys = await asyncio.gather(settings_service.get_settings(), settings_service.get_api_keys())
 
         actual_model       = model or db.get("model") or "deepseek/deepseek-v3.2"
         actual_temp        = temperature if temperature is not None else float(db.get("temperature", 0.8))
@@ -103,7 +178,10 @@ class ProviderRegistry:
             max_tokens=actual_max_tokens,
             tools=tools,
         )
+        return primary, candidates, keys, call_kwargs
 
+    async def _ordered_generate(self, candidates: list[str], keys: dict, messages: list[dict], call_kwargs: dict) -> dict | None:
+        """Try candidates strictly in order. Returns None if every provider failed."""
         last_error: Exception | None = None
 
         for provider_name in candidates:
@@ -115,12 +193,13 @@ class ProviderRegistry:
                 last_error = e
                 continue
 
-            logger.info(f"[registry] trying {provider_name} / {actual_model}")
+            if not self.breaker(provider_name).allow():
+                logger.info(f"[registry] skipping {provider_name}: circuit open")
+                continue
+
+            logger.info(f"[registry] trying {provider_name} / {call_kwargs['model']}")
             try:
-                result = await self._call_with_retry(provider, messages, **call_kwargs)
-                if provider_name != primary:
-                    logger.warning(f"[registry] fell back to {provider_name} (primary={primary} failed)")
-                return result
+                return await self._timed_call(provider, messages, call_kwargs)
 
             except NonRetryableError as e:
                 last_error = e
@@ -139,14 +218,77 @@ class ProviderRegistry:
                 continue
 
         logger.error(f"[registry] all providers failed. Last: {last_error}")
-        return {
-            "text": "I seem to be having trouble connecting right now. Please try again in a moment.",
-            "emotion": "confused",
-            "raw": "",
-            "provider": primary,
-            "model": actual_model,
-            "tool_calls": None,
-        }
+        return None
+
+    async def _hedged_generate(self, candidates: list[str], keys: dict, messages: list[dict], call_kwargs: dict) -> dict | None:
+        """
+        Latency mode: start the best-ranked provider, and if it overruns its p95
+        budget, race the next candidate against it. First success wins; the
+        losers are cancelled. A failure with nothing else in flight launches the
+        next candidate immediately.
+        """
+        providers = []
+        for provider_name in candidates:
+            try:
+                providers.append(self._get_provider(provider_name, keys))
+            except (ValueError, RuntimeError) as e:
+                logger.debug(f"[registry] skipping {provider_name}: {e}")
+
+        model = call_kwargs["model"]
+        pending: dict[asyncio.Task, LLMProvider] = {}
+        remaining = list(providers)
+        last_error: Exception | None = None
+
+        def launch() -> bool:
+            while remaining:
+                provider = remaining.pop(0)
+                if not self.breaker(provider.name).allow():
+                    logger.info(f"[registry] skipping {provider.name}: circuit open")
+                    continue
+                logger.info(f"[registry] trying {provider.name} / {model}")
+                pending[asyncio.create_task(self._timed_call(provider, messages, call_kwargs))] = provider
+                return True
+            return False
+
+        try:
+            while remaining or pending:
+                if not pending and not launch():
+                    break
+
+                hedge_after = None
+                if remaining:
+                    leader = next(iter(pending.values()))
+                    hedge_after = self.latency.hedge_delay(
+                        leader.name, model, settings.LLM_HEDGE_MIN_DELAY, settings.LLM_HEDGE_MAX_DELAY,
+                    )
+
+                done, _ = await asyncio.wait(pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"[registry] {leader.name} exceeded {hedge_after:.2f}s budget, hedging")
+                    launch()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except NonRetryableError as e:
+                        last_error = e
+                        if e.status_code == 400:
+                            logger.error(f"[registry] bad request ({provider.name}): {e}")
+                            return None
+                        logger.warning(f"[registry] auth failed for {provider.name} (HTTP {e.status_code})")
+                    except RetryableError as e:
+                        logger.warning(f"[registry] {provider.name} exhausted retries: {e}")
+                        last_error = e
+        finally:
+            # Cancel the losers and let them unwind so no request is left dangling
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        logger.error(f"[registry] all providers failed. Last: {last_error}")
+        return None
 
     async def stream(
         self,
@@ -157,65 +299,190 @@ class ProviderRegistry:
         max_tokens: int | None = None,
         tools: list[dict] | None = None,
     ) -> AsyncGenerator[TextDelta | StreamDone, None]:
-        from app.services.settings_service import settings_service
-
-        db = settings_service.get_settings()
-        keys = settings_service.get_api_keys()
-
-        actual_model       = model or db.get("model") or "deepseek/deepseek-v3.2"
-        actual_temp        = temperature if temperature is not None else float(db.get("temperature", 0.8))
-        actual_max_tokens  = max_tokens or int(db.get("max_tokens", 300))
-
-        configured_provider = (db.get("provider") or "auto").lower()
-        primary = (
-            configured_provider
-            if configured_provider != "auto"
-            else infer_provider(actual_model)
-        )
-
-        candidates = [primary] + [
-            p for p in _FALLBACK_ORDER
-            if p != primary and (p == "ollama" or self._pick_key(p, keys))
-        ]
+        """
+        Stream with mid-stream failover. If a provider errors or stalls
+        (no delta within LLM_STREAM_FIRST_TOKEN_TIMEOUT / LLM_STREAM_STALL_TIMEOUT),
+        the request is re-issued to the next candidate with the text already
+        delivered as an assistant prefix, so the reply resumes instead of
+        restarting. The caller sees one continuous run of TextDeltas and a
+        single StreamDone assembled across providers.
+        """
+        primary, candidates, keys, call_kwargs = await self._plan(model, temperature, max_tokens, tools)
+        actual_model = call_kwargs["model"]
+        delivered = ""      # raw text already yielded to the caller
+        tool_calls = None
 
-        # Note: Fallbacks for streaming are harder to implement gracefully mid-stream.
-        # We try the primary and first available.
         for provider_name in candidates:
             try:
                 provider = self._get_provider(provider_name, keys)
+            except (ValueError, RuntimeError) as e:
+                logger.debug(f"[registry] skipping {provider_name}: {e}")
+                continue
+
+            breaker = self.breaker(provider_name)
+            if not breaker.allow():
+                logger.info(f"[registry] skipping {provider_name}: circuit open")
+                continue
+
+            request = messages
+            if delivered:
+                # Some providers reject trailing whitespace in a prefill
+                request = messages + [{"role": "assistant", "content": delivered.rstrip()}]
+                logger.warning(f"[registry] resuming stream on {provider_name} after {len(delivered)} chars")
+            else:
                 logger.info(f"[registry] streaming {provider_name} / {actual_model}")
-                
-                async for chunk in provider.stream(
-                    messages,
-                    model=actual_model,
-                    temperature=actual_temp,
-                    max_tokens=actual_max_tokens,
-                    tools=tools
-                ):
-                    yield chunk
-                return
+            trim_leading = delivered[-1:].isspace()
+
+            try:
+                async with aclosing(self._guarded_stream(provider, request, call_kwargs)) as events:
+                    async for event in events:
+                        if isinstance(event, StreamDone):
+                            tool_calls = event.tool_calls
+                            break
+                        text = event.text.lstrip() if trim_leading else event.text
+                        if not text:
+                            continue
+                        trim_leading = False
+                        delivered += text
+                        yield TextDelta(text=text)
+            except NonRetryableError as e:
+                if e.status_code == 400:
+                    breaker.release()
+                    logger.error(f"[registry] bad request ({provider_name}): {e}")
+                    break
+                breaker.record_failure()
+                self.stream_stats.record_failover(provider_name, actual_model)
+                logger.warning(f"[registry] stream failed for {provider_name} (HTTP {e.status_code})")
+                continue
             except Exception as e:
+                breaker.record_failure()
+                self.stream_stats.record_failover(provider_name, actual_model)
                 logger.warning(f"[registry] stream failed for {provider_name}: {e}")
                 continue
+            finally:
+                breaker.release()
+
+            breaker.record_success()
+            if provider_name != primary:
+                logger.warning(f"[registry] stream answered by {provider_name} (primary={primary})")
+            result = make_result(delivered, provider_name, actual_model, tool_calls=tool_calls)
+            yield StreamDone(
+                text=result["text"], emotion=result["emotion"], raw=delivered,
+                provider=provider_name, model=actual_model, tool_calls=result["tool_calls"],
+            )
+            return
+
+        logger.error(f"[registry] all providers failed mid-stream after {len(delivered)} chars")
+        if not delivered:
+            delivered = _UNAVAILABLE_RAW
+            yield TextDelta(text=delivered)
+        result = make_result(delivered, primary, actual_model)
+        yield StreamDone(
+            text=result["text"], emotion=result["emotion"], raw=delivered,
+            provider=primary, model=actual_model,
+        )
 
-    async def _call_with_retry(self, provider: LLMProvider, messages: list[dict], **kwargs) -> dict:
+    async def _guarded_stream(
+        self, provider: LLMProvider, messages: list[dict], call_kwargs: dict,
+    ) -> AsyncGenerator[TextDelta | StreamDone, None]:
+        """
+        provider.stream() with stall deadlines and TTFT / inter-token gap samples.
+        Raises StreamStalled when the provider goes quiet for too long.
+        """
+        model = call_kwargs["model"]
+        source = provider.stream(messages, **call_kwargs)
+        start = last = time.perf_counter()
+        first = True
+        try:
+            while True:
+                deadline = settings.LLM_STREAM_FIRST_TOKEN_TIMEOUT if first else settings.LLM_STREAM_STALL_TIMEOUT
+                try:
+                    event = await asyncio.wait_for(source.__anext__(), timeout=deadline)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise StreamStalled(f"{provider.name} sent nothing for {deadline:.1f}s")
+
+                now = time.perf_counter()
+                if isinstance(event, TextDelta) and event.text:
+                    if first:
+                        self.stream_stats.record_ttft(provider.name, model, now - start)
+                        first = False
+                    else:
+                        self.stream_stats.record_gap(provider.name, model, now - last)
+                    last = now
+                yield event
+        finally:
+            await source.aclose()
+
+    def breaker(self, provider_name: str) -> CircuitBreaker:
+        if provider_name not in self.breakers:
+            self.breakers[provider_name] = CircuitBreaker(
+                failure_threshold=settings.LLM_BREAKER_FAILURES,
+                cooldown=settings.LLM_BREAKER_COOLDOWN,
+            )
+        return self.breakers[provider_name]
+
+    def health(self) -> dict:
+        """Breaker state and latency stats per provider, for /api/v1/health/providers."""
+        return {
+            "breakers": {name: b.snapshot() for name, b in sorted(self.breakers.items())},
+            "latency": self.latency.snapshot(),
+            "streaming": self.stream_stats.snapshot(),
+        }
+
+    async def _timed_call(self, provider: LLMProvider, messages: list[dict], call_kwargs: dict) -> dict:
+        """
+        _call_with_retry plus a latency / outcome sample for routing and a
+        verdict for the provider's circuit breaker. The caller must already
+        have passed `breaker.allow()`.
+        """
+        breaker = self.breaker(provider.name)
+        # A half-open probe gets one attempt — no point backing off against a known-bad provider
+        attempts = 1 if breaker.state == HALF_OPEN else _MAX_ATTEMPTS
+        start = time.perf_counter()
+        try:
+            result = await self._call_with_retry(provider, messages, attempts=attempts, **call_kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race or the client left: only a lower bound, kept out of the percentiles
+            self.latency.record_cancelled(provider.name, call_kwargs["model"])
+            breaker.release()
+            raise
+        except NonRetryableError as e:
+            self.latency.record(provider.name, call_kwargs["model"], time.perf_counter() - start, ok=False)
+            if e.status_code == 400:
+                breaker.release()   # our request was bad, not the provider
+            else:
+                breaker.record_failure()
+            raise
+        except Exception:
+            self.latency.record(provider.name, call_kwargs["model"], time.perf_counter() - start, ok=False)
+            breaker.record_failure()
+            raise
+        self.latency.record(provider.name, call_kwargs["model"], time.perf_counter() - start)
+        breaker.record_success()
+        return result
+
+    async def _call_with_retry(
+        self, provider: LLMProvider, messages: list[dict], *, attempts: int = _MAX_ATTEMPTS, **kwargs,
+    ) -> dict:
         """
-        Call provider.generate() with exponential backoff on RetryableError.
+        Call provider.agenerate() with exponential backoff on RetryableError.
         Raises RetryableError if all attempts fail.
         Raises NonRetryableError immediately (no retry).
         """
-        for attempt in range(_MAX_ATTEMPTS):
+        for attempt in range(attempts):
             try:
-                # Use thread pool for sync generate calls to keep registry async-friendly
-                return await asyncio.to_thread(provider.generate, messages, **kwargs)
+                # Native async call — no executor thread is held while waiting on the network
+                return await provider.agenerate(messages, **kwargs)
             except NonRetryableError:
                 raise  # propagate immediately
             except RetryableError as e:
-                if attempt == _MAX_ATTEMPTS - 1:
+                if attempt == attempts - 1:
                     raise  # all attempts exhausted
                 delay = _BACKOFF_BASE * (2 ** attempt) + random.uniform(0.0, 0.5)
                 logger.warning(
-                    f"[{provider.name}] attempt {attempt + 1}/{_MAX_ATTEMPTS} failed "
+                    f"[{provider.name}] attempt {attempt + 1}/{attempts} failed "
                     f"(status={e.status_code}): {e} — retrying in {delay:.1f}s"
                 )
                 await asyncio.sleep(delay)
@@ -0,0 +1,112 @@
+"""
+Response cache for deterministic LLM calls.
+
+Internal prompts (emotion classification, extraction) are often re-sent with
+identical content. When LLM_RESPONSE_CACHE is on, ProviderRegistry.generate
+looks the normalized request up here before calling any provider.
+
+Key: sha256 over model, temperature, max_tokens, tools and the canonicalized
+messages (content stripped of surrounding whitespace, keys sorted), so
+formatting noise in prompt templates does not defeat the cache.
+
+Policy:
+  temperature == 0  → cached automatically
+  temperature  > 0  → bypassed unless the caller passes cache=True
+  cache=False       → always bypassed
+
+Entries expire after LLM_RESPONSE_CACHE_TTL seconds and the least recently
+used entry is evicted beyond LLM_RESPONSE_CACHE_SIZE.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def _canonical_message(message: dict) -> dict:
+    canonical = dict(message)
+    content = canonical.get("content")
+    if isinstance(content, str):
+        canonical["content"] = content.strip()
+    return canonical
+
+
+def response_key(
+    model: str,
+    temperature: float,
+    messages: list[dict],
+    max_tokens: int | None = None,
+    tools: list[dict] | None = None,
+) -> str:
+    payload = {
+        "model": model,
+        "temperature": round(float(temperature), 4),
+        "max_tokens": max_tokens,
+        "tools": tools or None,
+        "messages": [_canonical_message(m) for m in messages],
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def should_cache(temperature: float, opt_in: bool | None) -> bool:
+        if opt_in is not None:
+            return opt_in
+        return temperature <= 0
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if self._clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+            del self._entries[key]
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: dict) -> None:
+        self._entries[key] = (self._clock() + self.ttl, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def bypass(self) -> None:
+        self.bypassed += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
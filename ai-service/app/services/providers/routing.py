@@ -0,0 +1,148 @@
+"""
+Latency-aware routing support for the Provider Registry.
+
+LatencyTracker keeps a rolling window of call durations and outcomes per
+(provider, model). The registry uses it in two ways when
+LLM_ROUTING_MODE=latency:
+
+  1. Ranking — candidates are ordered by p50 latency, inflated by error rate.
+     Until it has enough samples the configured primary stays first; other
+     unmeasured providers queue behind the measured ones in configured
+     order, so an idle fallback is never promoted on zero evidence.
+  2. Hedging — if the chosen primary has not answered within its own p95
+     (clamped to [LLM_HEDGE_MIN_DELAY, LLM_HEDGE_MAX_DELAY]), a second request
+     is fired at the next candidate. Whichever answers first wins and the
+     other is cancelled. A cancelled call (lost hedge race, client gone)
+     says nothing about how long the provider would have taken, so it is
+     only counted, never sampled.
+
+StreamStats records time-to-first-token and inter-token gaps for streamed
+calls, which is what a listener actually perceives as latency.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+
+_WINDOW = 100         # samples kept per (provider, model)
+_MIN_SAMPLES = 5      # below this, percentiles are not trusted
+_ERROR_PENALTY = 4.0  # score = p50 * (1 + penalty * error_rate)
+_GAP_WINDOW = 2000    # inter-token gaps kept per (provider, model)
+
+
+@dataclass
+class LatencyStats:
+    samples: int
+    p50: float | None
+    p95: float | None
+    error_rate: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class LatencyTracker:
+    def __init__(self, window: int = _WINDOW):
+        self.window = window
+        self._latencies: dict[tuple[str, str], deque[float]] = {}
+        self._outcomes: dict[tuple[str, str], deque[bool]] = {}
+        self._cancelled: dict[tuple[str, str], int] = {}
+
+    def record(self, provider: str, model: str, seconds: float, ok: bool = True) -> None:
+        key = (provider, model)
+        self._outcomes.setdefault(key, deque(maxlen=self.window)).append(ok)
+        if ok:
+            # Failed calls return early and would drag the percentiles down
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def record_cancelled(self, provider: str, model: str) -> None:
+        key = (provider, model)
+        self._cancelled[key] = self._cancelled.get(key, 0) + 1
+
+    def stats(self, provider: str, model: str) -> LatencyStats:
+        latencies = sorted(self._latencies.get((provider, model), ()))
+        outcomes = self._outcomes.get((provider, model), ())
+        errors = sum(1 for ok in outcomes if not ok)
+        return LatencyStats(
+            samples=len(outcomes),
+            p50=_percentile(latencies, 50) if latencies else None,
+            p95=_percentile(latencies, 95) if latencies else None,
+            error_rate=errors / len(outcomes) if outcomes else 0.0,
+        )
+
+    def rank(self, candidates: list[str], model: str) -> list[str]:
+        """Order candidates by expected latency. candidates[0] is the configured primary."""
+        def score(indexed):
+            position, name = indexed
+            s = self.stats(name, model)
+            if s.samples < _MIN_SAMPLES or s.p50 is None:
+                # Unmeasured: the configured primary goes first, others keep config order
+                return (0.0 if position == 0 else math.inf, position)
+            return (s.p50 * (1 + _ERROR_PENALTY * s.error_rate), position)
+
+        return [name for _, name in sorted(enumerate(candidates), key=score)]
+
+    def hedge_delay(self, provider: str, model: str, floor: float, ceiling: float) -> float:
+        """How long to wait on `provider` before hedging: its p95, clamped."""
+        s = self.stats(provider, model)
+        if s.samples < _MIN_SAMPLES or s.p95 is None:
+            return ceiling
+        return min(ceiling, max(floor, s.p95))
+
+    def snapshot(self) -> dict:
+        result: dict[str, dict] = {}
+        for provider, model in sorted(set(self._outcomes) | set(self._cancelled)):
+            s = self.stats(provider, model)
+            result.setdefault(provider, {})[model] = {
+                "samples": s.samples,
+                "p50_ms": round(s.p50 * 1000, 1) if s.p50 is not None else None,
+                "p95_ms": round(s.p95 * 1000, 1) if s.p95 is not None else None,
+                "error_rate": round(s.error_rate, 3),
+                "cancelled": self._cancelled.get((provider, model), 0),
+            }
+        return result
+
+
+def _summary_ms(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+class StreamStats:
+    def __init__(self, window: int = _WINDOW, gap_window: int = _GAP_WINDOW):
+        self.window = window
+        self.gap_window = gap_window
+        self._ttft: dict[tuple[str, str], deque[float]] = {}
+        self._gaps: dict[tuple[str, str], deque[float]] = {}
+        self._failovers: dict[tuple[str, str], int] = {}
+
+    def record_ttft(self, provider: str, model: str, seconds: float) -> None:
+        self._ttft.setdefault((provider, model), deque(maxlen=self.window)).append(seconds)
+
+    def record_gap(self, provider: str, model: str, seconds: float) -> None:
+        self._gaps.setdefault((provider, model), deque(maxlen=self.gap_window)).append(seconds)
+
+    def record_failover(self, provider: str, model: str) -> None:
+        """`provider` failed or stalled mid-stream and the reply moved elsewhere."""
+        self._failovers[(provider, model)] = self._failovers.get((provider, model), 0) + 1
+
+    def snapshot(self) -> dict:
+        result: dict[str, dict] = {}
+        for provider, model in sorted(set(self._ttft) | set(self._gaps) | set(self._failovers)):
+            key = (provider, model)
+            result.setdefault(provider, {})[model] = {
+                "streams": len(self._ttft.get(key, ())),
+                "ttft": _summary_ms(self._ttft.get(key, ())),
+                "inter_token_gap": _summary_ms(self._gaps.get(key, ())),
+                "failovers": self._failovers.get(key, 0),
+            }
+        return result
@@ -1,35 +1,48 @@
+import asyncio
 import os
-import pypdf
-from pptx import Presentation
 from pathlib import Path
 import logging
-from supabase import create_client
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app.core.config import settings
+from app.core.database import database
+from app.services.embedding_cache import CachedEmbeddings, embedding_cache
+from app.services.extraction import extraction_engine
+from app.services.ingestion import IncrementalSplitter, IngestionJob, SourceManifest, chunk_hash, ingestion_jobs
+from app.services.lexical_index import BM25Index, rrf_fuse
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path("data/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+_PAGE_SIZE = 1000     # rows per manifest read
+_DELETE_BATCH = 500   # ids per stale-row delete
+
 class RAGService:
     def __init__(self):
         self.client = None
         self.embeddings = None
+        # BM25 index for hybrid search; None until warm_lexical_index() completes
+        self.lexical: BM25Index | None = None
+        self._lexical_loading: BM25Index | None = None
 
-        if settings.SUPABASE_URL and settings.SUPABASE_SERVICE_KEY:
-            self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        # Shared async Supabase client (app/core/database.py)
+        self.client = database
+        if self.client:
             logger.info("RAG Service connected to Supabase")
         else:
             logger.warning("Supabase credentials not set. RAG service database sync disabled.")
 
         api_key = settings.OPENROUTER_API_KEY
         if api_key:
-            self.embeddings = OpenAIEmbeddings(
-                api_key=api_key,
-                model="openai/text-embedding-3-small",
-                base_url="https://openrouter.ai/api/v1"
+            self.embeddings = CachedEmbeddings(
+                OpenAIEmbeddings(
+                    api_key=api_key,
+                    model="openai/text-embedding-3-small",
+                    base_url="https://openrouter.ai/api/v1"
+                ),
+                embedding_cache,
             )
         else:
             logger.warning("OPENROUTER_API_KEY not set. Falling back or failing embedding generation.")
@@ -40,86 +53,217 @@ class RAGService:
             length_function=len,
         )
 
-    def _extract_text(self, filepath: Path) -> str:
-        try:
-            if filepath.suffix.lower() == ".pdf":
-                text = ""
-                with open(filepath, "rb") as f:
-                    pdf = pypdf.PdfReader(f)
-                    for page in pdf.pages:
-                        extracted = page.extract_text()
-                        if extracted:
-                            text += extracted + "\n"
-                return text
-            elif filepath.suffix.lower() == ".pptx":
-                text = ""
-                prs = Presentation(filepath)
-                for slide in prs.slides:
-                    for shape in slide.shapes:
-                        if hasattr(shape, "text") and shape.text:
-                            text += shape.text + "\n"
-                return text
-            else:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    return f.read()
-        except Exception as e:
-            logger.error(f"Error extracting text from {filepath.name}: {e}")
-            return ""
+    def _iter_chunks(self, filepath: Path, job: IngestionJob):
+        """Page-wise extraction + incremental splitting. Yields one list of chunks per page."""
+        splitter = IncrementalSplitter(self.text_splitter)
+        for page in extraction_engine.iter_pages(filepath):
+            job.pages += 1
+            yield splitter.feed(page)
+        yield splitter.flush()
 
-    def add_document(self, filepath: Path):
+    async def add_document(
+        self, filepath: Path, job: IngestionJob | None = None, incremental: bool | None = None,
+    ) -> IngestionJob:
+        if job is None:
+            if incremental is None:
+                incremental = settings.RAG_INCREMENTAL_INGEST
+            job = ingestion_jobs.create(filepath.name, incremental=incremental)
         if not self.client or not self.embeddings:
             logger.error("RAG Service not initialized properly (Missing Supabase/Embedding config).")
-            return
+            job.fail("RAG service not configured")
+            return job
+
+        job.status = "running"
+        try:
+            await self._run_pipeline(filepath, job)
+        except Exception as e:
+            logger.error(f"Error indexing {filepath.name}: {e}")
+            job.fail(str(e))
+            return job
 
-        content = self._extract_text(filepath)
-        if not content.strip():
+        if not job.chunks:
             logger.warning(f"No text extracted from {filepath.name}")
-            return
+        logger.info(
+            f"Finished indexing {filepath.name}: {job.inserted}/{job.chunks} chunks "
+            f"from {job.pages} pages ({job.unchanged} unchanged, {job.deleted} stale removed, {job.failed} failed)."
+        )
+        job.finish()
+        return job
 
-        chunks = self.text_splitter.split_text(content)
-        
+    async def _run_pipeline(self, filepath: Path, job: IngestionJob) -> None:
         filename = filepath.name
-        total_chunks = len(chunks)
-        logger.info(f"Extracting {total_chunks} chunks for {filename}. Batching embedding generation...")
+        workers = max(1, settings.RAG_EMBED_CONCURRENCY)
+        batch_size = settings.RAG_EMBED_BATCH
+        # Bounded queues are the backpressure: a full queue parks the stage feeding it
+        batches: asyncio.Queue[list[tuple[str, str]] | None] = asyncio.Queue(maxsize=settings.RAG_INGEST_QUEUE_SIZE)
+        rows: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=settings.RAG_INGEST_QUEUE_SIZE)
+        manifest = await self._load_manifest(filename) if job.incremental else None
+
+        async def extract():
+            pages = self._iter_chunks(filepath, job)
+            pending: list[tuple[str, str]] = []
+            # Pages come back in order from the extraction pool; pull them through a worker thread
+            while (chunks := await asyncio.to_thread(next, pages, None)) is not None:
+                job.chunks += len(chunks)
+                for chunk in chunks:
+                    digest = chunk_hash(chunk)
+                    if manifest is not None and manifest.claim(digest):
+                        job.unchanged += 1
+                        continue
+                    pending.append((chunk, digest))
+                while len(pending) >= batch_size:
+                    await batches.put(pending[:batch_size])
+                    pending = pending[batch_size:]
+            if pending:
+                await batches.put(pending)
+            for _ in range(workers):
+                await batches.put(None)
+
+        async def embed():
+            while (batch := await batches.get()) is not None:
+                try:
+                    vectors = await self.embeddings.aembed_documents([chunk for chunk, _ in batch])
+                except Exception as e:
+                    job.failed += len(batch)
+                    logger.error(f"Failed to embed {len(batch)} chunks for {filename}: {e}")
+                    continue
+                job.embedded += len(batch)
+                await rows.put([
+                    {"content": chunk, "embedding": vector, "metadata": {"source": filename, "chunk_hash": digest}}
+                    for (chunk, digest), vector in zip(batch, vectors)
+                ])
 
-        batch_size = 100
-        for i in range(0, total_chunks, batch_size):
-            batch = chunks[i:i+batch_size]
+        async def embed_stage():
+            await asyncio.gather(*(embed() for _ in range(workers)))
+            await rows.put(None)
+
+        async def flush(buffer: list[dict]):
             try:
-                # Process in batches to massively speed up 1000 page PDFs like textbooks
-                vectors = self.embeddings.embed_documents(batch)
-                
-                data = [
-                    {
-                        "content": b,
-                        "embedding": v,
-                        "metadata": {"source": filename},
-                    }
-                    for b, v in zip(batch, vectors)
-                ]
-                
-                self.client.table("documents").insert(data).execute()
-                logger.info(f"Supabase Vector Indexed batch {i//batch_size + 1}/{(total_chunks-1)//batch_size + 1} for {filename}.")
+                result = await self.client.table("documents").insert(buffer).execute()
             except Exception as e:
-                logger.error(f"Failed to index batch {i//batch_size + 1} for {filename}: {e}")
+                job.failed += len(buffer)
+                logger.error(f"Failed to insert {len(buffer)} chunks for {filename}: {e}")
+                return
+            job.inserted += len(buffer)
+            self._index_rows((row["id"], row["content"]) for row in (result.data or []))
+            logger.info(f"Supabase Vector Indexed {job.inserted} chunks for {filename} ({job.pages} pages read).")
 
-        logger.info(f"Finished indexing all {total_chunks} chunks for {filename}.")
+        async def insert():
+            buffer: list[dict] = []
+            while (embedded := await rows.get()) is not None:
+                buffer.extend(embedded)
+                if len(buffer) >= settings.RAG_INSERT_BATCH:
+                    await flush(buffer)
+                    buffer = []
+            if buffer:
+                await flush(buffer)
 
-    def search(self, query: str, limit: int = 3) -> list[str]:
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(extract())
+                tg.create_task(embed_stage())
+                tg.create_task(insert())
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+
+        if manifest is not None:
+            stale = manifest.stale_ids()
+            if stale and job.failed:
+                # Some replacements never landed: keep the old chunks until a clean re-upload
+                logger.warning(f"Keeping {len(stale)} stale chunks of {filename}: {job.failed} chunks failed")
+            elif stale:
+                await self._delete_rows(stale)
+                job.deleted = len(stale)
+
+    async def _load_manifest(self, source: str) -> SourceManifest:
+        """Rows already indexed for `source` (id + metadata only, no content or vectors)."""
+        rows: list[dict] = []
+        while True:
+            page = (
+                await self.client.table("documents")
+                .select("id, metadata")
+                .eq("metadata->>source", source)
+                .order("id")
+                .range(len(rows), len(rows) + _PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                return SourceManifest(rows)
+
+    async def _delete_rows(self, ids: list) -> None:
+        for i in range(0, len(ids), _DELETE_BATCH):
+            await self.client.table("documents").delete().in_("id", ids[i:i + _DELETE_BATCH]).execute()
+        for lexical in (self.lexical, self._lexical_loading):
+            if lexical is not None:
+                for row_id in ids:
+                    lexical.remove(row_id)
+
+    def _index_rows(self, rows) -> None:
+        rows = list(rows)
+        for lexical in (self.lexical, self._lexical_loading):
+            if lexical is not None:
+                lexical.add_many(rows)
+
+    async def warm_lexical_index(self) -> None:
+        """
+        Load every chunk of `documents` into the BM25 index (HYBRID_SEARCH).
+        Searches stay vector-only until loading finishes.
+        """
+        if not settings.HYBRID_SEARCH or not self.client:
+            return
+
+        lexical = BM25Index()
+        self._lexical_loading = lexical
+        offset = 0
+        try:
+            while True:
+                query = self.client.table("documents") \
+                    .select("id, content") \
+                    .order("id") \
+                    .range(offset, offset + _PAGE_SIZE - 1)
+                rows = (await query.execute()).data or []
+                lexical.add_many((row["id"], row["content"]) for row in rows if row["id"] not in lexical)
+                if len(rows) < _PAGE_SIZE:
+                    break
+                offset += _PAGE_SIZE
+
+            self.lexical = lexical
+            logger.info(f"RAG Service: BM25 index ready ({len(lexical)} chunks)")
+        except Exception as e:
+            logger.error(f"RAG Service warm lexical index error: {e}")
+        finally:
+            self._lexical_loading = None
+
+    async def search(self, query: str, limit: int = 3) -> list[str]:
         if not self.client or not self.embeddings:
             return []
             
         try:
-            vector = self.embeddings.embed_query(query)
+            vector = await self.embeddings.aembed_query(query)
+            hybrid = self.lexical is not None and len(self.lexical) > 0
+            candidates = max(limit, settings.HYBRID_CANDIDATES) if hybrid else limit
 
-            result = self.client.rpc("match_documents", {
+            result = await self.client.rpc("match_documents", {
                 "query_embedding": vector,
-                "match_count": limit,
+                "match_count": candidates,
             }).execute()
+            rows = result.data or []
+
+            if hybrid:
+                # Fuse with BM25 so exact names / codes / Japanese terms still surface
+                by_id = {row.get("id", row["content"]): row for row in rows}
+                lexical = [key for key, _ in self.lexical.search(query, candidates)]
+                fused = rrf_fuse(list(by_id), lexical, k=settings.HYBRID_RRF_K, limit=limit)
+                missing = [key for key in fused if key not in by_id]
+                if missing:
+                    fetched = await self.client.table("documents").select("id, content, metadata").in_("id", missing).execute()
+                    by_id.update((row["id"], row) for row in (fetched.data or []))
+                rows = [by_id[key] for key in fused if key in by_id]
 
             docs = []
-            for row in (result.data or []):
-                source = row.get("metadata", {}).get("source", "Unknown")
+            for row in rows[:limit]:
+                source = (row.get("metadata") or {}).get("source", "Unknown")
                 docs.append(f"[From {source}]:\n{row['content']}")
                 
             return docs
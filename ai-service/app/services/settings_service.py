@@ -1,7 +1,7 @@
 import logging
 import time
-from supabase import create_client, Client
-from app.core.config import settings as app_settings
+from supabase import AsyncClient
+from app.core.database import database
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +31,8 @@ _KEY_DEFAULTS = {
 
 class SettingsService:
     def __init__(self):
-        self._client: Client | None = None
-        if app_settings.SUPABASE_URL and app_settings.SUPABASE_SERVICE_KEY:
-            self._client = create_client(app_settings.SUPABASE_URL, app_settings.SUPABASE_SERVICE_KEY)
+        # Shared async Supabase client (app/core/database.py)
+        self._client: AsyncClient | None = database
         
         # Simple cache
         self._cache = {}
@@ -44,7 +43,7 @@ class SettingsService:
         self._TTL = 60 # seconds for settings
         self._KEY_TTL = 5 # seconds for keys (re-check faster)
 
-    def get_settings(self) -> dict:
+    async def get_settings(self) -> dict:
         if not self._client:
             return dict(_DEFAULTS)
         
@@ -53,7 +52,7 @@ class SettingsService:
             return self._cache["settings"]
 
         try:
-            result = self._client.table("personality_settings").select("*").eq("id", 1).single().execute()
+            result = await self._client.table("personality_settings").select("*").eq("id", 1).single().execute()
             if result.data:
                 settings = {**_DEFAULTS, **result.data}
                 self._cache["settings"] = settings
@@ -63,11 +62,11 @@ class SettingsService:
             logger.warning(f"SettingsService.get_settings failed: {e}")
         return self._cache.get("settings", dict(_DEFAULTS))
 
-    def update_settings(self, patch: dict) -> dict:
+    async def update_settings(self, patch: dict) -> dict:
         if not self._client:
             return dict(_DEFAULTS)
         try:
-            result = self._client.table("personality_settings").update(patch).eq("id", 1).execute()
+            result = await self._client.table("personality_settings").update(patch).eq("id", 1).execute()
             # Invalidate cache
             if "settings" in self._cache:
                 del self._cache["settings"]
@@ -77,7 +76,7 @@ class SettingsService:
             logger.error(f"SettingsService.update_settings failed: {e}")
         return dict(_DEFAULTS)
 
-    def get_api_keys(self) -> dict:
+    async def get_api_keys(self) -> dict:
         if not self._client:
             return dict(_KEY_DEFAULTS)
 
@@ -86,7 +85,7 @@ class SettingsService:
             return self._cache["keys"]
 
         try:
-            result = self._client.table("api_keys").select("*").eq("id", 1).single().execute()
+            result = await self._client.table("api_keys").select("*").eq("id", 1).single().execute()
             if result.data:
                 keys = {**_KEY_DEFAULTS, **result.data}
                 self._cache["keys"] = keys
@@ -96,11 +95,11 @@ class SettingsService:
             logger.warning(f"SettingsService.get_api_keys failed: {e}")
         return self._cache.get("keys", dict(_KEY_DEFAULTS))
 
-    def update_api_keys(self, patch: dict) -> dict:
+    async def update_api_keys(self, patch: dict) -> dict:
         if not self._client:
             return dict(_KEY_DEFAULTS)
         try:
-            result = self._client.table("api_keys").update(patch).eq("id", 1).execute()
+            result = await self._client.table("api_keys").update(patch).eq("id", 1).execute()
             # Invalidate cache
             if "keys" in self._cache:
                 del self._cache["keys"]
@@ -0,0 +1,275 @@
+"""
+In-process vector index for cosine similarity search.
+
+Rows live in one contiguous, L2-normalized float32 NumPy matrix, so cosine
+similarity is a single matrix-vector product.
+
+Small collections are searched exhaustively (exact). Once the index grows past
+`train_threshold` rows it trains an IVF (inverted file) coarse quantizer:
+  1. k-means clusters the rows into `nlist` centroids.
+  2. A query scores the centroids and probes only the `nprobe` closest lists.
+  3. Candidates from those lists are ranked exactly.
+
+Rows added after training are assigned to their nearest centroid. The
+quantizer is retrained whenever the index has doubled since the last training
+so cluster quality does not drift as memories accumulate.
+
+Called from a running event loop, add_many() trains in the background: k-means
+runs on a snapshot of the rows in a worker thread while searches keep using
+the previous state (or the exact scan), and the new quantizer is swapped in on
+the loop, with rows written meanwhile reassigned. Without a loop (scripts,
+benchmarks) train() runs inline.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Hashable, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_INITIAL_CAPACITY = 1024
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE = 20_000   # max rows used to train the quantizer
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index keyed by row id.
+    `payload` is whatever the caller wants back from a search (e.g. memory content).
+    """
+
+    def __init__(
+        self,
+        dim: int | None = None,
+        *,
+        nlist: int | None = None,
+        nprobe: int = 8,
+        train_threshold: int = 4096,
+        seed: int = 0,
+    ):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self._rng = np.random.default_rng(seed)
+
+        self._vectors: np.ndarray | None = None
+        self._size = 0
+        self._keys: list[Hashable] = []
+        self._payloads: list[Any] = []
+        self._rows: dict[Hashable, int] = {}
+
+        # IVF state — populated by train()
+        self._centroids: np.ndarray | None = None
+        self._assign: np.ndarray | None = None   # list id per row
+        self._trained_size = 0
+        self._training: asyncio.Task | None = None
+        self._dirty: set[int] | None = None      # rows written while a background training runs
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    # ── Mutation ──────────────────────────────────────────────────────────────
+
+    def add(self, key: Hashable, vector: Iterable[float], payload: Any = None) -> None:
+        self.add_many([key], [vector], [payload])
+
+    def add_many(self, keys: list[Hashable], vectors, payloads: list[Any] | None = None) -> None:
+        if not keys:
+            return
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1))
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dim}")
+
+        payloads = payloads if payloads is not None else [None] * len(keys)
+        for key, vec, payload in zip(keys, matrix, payloads):
+            row = self._rows.get(key)
+            if row is None:
+                row = self._append_row()
+                self._rows[key] = row
+                self._keys.append(key)
+                self._payloads.append(payload)
+            else:
+                self._payloads[row] = payload
+            self._vectors[row] = vec
+            if self._assign is not None:
+                self._assign[row] = self._nearest_list(vec)
+            if self._dirty is not None:
+                self._dirty.add(row)
+
+        if self._size >= self.train_threshold and self._size >= 2 * self._trained_size and self._training is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self.train()
+            else:
+                self._training = asyncio.create_task(self.train_async())
+
+    def remove(self, key: Hashable) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        last = self._size - 1
+        if row != last:
+            # Swap the last row into the hole so the matrix stays dense
+            moved_key = self._keys[last]
+            self._vectors[row] = self._vectors[last]
+            self._keys[row] = moved_key
+            self._payloads[row] = self._payloads[last]
+            if self._assign is not None:
+                self._assign[row] = self._assign[last]
+            if self._dirty is not None:
+                self._dirty.add(row)
+            self._rows[moved_key] = row
+
+        self._keys.pop()
+        self._payloads.pop()
+        self._size -= 1
+        return True
+
+    def clear(self) -> None:
+        self.__init__(self.dim, nlist=self.nlist, nprobe=self.nprobe, train_threshold=self.train_threshold)
+
+    # ── Search ────────────────────────────────────────────────────────────────
+
+    def search(self, query: Iterable[float], k: int = 3, *, nprobe: int | None = None) -> list[tuple[Hashable, float, Any]]:
+        """Approximate top-k by cosine similarity. Exact until the quantizer is trained."""
+        if self._size == 0 or k <= 0:
+            return []
+        q = self._prepare_query(query)
+
+        if self._centroids is None:
+            return self._rank(q, np.arange(self._size), k)
+
+        probes = min(nprobe or self.nprobe, len(self._centroids))
+        centroid_scores = self._centroids @ q
+        lists = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        candidates = np.flatnonzero(np.isin(self._assign[:self._size], lists))
+        return self._rank(q, candidates, k)
+
+    def search_exact(self, query: Iterable[float], k: int = 3) -> list[tuple[Hashable, float, Any]]:
+        """Brute-force top-k — the ground truth the IVF path approximates."""
+        if self._size == 0 or k <= 0:
+            return []
+        return self._rank(self._prepare_query(query), np.arange(self._size), k)
+
+    # ── IVF training ──────────────────────────────────────────────────────────
+
+    def train(self) -> None:
+        """(Re)build the coarse quantizer with spherical k-means over the current rows."""
+        n = self._size
+        fitted = self._fit(self._vectors[:n])
+        if fitted is None:
+            return
+        centroids, assign = fitted
+        self._centroids = centroids
+        self._assign = np.empty(len(self._vectors), dtype=np.int32)
+        self._assign[:n] = assign
+        self._trained_size = n
+        logger.info(f"[vector_index] trained IVF quantizer: {n} rows, {len(centroids)} lists")
+
+    async def train_async(self) -> None:
+        """train() with the k-means in a worker thread; the result is swapped in on the loop."""
+        task = asyncio.current_task()
+        n = self._size
+        self._dirty = set()
+        try:
+            fitted = await asyncio.to_thread(self._fit, self._vectors[:n].copy())
+        except Exception as e:
+            logger.error(f"[vector_index] background training failed: {e}")
+            fitted = None
+        if self._training is not task:
+            return                      # cleared while training
+        dirty, self._dirty, self._training = self._dirty, None, None
+        if fitted is None:
+            return
+
+        # Rows added, replaced or moved since the snapshot get their list from the new centroids
+        centroids, assign = fitted
+        size = self._size
+        kept = min(n, size)
+        rows = sorted({row for row in dirty if row < size} | set(range(kept, size)))
+        self._assign = np.empty(len(self._vectors), dtype=np.int32)
+        self._assign[:kept] = assign[:kept]
+        if rows:
+            self._assign[rows] = np.argmax(self._vectors[rows] @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._trained_size = n
+        logger.info(f"[vector_index] trained IVF quantizer in background: {n} rows, {len(centroids)} lists")
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _fit(self, data: np.ndarray) -> tuple[np.ndarray, np.ndarray] | None:
+        """Spherical k-means over `data`: (centroids, list id per row), or None if too few rows."""
+        n = len(data)
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        if n < nlist:
+            return None
+
+        sample = data if n <= _KMEANS_SAMPLE else data[self._rng.choice(n, _KMEANS_SAMPLE, replace=False)]
+        centroids = sample[self._rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(_KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        return centroids, np.argmax(data @ centroids.T, axis=1)
+
+    def _append_row(self) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros((_INITIAL_CAPACITY, self.dim), dtype=np.float32)
+        elif self._size == len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+            if self._assign is not None:
+                assign = np.empty(len(grown), dtype=np.int32)
+                assign[:self._size] = self._assign[:self._size]
+                self._assign = assign
+        row = self._size
+        self._size += 1
+        return row
+
+    def _nearest_list(self, vec: np.ndarray) -> int:
+        return int(np.argmax(self._centroids @ vec))
+
+    def _prepare_query(self, query: Iterable[float]) -> np.ndarray:
+        q = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        if q.shape[0] != self.dim:
+            raise ValueError(f"Query dimension {q.shape[0]} does not match index dimension {self.dim}")
+        return q
+
+    def _rank(self, q: np.ndarray, candidates: np.ndarray, k: int) -> list[tuple[Hashable, float, Any]]:
+        if len(candidates) == 0:
+            return []
+        scores = self._vectors[candidates] @ q
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self._keys[row], float(scores[i]), self._payloads[row])
+            for i, row in zip(top, candidates[top])
+        ]
@@ -0,0 +1,177 @@
+"""
+Write-behind batching queue for chat persistence.
+
+Every chat turn used to await two message inserts and two
+`conversations.updated_at` touches before the reply was done. Writes now go
+into a WriteBehindQueue and return immediately; a background worker hands
+them to the flush callback in batches:
+
+  • when MEMORY_WRITE_BATCH items are pending (size)
+  • every MEMORY_WRITE_INTERVAL seconds (time)
+  • on aclose() from the FastAPI lifespan (shutdown)
+
+A failed flush keeps its items at the head of the queue and is retried on
+the next tick. After MEMORY_WRITE_MAX_RETRIES consecutive failures the
+batch is dropped and logged, so one bad row cannot wedge the queue.
+
+Crash safety: with a journal path set, every item is appended to a JSONL
+file before put() returns, and the file is rewritten with whatever is
+still pending after each successful flush. A new queue replays the
+journal on start-up. Callers make replays idempotent by giving rows
+client-side ids and inserting with ignore-duplicates upserts.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list[dict]], Awaitable[None]],
+        max_batch: int = 200,
+        interval: float = 1.0,
+        max_retries: int = 5,
+        journal: str | Path | None = None,
+    ):
+        self.name = name
+        self.max_batch = max(1, max_batch)
+        self.interval = interval
+        self.max_retries = max_retries
+        self._flush = flush
+        self._pending: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._failures = 0
+
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+
+        self._journal_path = Path(journal) if journal else None
+        self._journal = None
+        if self._journal_path is not None:
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._pending = self._read_journal()
+            if self._pending:
+                logger.warning(f"Write-behind {name}: replaying {len(self._pending)} journaled writes")
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending(self) -> list[dict]:
+        """Items not yet flushed, oldest first (including a batch being written)."""
+        return list(self._pending)
+
+    def put(self, item: dict) -> None:
+        if self._journal_path is not None:
+            if self._journal is None:
+                self._journal = open(self._journal_path, "a", encoding="utf-8")
+            self._journal.write(json.dumps(item) + "\n")
+            self._journal.flush()
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+        self.start()
+
+    def start(self) -> None:
+        """Start the flush worker (idempotent; needs a running event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._worker.get_loop() is loop:
+            return
+        if self._worker is not None:
+            # Module-level singletons can outlive a loop (tests, TestClient)
+            self._lock, self._wake = asyncio.Lock(), asyncio.Event()
+        self._worker = loop.create_task(self._run())
+
+    async def flush(self) -> int:
+        """Flush everything pending. Returns the number of items written."""
+        written = 0
+        async with self._lock:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                try:
+                    await self._flush(batch)
+                except Exception as e:
+                    self._failures += 1
+                    if self._failures < self.max_retries:
+                        logger.error(f"Write-behind {self.name}: flush of {len(batch)} failed "
+                                     f"(attempt {self._failures}/{self.max_retries}): {e}")
+                        break
+                    logger.error(f"Write-behind {self.name}: dropping {len(batch)} writes after "
+                                 f"{self._failures} failed attempts: {e}")
+                    self.dropped += len(batch)
+                else:
+                    written += len(batch)
+                    self.flushed += len(batch)
+                    self.batches += 1
+                # Only appends happen concurrently, so the head is still our batch
+                del self._pending[:len(batch)]
+                self._failures = 0
+                self._rewrite_journal()
+        return written
+
+    async def aclose(self) -> None:
+        """Stop the worker and flush what is left (called on shutdown)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "journal": str(self._journal_path) if self._journal_path else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+
+    def _read_journal(self) -> list[dict]:
+        if not self._journal_path.exists():
+            return []
+        items = []
+        with open(self._journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Write-behind {self.name}: skipping torn journal line")
+        return items
+
+    def _rewrite_journal(self) -> None:
+        if self._journal_path is None:
+            return
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        tmp = self._journal_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(item) + "\n" for item in self._pending)
+        os.replace(tmp, self._journal_path)
@@ -1,3 +1,68 @@
+import re
+
+# Keyword lexicon for the brain's emotion tags. Seeded from the voice agent's
+# VTubeController.emotion_keywords (smile → happy, angry → serious,
+# pupil_shrink/ghost → excited, ghost_nervous → confused) so text and voice
+# sessions read the user's mood the same way.
+EMOTION_KEYWORDS = {
+    "happy": [
+        "smile", "smiling", "grin", "chuckle", "giggle", "teehee", "hehe", "haha", "happy", "glad",
+        "yay", "joy", "thanks", "thank you", "love", "great", "nice", "lol", "good morning",
+        "嬉しい", "ありがとう", "楽しい",
+    ],
+    "sad": [
+        "sad", "sadly", "sorry", "unfortunate", "regret", "miss", "lonely", "cry", "crying",
+        "miserable", "depressed", "upset", "heartbroken", "lost", "悲しい", "寂しい",
+    ],
+    "serious": [
+        "angry", "mad", "annoyed", "frustrated", "hate", "furious", "terrible", "disappointed",
+        "serious", "cold", "important", "urgent", "deadline", "error", "bug", "broken", "fix",
+    ],
+    "excited": [
+        "prank", "mischief", "cheeky", "surprise", "surprised", "ghost", "boo", "spooky",
+        "wow", "amazing", "awesome", "excited", "can't wait", "finally", "incredible", "すごい",
+    ],
+    "confused": [
+        "nervous", "flustered", "embarrassed", "confused", "confusing", "huh", "what do you mean",
+        "don't understand", "don't get", "not sure", "unclear", "why", "how do", "わからない",
+    ],
+    "dizzy": [
+        "dizzy", "shocked", "shook", "overwhelmed", "exhausted", "tired", "sleepy", "too much",
+        "spinning", "headache",
+    ],
+}
+
+
+def _is_cjk(word: str) -> bool:
+    return any('\u3040' <= ch <= '\u30ff' or '\u4e00' <= ch <= '\u9fff' for ch in word)
+
+
 class EmotionMapper:
+    def __init__(self, keywords: dict[str, list[str]] = EMOTION_KEYWORDS):
+        # One alternation per emotion; CJK has no word boundaries so match it raw
+        self._patterns = {}
+        for emotion, words in keywords.items():
+            latin = [re.escape(w) for w in words if not _is_cjk(w)]
+            cjk = [re.escape(w) for w in words if _is_cjk(w)]
+            parts = []
+            if latin:
+                parts.append(rf"\b(?:{'|'.join(latin)})\b")
+            if cjk:
+                parts.append("|".join(cjk))
+            self._patterns[emotion] = re.compile("|".join(parts), re.IGNORECASE)
+
+    def classify(self, text: str) -> tuple[str | None, float]:
+        """Return (emotion, confidence). Confidence is the winner's share of keyword hits."""
+        counts = {emotion: len(p.findall(text or "")) for emotion, p in self._patterns.items()}
+        total = sum(counts.values())
+        if not total:
+            return None, 0.0
+        emotion = max(counts, key=counts.get)
+        return emotion, counts[emotion] / total
+
     def map(self, text: str) -> str:
-        return "neutral"
+        emotion, _ = self.classify(text)
+        return emotion or "neutral"
+
+
+emotion_mapper = EmotionMapper()
@@ -0,0 +1,90 @@
+"""
+Accuracy / latency benchmark — local emotion engines vs the LLM node.
+
+The LLM column is only measured with --llm (it makes real provider calls
+using the keys in .env / the dashboard).
+
+Run:
+    cd ai-service
+    python benchmarks/bench_emotion.py
+    python benchmarks/bench_emotion.py --llm
+    EMOTION_MODEL_PATH=emotion.joblib python benchmarks/bench_emotion.py
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.emotion_classifier import LexiconEngine, SklearnEngine, llm_classify  # noqa: E402
+
+LABELED = [
+    ("Hey AURA, good morning! Thanks for yesterday.", "happy"),
+    ("Haha you're hilarious, I love it", "happy"),
+    ("I'm glad the demo went well", "happy"),
+    ("I feel so lonely since my friend moved away", "sad"),
+    ("Sadly I failed my exam", "sad"),
+    ("I'm sorry, I really miss how things were", "sad"),
+    ("The build is broken and the deadline is tomorrow", "serious"),
+    ("I'm really annoyed, this error keeps coming back", "serious"),
+    ("This is important, please be precise", "serious"),
+    ("Wow, we finally got the robot walking!", "excited"),
+    ("That's amazing news, I can't wait!", "excited"),
+    ("Boo! Did I scare you?", "excited"),
+    ("Huh? What do you mean by that?", "confused"),
+    ("I don't understand how pgvector works", "confused"),
+    ("I'm not sure which option to pick", "confused"),
+    ("Too much information, my head is spinning", "dizzy"),
+    ("I'm exhausted after that marathon lab session", "dizzy"),
+    ("So many tasks, I'm overwhelmed", "dizzy"),
+    ("今日は楽しい！", "happy"),
+    ("すごい、本当に？", "excited"),
+]
+
+
+def _report(name, predictions, latencies):
+    correct = sum(p == gold for p, (_, gold) in zip(predictions, LABELED))
+    ms = [t * 1000 for t in latencies]
+    print(
+        f"{name:<8} accuracy={correct / len(LABELED):.2f}  "
+        f"p50={statistics.median(ms):9.3f} ms  max={max(ms):9.3f} ms"
+    )
+
+
+def _bench_local(engine):
+    predictions, latencies = [], []
+    for text, _ in LABELED:
+        t = time.perf_counter()
+        emotion, _ = engine.classify(text)
+        latencies.append(time.perf_counter() - t)
+        predictions.append(emotion or "neutral")
+    _report(engine.name, predictions, latencies)
+
+
+async def _bench_llm():
+    predictions, latencies = [], []
+    for text, _ in LABELED:
+        t = time.perf_counter()
+        predictions.append(await llm_classify(text))
+        latencies.append(time.perf_counter() - t)
+    _report("llm", predictions, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also measure the LLM classification node")
+    args = parser.parse_args()
+
+    _bench_local(LexiconEngine())
+    if settings.EMOTION_MODEL_PATH:
+        _bench_local(SklearnEngine(settings.EMOTION_MODEL_PATH))
+    if args.llm:
+        asyncio.run(_bench_llm())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Recall / latency benchmark — vector-only vs BM25 vs hybrid (RRF) retrieval.
+
+Synthetic corpus: every document is a bag of topical words plus one unique
+identifier — a course code ("ASE-30412") or a Japanese name ("田中研究室").
+Topical words come in synonym groups that share an embedding direction. The
+stand-in embedder only knows the topical vocabulary, so identifiers are
+invisible to it, the way real embeddings blur rare codes and names.
+
+Two query mixes, half each:
+  • identifier — the document's code / name plus one of its words
+  • paraphrase — a few of its words swapped for synonyms (no lexical overlap)
+
+recall@k is the share of queries whose target lands in the top k.
+
+Run:
+    cd ai-service
+    python benchmarks/bench_hybrid_search.py
+    python benchmarks/bench_hybrid_search.py --docs 100000 --queries 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.lexical_index import BM25Index, rrf_fuse  # noqa: E402
+
+DIM = 256
+SYNONYMS = 4          # words per synonym group
+KANJI = "田中山川佐藤鈴木高橋伊渡辺小林加松井上森本清水池野村"
+
+
+def build_corpus(args, rng: random.Random):
+    vocab = [f"w{i}" for i in range(args.vocab)]
+    weights = [(rank + 1) ** -0.5 for rank in range(args.vocab)]   # mild Zipf
+    docs, ids = [], []
+    for i in range(args.docs):
+        if i % 2:
+            ident = "".join(rng.choice(KANJI) for _ in range(3)) + f"研究室{i}"
+        else:
+            ident = f"{rng.choice(['ASE', 'CSC', 'MAT', 'PHY'])}-{i:05d}"
+        words = rng.choices(vocab, weights, k=args.words)
+        docs.append(words)
+        ids.append(ident)
+    return vocab, docs, ids
+
+
+def synonym(word: str, rng: random.Random) -> str:
+    i = int(word[1:])
+    group = i - i % SYNONYMS
+    return f"w{rng.choice([j for j in range(group, group + SYNONYMS) if j != i])}"
+
+
+def embed(words, table, noise, rng: np.random.Generator) -> np.ndarray:
+    vec = table[[int(w[1:]) for w in words]].sum(axis=0) + rng.normal(0, noise, DIM)
+    return vec / (np.linalg.norm(vec) or 1.0)
+
+
+def percentile(values, q):
+    return float(np.percentile(np.array(values) * 1000, q))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=12, help="topical words per document")
+    parser.add_argument("--query-words", type=int, default=4, help="topical words per paraphrase query")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--candidates", type=int, default=20, help="per-retriever depth before fusion")
+    parser.add_argument("--rrf-k", type=int, default=settings.HYBRID_RRF_K)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    nprng = np.random.default_rng(args.seed)
+    vocab, docs, idents = build_corpus(args, rng)
+    groups = nprng.normal(0, 1, (len(vocab) // SYNONYMS + 1, DIM))
+    table = (groups[np.arange(len(vocab)) // SYNONYMS] + nprng.normal(0, 0.3, (len(vocab), DIM))).astype(np.float32)
+    matrix = np.stack([embed(words, table, 0.0, nprng) for words in docs]).astype(np.float32)
+
+    start = time.perf_counter()
+    index = BM25Index()
+    index.add_many((i, " ".join(words) + " " + ident) for i, (words, ident) in enumerate(zip(docs, idents)))
+    build_s = time.perf_counter() - start
+    print(f"{args.docs} docs, vocab {args.vocab}, {args.queries} queries, RRF k={args.rrf_k} — BM25 build {build_s:.2f} s, "
+          f"postings {index.memory_bytes() / 2**20:.1f} MiB")
+
+    ks = (1, 5, 10)
+    kinds = ("identifier", "paraphrase")
+    hits = {(kind, name): dict.fromkeys(ks, 0) for kind in kinds for name in ("vector", "bm25", "hybrid")}
+    timings = {"vector": [], "bm25": [], "rrf": []}
+    depth = max(args.candidates, max(ks))
+
+    for n in range(args.queries):
+        kind = kinds[n % 2]
+        target = rng.randrange(args.docs)
+        if kind == "identifier":
+            words = rng.sample(docs[target], 1)
+            text = " ".join(words) + " " + idents[target]
+        else:
+            words = [synonym(word, rng) for word in rng.sample(docs[target], args.query_words)]
+            text = " ".join(words)
+
+        start = time.perf_counter()
+        scores = matrix @ embed(words, table, args.noise, nprng)
+        top = np.argpartition(-scores, depth)[:depth]
+        vector = [int(i) for i in top[np.argsort(-scores[top])]]
+        timings["vector"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        lexical = [key for key, _ in index.search(text, depth)]
+        timings["bm25"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        hybrid = rrf_fuse(vector, lexical, k=args.rrf_k, limit=max(ks))
+        timings["rrf"].append(time.perf_counter() - start)
+
+        for name, ranking in (("vector", vector), ("bm25", lexical), ("hybrid", hybrid)):
+            for k in ks:
+                hits[kind, name][k] += target in ranking[:k]
+
+    per_kind = args.queries / len(kinds)
+    print(f"\n{'queries':<12}{'retriever':<10}" + "".join(f"{f'recall@{k}':>11}" for k in ks))
+    for (kind, name), counts in hits.items():
+        print(f"{kind:<12}{name:<10}" + "".join(f"{counts[k] / per_kind:>11.3f}" for k in ks))
+    for name in ("vector", "bm25", "hybrid"):
+        total = [sum(hits[kind, name][k] for kind in kinds) / args.queries for k in ks]
+        print(f"{'all':<12}{name:<10}" + "".join(f"{r:>11.3f}" for r in total))
+
+    print(f"\n{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, values in timings.items():
+        print(f"{name:<10}{percentile(values, 50):>10.3f}{percentile(values, 95):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compaction benchmark — table size and search latency before / after one pass.
+
+Synthetic per-turn memories for --users users: each user's turns are drawn
+from --topics topics (an embedding direction each, plus noise), so most
+rows are near-duplicates of earlier turns, like endless "hi" / "hello".
+Timestamps spread over --days days, so retention also has work to do.
+
+Runs MemoryCompactor.compact() against the in-memory Supabase fake and
+reports rows kept, merged and expired, the requests the pass issued, and
+local index search latency for one user before and after. (Wall time is
+not reported: it would measure the fake's linear scans.)
+
+Run:
+    cd ai-service
+    python benchmarks/bench_memory_compaction.py
+    python benchmarks/bench_memory_compaction.py --users 50 --turns 2000 --noise 0.005
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "packages" / "aura-memory"))
+
+from app.core.config import settings  # noqa: E402
+from app.services.memory_compaction import MemoryCompactor  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+from app.services.partitioned_index import PartitionedVectorIndex, memory_partition, search_partitions  # noqa: E402
+from aura_memory.testing import FakeSupabase  # noqa: E402
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def _seed(memory: MemoryService, args) -> None:
+    rng = np.random.default_rng(0)
+    now = datetime.now(timezone.utc)
+    topics = _unit(rng.standard_normal((args.topics, args.dim)))
+    rows = memory.client.tables["memories"]
+    for user in range(args.users):
+        metadata = {"identity": f"user-{user}"}
+        picks = rng.integers(0, args.topics, args.turns)
+        vectors = _unit(topics[picks] + args.noise * rng.standard_normal((args.turns, args.dim)))
+        ages = np.sort(rng.uniform(0, args.days, args.turns))[::-1]
+        for i, (vector, age) in enumerate(zip(vectors, ages)):
+            row_id = len(rows) + 1
+            rows.append({
+                "id": row_id, "content": f"user {user} turn {i}", "embedding": vector.tolist(),
+                "metadata": dict(metadata), "created_at": (now - timedelta(days=float(age))).isoformat(),
+            })
+            memory.index.add_many([memory_partition(metadata)], [row_id], [vector], [f"user {user} turn {i}"])
+
+
+def _search_ms(memory: MemoryService, args) -> float:
+    rng = np.random.default_rng(1)
+    partitions = search_partitions("user-0")
+    samples = []
+    for query in _unit(rng.standard_normal((200, args.dim))):
+        start = time.perf_counter()
+        memory.index.search(partitions, query, 20)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=1000, help="memories per user")
+    parser.add_argument("--topics", type=int, default=60, help="distinct topics per user")
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--days", type=float, default=365.0, help="age of the oldest turn")
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    settings.MEMORY_COMPACT_PAUSE = 0.0
+    memory = MemoryService.__new__(MemoryService)
+    memory.client = FakeSupabase()
+    memory.index = PartitionedVectorIndex()
+    memory._index_loading = memory.lexical = memory._lexical_loading = None
+    _seed(memory, args)
+
+    before = len(memory.client.rows("memories"))
+    search_before = _search_ms(memory, args)
+    compactor = MemoryCompactor(memory)
+    counts = asyncio.run(compactor.compact())
+    after = len(memory.client.rows("memories"))
+
+    print(f"{args.users} users × {args.turns} turns, {args.topics} topics, noise {args.noise}, "
+          f"batch {settings.MEMORY_COMPACT_BATCH}, similarity {settings.MEMORY_COMPACT_SIMILARITY}")
+    print(f"rows      {before:>8,d} → {after:,d}  (merged {counts['merged']:,d}, expired {counts['expired']:,d})")
+    print(f"pass      {memory.client.calls[('memories', 'select')]} batches, "
+          f"{memory.client.calls[('memories', 'update')]} merged-row updates, "
+          f"{memory.client.calls[('memories', 'delete')]} deletes")
+    print(f"search    p50 {search_before:.3f} ms → {_search_ms(memory, args):.3f} ms  (user-0, k=20)")
+
+
+if __name__ == "__main__":
+    main()
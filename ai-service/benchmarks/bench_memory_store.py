@@ -0,0 +1,107 @@
+"""
+Throughput benchmark — MemoryService.store_many vs one store() per chunk.
+
+The per-chunk loop is what /api/v1/memory/upload used to do: one embedding
+request plus one insert per chunk, all serial. store_many embeds and
+inserts MEMORY_STORE_BATCH chunks per request, with several batches in
+flight. A stub embedder and Supabase client add fixed per-request latency,
+so no keys or database are needed.
+
+Run:
+    cd ai-service
+    python benchmarks/bench_memory_store.py
+    python benchmarks/bench_memory_store.py --chunks 1000 --embed-latency 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+
+
+class StubEmbeddings:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return [0.0] * 8
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency)
+        return [[0.0] * 8 for _ in texts]
+
+
+class StubClient:
+    """Awaitable insert with fixed latency, like the async Supabase client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.rows = 0
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        rows = rows if isinstance(rows, list) else [rows]
+        return SimpleNamespace(execute=lambda: self._insert(rows))
+
+    async def _insert(self, rows):
+        await asyncio.sleep(self.latency)
+        start = self.rows
+        self.rows += len(rows)
+        return SimpleNamespace(data=[{"id": start + i, **row} for i, row in enumerate(rows)])
+
+
+def _service(args) -> MemoryService:
+    service = MemoryService.__new__(MemoryService)
+    service.client = StubClient(args.insert_latency)
+    service.embeddings = StubEmbeddings(args.embed_latency)
+    service.index = None
+    service._index_loading = None
+    service.lexical = None
+    service._lexical_loading = None
+    return service
+
+
+async def per_chunk(service, chunks):
+    for chunk in chunks:
+        await service.store(text=chunk, metadata={"source": "bench.pdf", "type": "document"})
+
+
+async def bulk(service, chunks):
+    await service.store_many(chunks, metadata={"source": "bench.pdf", "type": "document"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--embed-latency", type=float, default=0.1, help="seconds per embedding request")
+    parser.add_argument("--insert-latency", type=float, default=0.03, help="seconds per insert request")
+    parser.add_argument("--batch", type=int, default=settings.MEMORY_STORE_BATCH)
+    parser.add_argument("--concurrency", type=int, default=settings.MEMORY_STORE_CONCURRENCY)
+    args = parser.parse_args()
+    settings.MEMORY_STORE_BATCH = args.batch
+    settings.MEMORY_STORE_CONCURRENCY = args.concurrency
+    settings.MEMORY_WRITE_BEHIND = False     # time the direct store() path, not the queue
+
+    chunks = [f"chunk {i}: " + "lorem ipsum " * 40 for i in range(args.chunks)]
+    print(f"{args.chunks} chunks, embed {args.embed_latency * 1000:.0f} ms, insert {args.insert_latency * 1000:.0f} ms, "
+          f"batch {args.batch}, concurrency {args.concurrency}")
+
+    for name, run in (("store()", per_chunk), ("store_many", bulk)):
+        service = _service(args)
+        start = time.perf_counter()
+        asyncio.run(run(service, chunks))
+        elapsed = time.perf_counter() - start
+        print(f"{name:<11} {elapsed:7.2f} s  {service.client.rows / elapsed:9.1f} chunks/s  ({service.client.rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Scaling benchmark — memory search latency vs other users' data volume.
+
+One user owns --own memories; the other users' rows grow through --others.
+For each volume, --queries searches on behalf of that user are timed with:
+
+  global        one index over every row (the old single VectorIndex /
+                `match_memories` over the whole table)
+  partitioned   identity shards, search reads the caller's shard + shared
+
+Default mode is the in-process indexes (PartitionedVectorIndex vs one
+VectorIndex; random unit vectors of --dim). With --supabase-url / --key the
+same comparison runs against a real Postgres + pgvector behind PostgREST,
+e.g. a local `supabase start` stack with sql/memory_partitions.sql applied:
+rows are inserted into `memories` and the two RPCs `match_memories` and
+`match_memories_partitioned` are timed. That mode writes to the table —
+point it at a throwaway database.
+
+Run:
+    cd ai-service
+    python benchmarks/bench_partitioned_search.py
+    python benchmarks/bench_partitioned_search.py --others 0 10000 100000 500000
+    python benchmarks/bench_partitioned_search.py --supabase-url http://127.0.0.1:54321 --key <service key> --dim 1536
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "packages" / "aura-memory"))
+
+from app.services.partitioned_index import PartitionedVectorIndex, memory_partition, search_partitions  # noqa: E402
+from app.services.vector_index import VectorIndex  # noqa: E402
+
+USERS = 100           # other users the foreign rows are spread over
+_INSERT_BATCH = 500
+
+
+def _vectors(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _metadata(i: int, owner: bool) -> dict:
+    return {"identity": "bench-owner" if owner else f"bench-user-{i % USERS}", "type": "bench"}
+
+
+def _ms(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(s * 1000 for s in samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def _report(others: int, name: str, samples: list[float]) -> None:
+    p50, p99 = _ms(samples)
+    print(f"{others:>10,d}  {name:<12} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+# ── In-process indexes ────────────────────────────────────────────────────────
+
+def run_local(args) -> None:
+    rng = np.random.default_rng(0)
+    global_index = VectorIndex()
+    partitioned = PartitionedVectorIndex()
+    own = _vectors(rng, args.own, args.dim)
+    keys = [f"own-{i}" for i in range(args.own)]
+    partitions = [memory_partition(_metadata(i, True)) for i in range(args.own)]
+    global_index.add_many(keys, own, keys)
+    partitioned.add_many(partitions, keys, own, keys)
+
+    searched = search_partitions("bench-owner")
+    queries = _vectors(rng, args.queries, args.dim)
+    loaded = 0
+    for target in sorted(args.others):
+        while loaded < target:
+            n = min(10_000, target - loaded)
+            vectors = _vectors(rng, n, args.dim)
+            keys = [f"other-{loaded + i}" for i in range(n)]
+            partitions = [memory_partition(_metadata(loaded + i, False)) for i in range(n)]
+            global_index.add_many(keys, vectors, keys)
+            partitioned.add_many(partitions, keys, vectors, keys)
+            loaded += n
+
+        for name, search in (
+            ("global", lambda q: global_index.search(q, args.k)),
+            ("partitioned", lambda q: partitioned.search(searched, q, args.k)),
+        ):
+            samples = []
+            for q in queries:
+                start = time.perf_counter()
+                search(q)
+                samples.append(time.perf_counter() - start)
+            _report(target, name, samples)
+
+
+# ── Postgres + pgvector through PostgREST ─────────────────────────────────────
+
+async def run_supabase(args) -> None:
+    from aura_memory import close_async_client, create_async_client
+
+    client = create_async_client(args.supabase_url, args.key)
+    rng = np.random.default_rng(0)
+
+    async def insert(vectors: np.ndarray, offset: int, owner: bool) -> None:
+        for start in range(0, len(vectors), _INSERT_BATCH):
+            batch = vectors[start:start + _INSERT_BATCH]
+            await client.table("memories").insert([
+                {"content": f"bench {offset + start + i}", "embedding": vec.tolist(),
+                 "metadata": _metadata(offset + start + i, owner)}
+                for i, vec in enumerate(batch)
+            ]).execute()
+
+    try:
+        await client.table("memories").delete().eq("metadata->>type", "bench").execute()
+        await insert(_vectors(rng, args.own, args.dim), 0, True)
+        queries = [q.tolist() for q in _vectors(rng, args.queries, args.dim)]
+        loaded = 0
+        for target in sorted(args.others):
+            if target > loaded:
+                await insert(_vectors(rng, target - loaded, args.dim), loaded, False)
+                loaded = target
+
+            for name, rpc, extra in (
+                ("global", "match_memories", {}),
+                ("partitioned", "match_memories_partitioned", {"partitions": search_partitions("bench-owner")}),
+            ):
+                samples = []
+                for q in queries:
+                    start = time.perf_counter()
+                    await client.rpc(rpc, {"query_embedding": q, "match_count": args.k, **extra}).execute()
+                    samples.append(time.perf_counter() - start)
+                _report(target, name, samples)
+    finally:
+        await client.table("memories").delete().eq("metadata->>type", "bench").execute()
+        await close_async_client(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--own", type=int, default=500, help="memories of the searching user")
+    parser.add_argument("--others", type=int, nargs="+", default=[0, 10_000, 50_000, 200_000],
+                        help="other users' memories, cumulative steps")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20, help="candidates per search")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--supabase-url", default="", help="PostgREST / Supabase URL (pgvector mode)")
+    parser.add_argument("--key", default="", help="service key for --supabase-url")
+    args = parser.parse_args()
+
+    mode = f"pgvector at {args.supabase_url}" if args.supabase_url else "in-process indexes"
+    print(f"{mode}: {args.own} own memories, dim {args.dim}, k {args.k}, {args.queries} queries per step")
+    print(f"{'others':>10}  {'search':<12} latency")
+    if args.supabase_url:
+        asyncio.run(run_supabase(args))
+    else:
+        run_local(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Throughput benchmark — staged RAG ingestion pipeline vs the original path.
+
+The original path (reproduced below) concatenates the whole document with
+`text += ...`, splits it, then embeds and inserts 100-chunk batches one
+after another. The pipeline streams pages through an incremental splitter
+into concurrent embedding workers and batched inserts.
+
+A local stub embedder and table simulate network latency, so no API keys or
+database are needed.
+
+Run:
+    cd ai-service
+    python benchmarks/bench_rag_ingest.py
+    python benchmarks/bench_rag_ingest.py --pages 1000 --embed-latency 0.4
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pypdf  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.rag_service import RAGService  # noqa: E402
+from pdf_fixture import make_pdf  # noqa: E402
+
+
+class StubEmbeddings:
+    """Fixed latency per request, like a remote embedding API."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [[0.0] * 8 for _ in texts]
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency)
+        return [[0.0] * 8 for _ in texts]
+
+
+class StubTable:
+    """Fixed latency per insert request; `execute` is awaited, like the async Supabase client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.rows = 0
+        self._pending = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self._pending = rows
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(self.latency)
+        self.rows += len(self._pending)
+        return SimpleNamespace(data=[])
+
+
+class SyncStubTable(StubTable):
+    """The blocking sync client the original path used."""
+
+    def execute(self):
+        time.sleep(self.latency)
+        self.rows += len(self._pending)
+        return SimpleNamespace(data=[])
+
+
+def legacy_add_document(service: RAGService, filepath: Path) -> int:
+    """The pre-pipeline implementation of RAGService.add_document."""
+    text = ""
+    with open(filepath, "rb") as f:
+        pdf = pypdf.PdfReader(f)
+        for page in pdf.pages:
+            extracted = page.extract_text()
+            if extracted:
+                text += extracted + "\n"
+
+    chunks = service.text_splitter.split_text(text)
+    batch_size = 100
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        vectors = service.embeddings.embed_documents(batch)
+        data = [{"content": b, "embedding": v, "metadata": {"source": filepath.name}} for b, v in zip(batch, vectors)]
+        service.client.table("documents").insert(data).execute()
+    return len(chunks)
+
+
+def _service(args, table=StubTable) -> RAGService:
+    service = RAGService()
+    service.embeddings = StubEmbeddings(args.embed_latency)
+    service.client = table(args.insert_latency)
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--embed-latency", type=float, default=0.25, help="seconds per embedding request")
+    parser.add_argument("--insert-latency", type=float, default=0.05, help="seconds per insert request")
+    parser.add_argument("--concurrency", type=int, default=settings.RAG_EMBED_CONCURRENCY)
+    args = parser.parse_args()
+    settings.RAG_EMBED_CONCURRENCY = args.concurrency
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(Path(tmp) / "textbook.pdf", pages=args.pages)
+        print(f"{args.pages} pages, embed latency {args.embed_latency * 1000:.0f} ms, "
+              f"insert latency {args.insert_latency * 1000:.0f} ms, concurrency {args.concurrency}")
+
+        service = _service(args, SyncStubTable)
+        start = time.perf_counter()
+        chunks = legacy_add_document(service, pdf)
+        legacy = time.perf_counter() - start
+        print(f"original   {legacy:7.2f} s  {chunks / legacy:8.1f} chunks/s  ({service.client.rows} rows)")
+
+        service = _service(args)
+        start = time.perf_counter()
+        job = asyncio.run(service.add_document(pdf, incremental=False))
+        pipelined = time.perf_counter() - start
+        print(f"pipeline   {pipelined:7.2f} s  {job.inserted / pipelined:8.1f} chunks/s  ({service.client.rows} rows)")
+        print(f"speedup    {legacy / pipelined:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Latency benchmark — local VectorIndex vs brute-force NumPy scan.
+
+Compares per-query latency and recall@k at embedding dimensions matching
+text-embedding-3-small. The `match_memories` RPC it replaces costs a full
+network round-trip (typically 50-200 ms) on top of the database scan.
+
+Run:
+    cd ai-service
+    python benchmarks/bench_vector_index.py --rows 50000 --dim 1536
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.vector_index import VectorIndex  # noqa: E402
+
+
+def _percentile(samples, pct):
+    return float(np.percentile(np.asarray(samples) * 1000, pct))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(max(8, args.rows // 200), args.dim))
+    data = (centers[rng.integers(0, len(centers), args.rows)] + 0.4 * rng.normal(size=(args.rows, args.dim))).astype(np.float32)
+    queries = data[rng.choice(args.rows, args.queries)] + 0.2 * rng.normal(size=(args.queries, args.dim))
+
+    t0 = time.perf_counter()
+    index = VectorIndex(nprobe=args.nprobe)
+    index.add_many(list(range(args.rows)), data)
+    if not index.is_trained:
+        index.train()
+    build_s = time.perf_counter() - t0
+
+    flat, ivf, hits = [], [], 0
+    for q in queries:
+        t = time.perf_counter()
+        exact = index.search_exact(q, args.k)
+        flat.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        approx = index.search(q, args.k)
+        ivf.append(time.perf_counter() - t)
+
+        hits += len({key for key, _, _ in exact} & {key for key, _, _ in approx})
+
+    print(f"rows={args.rows} dim={args.dim} k={args.k} nprobe={args.nprobe} build={build_s:.2f}s")
+    print(f"  brute force  p50={_percentile(flat, 50):7.3f} ms  p95={_percentile(flat, 95):7.3f} ms")
+    print(f"  IVF          p50={_percentile(ivf, 50):7.3f} ms  p95={_percentile(ivf, 95):7.3f} ms")
+    print(f"  recall@{args.k}     {hits / (args.k * args.queries):.3f}")
+
+
+if __name__ == "__main__":
+    main()
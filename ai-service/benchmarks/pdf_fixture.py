@@ -0,0 +1,74 @@
+"""
+Generates multi-page text PDFs for the ingestion / extraction benchmarks.
+
+Writes the PDF objects by hand (Helvetica text, one content stream per
+page), so no PDF-authoring package is needed. The text is deterministic for
+a given seed, and each page starts with "Page N" so ordering can be checked.
+
+Run:
+    cd ai-service
+    python benchmarks/pdf_fixture.py /tmp/textbook.pdf --pages 500
+"""
+import argparse
+import random
+from pathlib import Path
+
+_WORDS = (
+    "robot sensor actuator kinematics control loop feedback gradient neural network "
+    "embedding vector memory avatar speech latency throughput pipeline lab student "
+    "experiment torque servo camera lidar battery voltage signal filter kalman"
+).split()
+
+
+def page_lines(page: int, lines: int, rng: random.Random) -> list[str]:
+    body = [" ".join(rng.choice(_WORDS) for _ in range(12)) + "." for _ in range(lines - 1)]
+    return [f"Page {page}"] + body
+
+
+def make_pdf(path, pages: int = 300, lines: int = 40, seed: int = 0) -> Path:
+    rng = random.Random(seed)
+    path = Path(path)
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects: list[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for n in range(1, pages + 1):
+        page_obj, content_obj = len(objects) + 1, len(objects) + 2
+        kids.append(f"{page_obj} 0 R")
+        text = " T* ".join(f"({line}) Tj" for line in page_lines(n, lines, rng))
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td {text} ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    path.write_bytes(bytes(out))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--lines", type=int, default=40)
+    args = parser.parse_args()
+    make_pdf(args.path, args.pages, args.lines)
+    print(f"wrote {args.pages} pages to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
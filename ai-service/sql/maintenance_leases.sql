@@ -0,0 +1,36 @@
+-- Single-runner leases for background maintenance (MemoryCompactor).
+--
+-- Every uvicorn worker / replica starts the compaction loop; before a pass
+-- it calls try_maintenance_lease('memory_compaction', '<host>:<pid>', ttl).
+-- The call takes the lease when it is free, expired, or already held by the
+-- same holder (renewal), and returns false otherwise, so only one process
+-- compacts `memories` at a time. The upsert is a single statement, so two
+-- workers racing for an expired lease cannot both win.
+--
+-- Apply once in the Supabase SQL editor (or psql).
+
+create table if not exists maintenance_leases (
+  name text primary key,
+  holder text not null,
+  expires_at timestamptz not null
+);
+
+create or replace function try_maintenance_lease(
+  lease_name text,
+  lease_holder text,
+  ttl_seconds int
+)
+returns boolean
+language sql
+volatile
+as $$
+  with taken as (
+    insert into maintenance_leases as l (name, holder, expires_at)
+    values (lease_name, lease_holder, now() + make_interval(secs => ttl_seconds))
+    on conflict (name) do update
+      set holder = excluded.holder, expires_at = excluded.expires_at
+      where l.expires_at < now() or l.holder = excluded.holder
+    returning 1
+  )
+  select exists (select 1 from taken);
+$$;
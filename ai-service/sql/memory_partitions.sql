@@ -0,0 +1,57 @@
+-- Identity-partitioned memory search (used by MemoryService.search).
+--
+-- match_memories ranks a query against every row of every user. This
+-- replaces it with a search over the caller's partitions only:
+--   identity:<name>      rows with metadata.identity
+--   conversation:<id>    older rows with only metadata.conversation_id
+--   shared               everything else (uploaded documents)
+-- memory_partition() must stay in sync with
+-- app/services/partitioned_index.py::memory_partition.
+--
+-- The partition filter runs first on a btree expression index and the few
+-- matching rows are ranked exactly, so latency depends on the caller's rows,
+-- not on the size of the table.
+--
+-- Apply once in the Supabase SQL editor (or psql) after the memories table
+-- exists (memories.id uuid, embedding vector). Until it is applied,
+-- MemoryService.search falls back to the global match_memories RPC and
+-- filters its rows by partition.
+
+create or replace function memory_partition(metadata jsonb)
+returns text
+language sql
+immutable
+as $$
+  select case
+    when coalesce(metadata->>'identity', '') not in ('', 'anonymous')
+      then 'identity:' || (metadata->>'identity')
+    when coalesce(metadata->>'conversation_id', '') <> ''
+      then 'conversation:' || (metadata->>'conversation_id')
+    else 'shared'
+  end;
+$$;
+
+create index if not exists memories_partition_idx
+  on memories (memory_partition(metadata))
+  where embedding is not null;
+
+create or replace function match_memories_partitioned(
+  query_embedding vector,
+  match_count int,
+  partitions text[]
+)
+returns table (id uuid, content text, metadata jsonb, similarity float)
+language sql
+stable
+as $$
+  with scoped as materialized (
+    select m.id, m.content, m.metadata, m.embedding
+    from memories m
+    where memory_partition(m.metadata) = any(partitions)
+      and m.embedding is not null
+  )
+  select s.id, s.content, s.metadata, 1 - (s.embedding <=> query_embedding) as similarity
+  from scoped s
+  order by s.embedding <=> query_embedding
+  limit match_count;
+$$;
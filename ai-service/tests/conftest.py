@@ -2,6 +2,7 @@
 Shared pytest fixtures and env setup.
 Loads the project .env so integration tests can use real API keys.
 """
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -12,6 +13,8 @@ from dotenv import load_dotenv
 # ── Add ai-service root to sys.path so `app.*` imports resolve ───────────────
 AI_SERVICE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(AI_SERVICE_DIR))
+# Shared aura_memory package, importable from the source tree without installing it
+sys.path.insert(0, str(AI_SERVICE_DIR.parent / "packages" / "aura-memory"))
 
 # ── Load .env from project root ───────────────────────────────────────────────
 PROJECT_ROOT = AI_SERVICE_DIR.parent
@@ -59,6 +62,69 @@ def sample_tools():
     ]
 
 
+# ── Memory service on the in-memory Supabase fake ───────────────────────────
+
+class StubEmbeddings:
+    """
+    Async embedder stand-in. Every text embeds to `vector` when given (flat:
+    vector search cannot tell texts apart), else to [len(text), 1.0].
+    Each call awaits `delay`; the first `fail_calls` calls raise.
+    """
+
+    def __init__(self, vector=None, delay=0.0, fail_calls=0):
+        self.vector = vector
+        self.delay = delay
+        self.fail_calls = fail_calls
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.fail_calls:
+                self.fail_calls -= 1
+                raise RuntimeError("embedding API down")
+            return [list(self.vector) if self.vector else [float(len(t)), 1.0] for t in texts]
+        finally:
+            self.in_flight -= 1
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+@pytest.fixture
+def make_memory_service(monkeypatch):
+    """
+    make_memory_service(client=None, embeddings=None, history=None, **settings)
+    builds a real MemoryService on `client` (a fresh FakeSupabase by default).
+    Keyword settings are applied first; no embedding provider is probed, reads
+    are not TTL-cached and the history cache is private to the instance.
+    """
+    from aura_memory.testing import FakeSupabase
+    from app.core.config import settings as app_settings
+    from app.services import memory_service as module
+    from app.services.history_cache import HistoryCache
+
+    def make(client=None, embeddings=None, history=None, **overrides):
+        overrides = {"OPENAI_API_KEY": "", "OPENROUTER_API_KEY": "", "MEMORY_READ_TTL": 0.0, **overrides}
+        for name, value in overrides.items():
+            monkeypatch.setattr(app_settings, name, value)
+        monkeypatch.setattr(module, "database", client if client is not None else FakeSupabase())
+        monkeypatch.setattr(module, "_ollama_is_running", lambda base_url: False)
+
+        service = module.MemoryService()
+        service.embeddings = embeddings
+        service.history = history if history is not None else HistoryCache()
+        return service
+
+    return make
+
+
 # ── Key availability helpers (used by integration marks) ─────────────────────
 
 def has_openrouter_key():
@@ -0,0 +1,102 @@
+"""
+Local fake providers with injectable latency and failures.
+Used by the registry tests so routing logic is exercised without any network.
+"""
+import asyncio
+import time
+
+from app.services.providers.base import LLMProvider, RetryableError, StreamDone, TextDelta, make_result
+# The registry imports this lazily; loading it here keeps import time out of timed calls
+from app.services.settings_service import settings_service  # noqa: F401
+
+_ENV_KEYS = {
+    "openrouter": "OPENROUTER_API_KEY",
+    "openai":     "OPENAI_API_KEY",
+    "groq":       "GROQ_API_KEY",
+    "anthropic":  "ANTHROPIC_API_KEY",
+}
+
+
+class FakeProvider(LLMProvider):
+    """
+    `delay`    — seconds to wait before answering
+    `failures` — list of exceptions raised on successive calls (then succeeds)
+    `blocking` — sleep with time.sleep in `generate` and do not override
+                 `agenerate`, i.e. behave like a sync-only SDK
+    `stream_error_after` / `stall_after`
+               — in `stream`, raise RetryableError / hang forever after
+                 this many deltas
+    """
+
+    def __init__(
+        self, name, *, delay=0.0, failures=None, reply=None, blocking=False,
+        token_delay=0.0, stream_error_after=None, stall_after=None,
+    ):
+        self.name = name
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.reply = reply or f"[happy] from {name}"
+        self.blocking = blocking
+        self.token_delay = token_delay
+        self.stream_error_after = stream_error_after
+        self.stall_after = stall_after
+        self.calls = 0
+        self.cancelled = 0
+        self.requests = []
+
+    def _next(self, model):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return make_result(self.reply, self.name, model)
+
+    def generate(self, messages, *, model, temperature, max_tokens, tools=None):
+        time.sleep(self.delay)
+        return self._next(model)
+
+    async def agenerate(self, messages, *, model, temperature, max_tokens, tools=None):
+        if self.blocking:
+            return await super().agenerate(
+                messages, model=model, temperature=temperature, max_tokens=max_tokens, tools=tools,
+            )
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self._next(model)
+
+    async def stream(self, messages, *, model, temperature, max_tokens, tools=None):
+        self.requests.append(messages)
+        result = await self.agenerate(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        for i, word in enumerate(result["raw"].split(" ")):
+            if i == self.stream_error_after:
+                raise RetryableError(f"{self.name} dropped the connection", status_code=502)
+            if i == self.stall_after:
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.token_delay)
+            yield TextDelta(text=word + " ")
+        yield StreamDone(
+            text=result["text"], emotion=result["emotion"], raw=result["raw"],
+            provider=self.name, model=model,
+        )
+
+
+def install_fakes(monkeypatch, registry, providers):
+    """
+    Make `registry` resolve provider names to the given fakes.
+    Only providers in `providers` get an env key, so the candidate
+    list is exactly: primary (openrouter) + the other fakes.
+    """
+    for name, env_var in _ENV_KEYS.items():
+        if name in providers:
+            monkeypatch.setenv(env_var, f"test-{name}")
+        else:
+            monkeypatch.delenv(env_var, raising=False)
+
+    def get_provider(name, keys):
+        if name not in providers:
+            raise ValueError(f"{name} not configured")
+        return providers[name]
+
+    monkeypatch.setattr(registry, "_get_provider", get_provider)
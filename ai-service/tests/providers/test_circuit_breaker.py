@@ -0,0 +1,190 @@
+"""
+Tests — per-provider circuit breakers.
+Fake local providers fail on demand; a fake clock drives the cooldown.
+
+Run:
+    cd ai-service
+    pytest tests/providers/test_circuit_breaker.py -v
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.providers import registry as registry_module
+from app.services.providers.base import NonRetryableError, RetryableError
+from app.services.providers.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.providers.registry import ProviderRegistry
+from tests.providers.fakes import FakeProvider, install_fakes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(registry_module, "_BACKOFF_BASE", 0.0)
+    monkeypatch.setattr(registry_module.random, "uniform", lambda a, b: 0.0)
+
+
+@pytest.fixture
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 30.0)
+
+
+def _outage(n):
+    return [RetryableError("503", status_code=503) for _ in range(n)]
+
+
+# ── Tests: CircuitBreaker ─────────────────────────────────────────────────────
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()        # probe already in flight
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_for_a_full_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    clock.now = 15
+    assert not breaker.allow()
+    assert breaker.snapshot()["retry_in_s"] == 5.0
+
+
+# ── Tests: registry integration ───────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_open_provider_is_skipped_without_backoff(
+    monkeypatch, breaker_settings, simple_messages,
+):
+    registry = ProviderRegistry()
+    down = FakeProvider("openrouter", failures=_outage(100))
+    backup = FakeProvider("groq")
+    install_fakes(monkeypatch, registry, {"openrouter": down, "groq": backup})
+    for _ in range(settings.LLM_BREAKER_FAILURES):
+        registry.breaker("openrouter").record_failure()
+
+    start = time.perf_counter()
+    result = await registry.generate(simple_messages)
+
+    assert result["provider"] == "groq"
+    assert down.calls == 0
+    assert time.perf_counter() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_outage_trips_breaker_across_requests(
+    monkeypatch, no_backoff, breaker_settings, simple_messages,
+):
+    registry = ProviderRegistry()
+    down = FakeProvider("openrouter", failures=_outage(100))
+    install_fakes(monkeypatch, registry, {"openrouter": down, "groq": FakeProvider("groq")})
+
+    for _ in range(settings.LLM_BREAKER_FAILURES):
+        await registry.generate(simple_messages)
+    calls_while_closed = down.calls
+
+    await registry.generate(simple_messages)
+
+    assert registry.breaker("openrouter").state == OPEN
+    assert down.calls == calls_while_closed
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_is_a_single_attempt(
+    monkeypatch, no_backoff, breaker_settings, simple_messages,
+):
+    registry = ProviderRegistry()
+    clock = FakeClock()
+    registry.breakers["openrouter"] = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+    down = FakeProvider("openrouter", failures=_outage(100))
+    install_fakes(monkeypatch, registry, {"openrouter": down, "groq": FakeProvider("groq")})
+    registry.breaker("openrouter").record_failure()
+
+    clock.now = 10
+    await registry.generate(simple_messages)
+
+    assert down.calls == 1
+    assert registry.breaker("openrouter").state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_bad_request_does_not_trip_breaker(monkeypatch, breaker_settings, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", failures=[NonRetryableError("bad", status_code=400)] * 5),
+    })
+
+    for _ in range(3):
+        await registry.generate(simple_messages)
+
+    assert registry.breaker("openrouter").state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_hedged_mode_skips_open_providers(monkeypatch, breaker_settings, simple_messages):
+    monkeypatch.setattr(settings, "LLM_ROUTING_MODE", "latency")
+    registry = ProviderRegistry()
+    down = FakeProvider("openrouter")
+    install_fakes(monkeypatch, registry, {"openrouter": down, "groq": FakeProvider("groq")})
+    for _ in range(settings.LLM_BREAKER_FAILURES):
+        registry.breaker("openrouter").record_failure()
+
+    result = await registry.generate(simple_messages)
+
+    assert result["provider"] == "groq"
+    assert down.calls == 0
+
+
+def test_health_endpoint_reports_breakers(monkeypatch):
+    from app.services.providers.registry import provider_registry
+
+    monkeypatch.setattr(provider_registry, "breakers", {"groq": CircuitBreaker(failure_threshold=1)})
+    provider_registry.breaker("groq").record_failure()
+
+    body = TestClient(app).get("/api/v1/health/providers").json()
+
+    assert body["breakers"]["groq"]["state"] == OPEN
+    assert "latency" in body
@@ -0,0 +1,76 @@
+"""
+Load test — async-native provider calls vs the thread-pool path.
+The default executor is capped at a small size so the difference is visible
+without spawning hundreds of threads.
+
+Run:
+    cd ai-service
+    pytest tests/providers/test_registry_async.py -v
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.providers.registry import ProviderRegistry
+from tests.providers.fakes import FakeProvider, install_fakes
+
+EXECUTOR_WORKERS = 4
+CONCURRENCY = 64
+DELAY = 0.1
+
+
+@pytest.fixture
+async def small_executor():
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS)
+    loop.set_default_executor(executor)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+async def _burst(registry, simple_messages):
+    start = time.perf_counter()
+    results = await asyncio.gather(*[registry.generate(simple_messages) for _ in range(CONCURRENCY)])
+    return time.perf_counter() - start, results
+
+
+@pytest.mark.asyncio
+async def test_async_providers_scale_past_executor_limit(monkeypatch, small_executor, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", delay=DELAY)})
+
+    elapsed, results = await _burst(registry, simple_messages)
+
+    assert all(r["provider"] == "openrouter" for r in results)
+    # All calls overlap: roughly one DELAY, far below CONCURRENCY / WORKERS * DELAY
+    assert elapsed < 3 * DELAY
+
+
+@pytest.mark.asyncio
+async def test_blocking_providers_are_capped_by_executor(monkeypatch, small_executor, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", delay=DELAY, blocking=True)})
+
+    elapsed, _ = await _burst(registry, simple_messages)
+
+    # Sync-only providers still work via the base-class fallback, but serialize on the pool
+    assert elapsed >= (CONCURRENCY / EXECUTOR_WORKERS) * DELAY * 0.9
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_calls(monkeypatch, small_executor, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", delay=DELAY)})
+
+    lags = []
+
+    async def heartbeat():
+        for _ in range(10):
+            t = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - t - 0.01)
+
+    await asyncio.gather(heartbeat(), _burst(registry, simple_messages))
+    assert max(lags) < 0.05
@@ -0,0 +1,135 @@
+"""
+Tests — response cache for deterministic LLM calls.
+
+Run:
+    cd ai-service
+    pytest tests/providers/test_response_cache.py -v
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.providers.registry import ProviderRegistry
+from app.services.providers.response_cache import ResponseCache, response_key
+from tests.providers.fakes import FakeProvider, install_fakes
+
+MODEL = "deepseek/deepseek-v3.2"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache_on(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RESPONSE_CACHE", True)
+
+
+@pytest.fixture
+def cached_registry(monkeypatch, cache_on):
+    registry = ProviderRegistry()
+    provider = FakeProvider("openrouter")
+    install_fakes(monkeypatch, registry, {"openrouter": provider})
+    return registry, provider
+
+
+# ── Tests: ResponseCache ──────────────────────────────────────────────────────
+
+def test_key_ignores_formatting_noise():
+    a = response_key(MODEL, 0.0, [{"role": "system", "content": "\n   Classify: hi\n"}])
+    b = response_key(MODEL, 0, [{"content": "Classify: hi", "role": "system"}])
+    assert a == b
+
+
+def test_key_separates_model_temperature_and_content():
+    base = response_key(MODEL, 0.0, [{"role": "user", "content": "hi"}])
+    assert base != response_key("gpt-4o", 0.0, [{"role": "user", "content": "hi"}])
+    assert base != response_key(MODEL, 0.5, [{"role": "user", "content": "hi"}])
+    assert base != response_key(MODEL, 0.0, [{"role": "user", "content": "hey"}])
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("k", {"text": "x"})
+    clock.now = 9
+    assert cache.get("k") == {"text": "x"}
+    clock.now = 10
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+# ── Tests: registry integration ───────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_deterministic_call_is_served_from_cache(cached_registry, simple_messages):
+    registry, provider = cached_registry
+
+    first = await registry.generate(simple_messages, temperature=0.0)
+    second = await registry.generate(simple_messages, temperature=0.0)
+
+    assert first == second
+    assert provider.calls == 1
+    assert registry.responses.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_sampled_call_bypasses_cache_unless_opted_in(cached_registry, simple_messages):
+    registry, provider = cached_registry
+
+    await registry.generate(simple_messages, temperature=0.8)
+    await registry.generate(simple_messages, temperature=0.8)
+    assert provider.calls == 2
+    assert registry.responses.stats()["bypassed"] == 2
+
+    await registry.generate(simple_messages, temperature=0.8, cache=True)
+    await registry.generate(simple_messages, temperature=0.8, cache=True)
+    assert provider.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_by_default(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    provider = FakeProvider("openrouter")
+    install_fakes(monkeypatch, registry, {"openrouter": provider})
+
+    await registry.generate(simple_messages, temperature=0.0)
+    await registry.generate(simple_messages, temperature=0.0)
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(monkeypatch, cache_on, simple_messages):
+    from app.services.providers.base import NonRetryableError
+
+    registry = ProviderRegistry()
+    provider = FakeProvider("openrouter", failures=[NonRetryableError("bad key", status_code=401)])
+    install_fakes(monkeypatch, registry, {"openrouter": provider})
+
+    apology = await registry.generate(simple_messages, temperature=0.0)
+    answer = await registry.generate(simple_messages, temperature=0.0)
+
+    assert apology["emotion"] == "confused"
+    assert answer["provider"] == "openrouter"
+
+
+def test_cache_endpoint_reports_response_hit_rate():
+    body = TestClient(app).get("/api/v1/health/cache").json()
+    assert "hit_rate" in body["responses"]
+    assert "hit_rate" in body["embeddings"]
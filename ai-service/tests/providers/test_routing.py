@@ -0,0 +1,149 @@
+"""
+Tests — latency-aware routing and hedged requests.
+Fake local providers with injected latency stand in for real backends.
+
+Run:
+    cd ai-service
+    pytest tests/providers/test_routing.py -v
+"""
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.providers.base import NonRetryableError
+from app.services.providers.registry import ProviderRegistry
+from app.services.providers.routing import LatencyTracker
+from tests.providers.fakes import FakeProvider, install_fakes
+
+MODEL = "deepseek/deepseek-v3.2"   # default model → openrouter is the configured primary
+
+
+@pytest.fixture
+def latency_mode(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING_MODE", "latency")
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY", 0.05)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MAX_DELAY", 0.2)
+
+
+def _warm(tracker, provider, seconds, n=10, ok=True):
+    for _ in range(n):
+        tracker.record(provider, MODEL, seconds, ok=ok)
+
+
+# ── Tests: LatencyTracker ─────────────────────────────────────────────────────
+
+def test_percentiles_and_error_rate():
+    tracker = LatencyTracker()
+    for ms in range(1, 100):
+        tracker.record("a", MODEL, ms / 1000)
+    tracker.record("a", MODEL, 5.0, ok=False)
+
+    stats = tracker.stats("a", MODEL)
+    assert stats.p50 == pytest.approx(0.050)
+    assert stats.p95 == pytest.approx(0.095)
+    assert stats.error_rate == pytest.approx(1 / 100)
+
+
+def test_rank_prefers_fast_measured_provider():
+    tracker = LatencyTracker()
+    _warm(tracker, "openrouter", 2.0)
+    _warm(tracker, "groq", 0.3)
+    assert tracker.rank(["openrouter", "openai", "groq"], MODEL) == ["groq", "openrouter", "openai"]
+
+
+def test_rank_keeps_unmeasured_primary_first():
+    tracker = LatencyTracker()
+    _warm(tracker, "groq", 0.1)
+    assert tracker.rank(["openrouter", "groq"], MODEL)[0] == "openrouter"
+
+
+def test_rank_penalizes_errors():
+    tracker = LatencyTracker()
+    _warm(tracker, "openrouter", 0.5, n=5)
+    _warm(tracker, "openrouter", 0.5, n=5, ok=False)
+    _warm(tracker, "groq", 0.8)
+    assert tracker.rank(["openrouter", "groq"], MODEL)[0] == "groq"
+
+
+def test_hedge_delay_is_clamped_p95():
+    tracker = LatencyTracker()
+    assert tracker.hedge_delay("a", MODEL, 0.5, 4.0) == 4.0   # cold → ceiling
+    _warm(tracker, "a", 0.1)
+    assert tracker.hedge_delay("a", MODEL, 0.5, 4.0) == 0.5   # fast → floor
+    _warm(tracker, "b", 1.5)
+    assert tracker.hedge_delay("b", MODEL, 0.5, 4.0) == pytest.approx(1.5)
+
+
+# ── Tests: hedged requests ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled(monkeypatch, latency_mode, simple_messages):
+    registry = ProviderRegistry()
+    slow = FakeProvider("openrouter", delay=2.0)
+    fast = FakeProvider("groq", delay=0.02)
+    install_fakes(monkeypatch, registry, {"openrouter": slow, "groq": fast})
+
+    start = time.perf_counter()
+    result = await registry.generate(simple_messages)
+    elapsed = time.perf_counter() - start
+
+    assert result["provider"] == "groq"
+    assert elapsed < 0.5                 # hedge fired at LLM_HEDGE_MAX_DELAY (cold primary)
+    assert slow.cancelled == 1
+
+    # The loser's time is a lower bound, not a sample: it must not pull its p50 down
+    stats = registry.latency.stats("openrouter", MODEL)
+    assert (stats.samples, stats.p50) == (0, None)
+    assert registry.latency.snapshot()["openrouter"][MODEL]["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(monkeypatch, latency_mode, simple_messages):
+    registry = ProviderRegistry()
+    primary = FakeProvider("openrouter", delay=0.01)
+    backup = FakeProvider("groq", delay=0.01)
+    install_fakes(monkeypatch, registry, {"openrouter": primary, "groq": backup})
+
+    result = await registry.generate(simple_messages)
+
+    assert result["provider"] == "openrouter"
+    assert backup.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_primary_chosen_dynamically_from_history(monkeypatch, latency_mode, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", delay=0.01),
+        "groq": FakeProvider("groq", delay=0.01),
+    })
+    _warm(registry.latency, "openrouter", 3.0)
+    _warm(registry.latency, "groq", 0.2)
+
+    result = await registry.generate(simple_messages)
+    assert result["provider"] == "groq"
+
+
+@pytest.mark.asyncio
+async def test_failure_moves_to_next_candidate_without_waiting(monkeypatch, latency_mode, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", failures=[NonRetryableError("bad key", status_code=401)]),
+        "groq": FakeProvider("groq", delay=0.01),
+    })
+
+    start = time.perf_counter()
+    result = await registry.generate(simple_messages)
+
+    assert result["provider"] == "groq"
+    assert time.perf_counter() - start < settings.LLM_HEDGE_MAX_DELAY
+
+
+@pytest.mark.asyncio
+async def test_ordered_mode_records_latency(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", delay=0.01)})
+
+    await registry.generate(simple_messages)
+    assert registry.latency.stats("openrouter", MODEL).samples == 1
@@ -0,0 +1,136 @@
+"""
+Tests — mid-stream failover and streaming metrics.
+Fake local providers drop the connection or go silent after N deltas.
+
+Run:
+    cd ai-service
+    pytest tests/providers/test_stream_failover.py -v
+"""
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.providers.base import StreamDone, TextDelta
+from app.services.providers.circuit import CLOSED
+from app.services.providers.registry import ProviderRegistry
+from tests.providers.fakes import FakeProvider, install_fakes
+
+MODEL = "deepseek/deepseek-v3.2"
+
+
+@pytest.fixture(autouse=True)
+def short_deadlines(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAM_FIRST_TOKEN_TIMEOUT", 0.3)
+    monkeypatch.setattr(settings, "LLM_STREAM_STALL_TIMEOUT", 0.1)
+
+
+async def _collect(registry, messages):
+    deltas, done = [], []
+    async for event in registry.stream(messages):
+        if isinstance(event, TextDelta):
+            deltas.append(event.text)
+        elif isinstance(event, StreamDone):
+            done.append(event)
+    assert len(done) == 1
+    return "".join(deltas), done[0]
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_error_mid_stream_resumes_on_next_provider(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    primary = FakeProvider("openrouter", reply="[happy] Hello there, friend", stream_error_after=2)
+    backup = FakeProvider("groq", reply="there, friend")
+    install_fakes(monkeypatch, registry, {"openrouter": primary, "groq": backup})
+
+    text, done = await _collect(registry, simple_messages)
+
+    assert text.strip() == "[happy] Hello there, friend"
+    assert backup.requests[0][-1] == {"role": "assistant", "content": "[happy] Hello"}
+    assert done.provider == "groq"
+    assert done.emotion == "happy"
+    assert done.text == "Hello there, friend"
+
+
+@pytest.mark.asyncio
+async def test_stall_mid_stream_fails_over(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    primary = FakeProvider("openrouter", reply="[happy] Hello there", stall_after=1)
+    install_fakes(monkeypatch, registry, {"openrouter": primary, "groq": FakeProvider("groq", reply="Hello there")})
+
+    start = time.perf_counter()
+    text, done = await _collect(registry, simple_messages)
+
+    assert text.strip() == "[happy] Hello there"
+    assert done.provider == "groq"
+    assert time.perf_counter() - start < settings.LLM_STREAM_STALL_TIMEOUT + 0.2
+
+
+@pytest.mark.asyncio
+async def test_slow_first_token_fails_over_without_prefix(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    backup = FakeProvider("groq", reply="[happy] hi")
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", delay=5.0), "groq": backup})
+
+    text, done = await _collect(registry, simple_messages)
+
+    assert text.strip() == "[happy] hi"
+    assert backup.requests[0] == simple_messages
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_failure_counts_against_the_breaker(monkeypatch, simple_messages):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 1)
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", reply="[happy] a b c", stream_error_after=1),
+        "groq": FakeProvider("groq", reply="b c"),
+    })
+
+    await _collect(registry, simple_messages)
+
+    assert registry.breaker("openrouter").state != CLOSED
+    assert registry.breaker("groq").state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_partial_text_is_kept_when_every_provider_fails(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", reply="[sad] So sorry about", stream_error_after=2),
+    })
+
+    text, done = await _collect(registry, simple_messages)
+
+    assert text == "[sad] So "
+    assert done.emotion == "sad"
+    assert done.text == "So"
+
+
+@pytest.mark.asyncio
+async def test_apology_when_nothing_was_streamed(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {"openrouter": FakeProvider("openrouter", stream_error_after=0)})
+
+    text, done = await _collect(registry, simple_messages)
+
+    assert done.emotion == "confused"
+    assert text.startswith("[confused]")
+
+
+@pytest.mark.asyncio
+async def test_ttft_and_gap_metrics_recorded(monkeypatch, simple_messages):
+    registry = ProviderRegistry()
+    install_fakes(monkeypatch, registry, {
+        "openrouter": FakeProvider("openrouter", delay=0.05, token_delay=0.01, reply="[happy] one two three"),
+    })
+
+    await _collect(registry, simple_messages)
+    stats = registry.health()["streaming"]["openrouter"][MODEL]
+
+    assert stats["streams"] == 1
+    assert stats["ttft"]["p50_ms"] >= 50
+    assert stats["inter_token_gap"]["p50_ms"] >= 10
+    assert stats["failovers"] == 0
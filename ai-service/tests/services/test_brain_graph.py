@@ -0,0 +1,135 @@
+"""
+Tests — brain graph fan-out / join.
+Memory and LLM calls are replaced with local fakes that sleep, so overlap
+between the parallel context nodes is measurable without any network.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_brain_graph.py -v
+"""
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage
+
+from app.main import app
+from app.services.brain.graph import brain
+from app.services.llm import llm_service
+from app.services.memory_service import memory_service
+from app.services.providers.base import StreamDone, TextDelta
+
+DELAY = 0.1
+
+
+def _slow(value):
+    async def fake(*args, **kwargs):
+        await asyncio.sleep(DELAY)
+        return value
+    return fake
+
+
+@pytest.fixture
+def fake_backends(monkeypatch):
+    monkeypatch.setattr(memory_service, "get_history", _slow([{"role": "user", "content": "earlier"}]))
+    monkeypatch.setattr(memory_service, "search", _slow(["a relevant memory"]))
+    monkeypatch.setattr(memory_service, "get_long_term_memories", _slow("User likes tea."))
+    monkeypatch.setattr(memory_service, "add_interaction", _slow(None))
+    monkeypatch.setattr(memory_service, "store", _slow(None))
+
+    prompts = []
+
+    async def fake_generate(messages, **kwargs):
+        prompts.append(messages)
+        await asyncio.sleep(DELAY)
+        return {"text": "Hi!", "emotion": "happy"}
+
+    monkeypatch.setattr(llm_service, "generate", fake_generate)
+    return prompts
+
+
+def _state():
+    return {
+        "messages": [HumanMessage(content="hello")],
+        "emotion": "neutral",
+        "conversation_id": str(uuid.uuid4()),
+        "identity": "tester",
+    }
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_context_nodes_run_concurrently(fake_backends):
+    start = time.perf_counter()
+    result = await brain.ainvoke(_state())
+    elapsed = time.perf_counter() - start
+
+    # Serial would be: emotion + history + search + facts + generate ≈ 7 × DELAY
+    assert elapsed < 5 * DELAY
+    assert result["messages"][-1].content == "Hi!"
+
+
+@pytest.mark.asyncio
+async def test_fetched_context_reaches_the_prompt(fake_backends):
+    await brain.ainvoke(_state())
+
+    generation_prompt = fake_backends[-1]
+    system = generation_prompt[0]["content"]
+    assert "User likes tea." in system
+    assert "a relevant memory" in system
+    assert {"role": "user", "content": "earlier"} in generation_prompt
+
+
+@pytest.mark.asyncio
+async def test_timings_reported_per_node(fake_backends):
+    result = await brain.ainvoke(_state())
+    timings = result["timings"]
+
+    for node in ("detect_emotion", "load_history", "search_memories", "load_facts", "generate_response", "llm"):
+        assert node in timings
+    assert timings["load_history"] >= DELAY * 1000 * 0.9
+
+
+# ── Tests: token streaming ────────────────────────────────────────────────────
+
+@pytest.fixture
+def fake_stream(monkeypatch, fake_backends):
+    async def stream(messages, **kwargs):
+        for piece in ["[hap", "py] Hel", "lo", "!"]:
+            yield TextDelta(text=piece)
+        yield StreamDone(text="Hello!", emotion="happy", raw="[happy] Hello!", provider="fake", model="fake")
+
+    monkeypatch.setattr(llm_service, "stream", stream)
+
+
+@pytest.mark.asyncio
+async def test_generate_streams_tokens_through_the_graph(fake_stream):
+    events, final = [], None
+    async for mode, chunk in brain.astream({**_state(), "stream": True}, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            events.append(chunk)
+        else:
+            final = chunk
+
+    assert events[0] == {"emotion": "happy"}
+    assert "".join(e.get("text", "") for e in events).strip() == "Hello!"
+    assert final["messages"][-1].content == "Hello!"
+    assert final["emotion"] == "happy"
+
+
+def test_sse_endpoint_uses_the_graph(fake_stream):
+    response = TestClient(app).post(
+        "/api/v1/chat",
+        json={"message": "hello", "conversation_id": str(uuid.uuid4()), "stream": True},
+    )
+    payloads = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+
+    assert payloads[-1] == "[DONE]"
+    events = [json.loads(p) for p in payloads[:-1]]
+    assert "".join(e.get("text", "") for e in events).strip() == "Hello!"
+    assert any("emotion" in e for e in events)
+    assert "generate_response" in events[-1]["timings"]
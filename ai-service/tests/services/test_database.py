@@ -0,0 +1,93 @@
+"""
+Tests — shared async Supabase access layer.
+The services run against the in-memory fake with per-request latency, so
+event-loop blocking shows up as ticker lag without a real database.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_database.py -v
+"""
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import create_database
+from app.services.settings_service import SettingsService
+from aura_memory.testing import FakeSupabase
+
+
+async def _max_lag(work, interval=0.005) -> tuple[float, float]:
+    """Run `work` while a ticker sleeps `interval` in a loop; return (elapsed, worst lateness)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - expected)
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await work
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    return elapsed, max(lags)
+
+
+# ── Tests: create_database ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_one_pooled_http_client_backs_postgrest(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setattr(settings, "SUPABASE_SERVICE_KEY", "service-key")
+    monkeypatch.setattr(settings, "SUPABASE_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(settings, "SUPABASE_MAX_KEEPALIVE", 3)
+
+    client = create_database()
+    http = client.options.httpx_client
+    pool = http._transport._pool
+
+    assert client.postgrest.session is http
+    assert (pool._max_connections, pool._max_keepalive_connections, pool._http2) == (7, 3, True)
+    await http.aclose()
+
+
+def test_no_credentials_means_no_client(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "")
+    assert create_database() is None
+
+
+# ── Tests: services ───────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_history_reads_run_concurrently_without_blocking_the_loop(make_memory_service):
+    service = make_memory_service(FakeSupabase(latency=0.05), MEMORY_WRITE_BEHIND=False)
+
+    reads = asyncio.gather(*(service.get_history(uuid.uuid4(), 30) for _ in range(20)))
+    elapsed, lag = await _max_lag(reads)
+
+    assert service.client.calls[("messages", "select")] == 20
+    assert elapsed < 0.5            # serial would be 20 × 50 ms
+    assert lag < 0.04
+
+
+@pytest.mark.asyncio
+async def test_settings_are_awaited_and_cached():
+    service = SettingsService()
+    service._client = FakeSupabase()
+    service._client.tables["personality_settings"].append({"id": 1, "model": "test/model", "temperature": 0.3})
+
+    first = await service.get_settings()
+    assert first["model"] == "test/model" and first["max_tokens"] == 300
+    assert await service.get_settings() == first
+    assert service._client.calls[("personality_settings", "select")] == 1
+
+    updated = await service.update_settings({"model": "other/model"})
+    assert updated["model"] == "other/model"
+    assert (await service.get_settings())["model"] == "other/model"
+    assert service._client.calls[("personality_settings", "select")] == 2
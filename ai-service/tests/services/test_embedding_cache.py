@@ -0,0 +1,134 @@
+"""
+Tests — EmbeddingCache / CachedEmbeddings.
+The upstream embedder is a local fake that counts calls.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_embedding_cache.py -v
+"""
+import threading
+
+import pytest
+
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingCache, embedding_key
+
+
+class FakeEmbeddings:
+    model = "openai/text-embedding-3-small"
+
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls = []
+
+    @staticmethod
+    def _vec(text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self._vec(text)
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [self._vec(t) for t in texts]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+# ── Tests: in-memory LRU ──────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_repeated_query_hits_cache():
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, EmbeddingCache(max_entries=10))
+
+    first = await cached.aembed_query("hello")
+    second = await cached.aembed_query("hello")
+
+    assert first == second
+    assert fake.query_calls == 1
+    assert cached.cache.stats()["hits"] == 1
+    assert cached.cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_documents_only_embed_missing_texts():
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, EmbeddingCache(max_entries=10))
+
+    await cached.aembed_query("b")
+    vectors = await cached.aembed_documents(["a", "b", "c"])
+
+    assert fake.document_calls == [["a", "c"]]
+    assert vectors == [fake._vec("a"), fake._vec("b"), fake._vec("c")]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")           # touch a → b is now oldest
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+
+
+def test_namespace_ignores_provider_prefix():
+    cached = CachedEmbeddings(FakeEmbeddings(), EmbeddingCache())
+    assert cached.namespace == "text-embedding-3-small"
+    assert embedding_key("m1", "x") != embedding_key("m2", "x")
+
+
+# ── Tests: SQLite tier ────────────────────────────────────────────────────────
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    CachedEmbeddings(FakeEmbeddings(), EmbeddingCache(path=str(path))).embed_documents(["persist me"])
+
+    fake = FakeEmbeddings()
+    restarted = CachedEmbeddings(fake, EmbeddingCache(path=str(path)))
+    vector = restarted.embed_query("persist me")
+
+    assert fake.query_calls == 0
+    assert vector == pytest.approx(fake._vec("persist me"))
+    assert restarted.cache.stats()["disk_hits"] == 1
+
+
+class ThreadRecordingDB:
+    """Wraps the SQLite connection and records which thread each call runs on."""
+
+    def __init__(self, db):
+        self.db = db
+        self.threads = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.threads.append(threading.get_ident())
+            return getattr(self.db, name)(*args, **kwargs)
+        return call
+
+
+@pytest.mark.asyncio
+async def test_async_path_keeps_sqlite_off_the_event_loop(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    CachedEmbeddings(FakeEmbeddings(), EmbeddingCache(path=str(path))).embed_documents(["persist me"])
+
+    fake = FakeEmbeddings()
+    restarted = CachedEmbeddings(fake, EmbeddingCache(path=str(path)))
+    db = restarted.cache._db = ThreadRecordingDB(restarted.cache._db)
+
+    vectors = await restarted.aembed_documents(["persist me", "new text"])
+    assert vectors[0] == pytest.approx(fake._vec("persist me"))
+    assert fake.document_calls == [["new text"]]
+    assert restarted.cache.stats()["disk_hits"] == 1
+
+    assert db.threads and threading.get_ident() not in db.threads     # reads and the write ran in workers
+    db.threads.clear()
+    await restarted.aembed_query("new text")                          # memory hit: no disk access at all
+    assert db.threads == []
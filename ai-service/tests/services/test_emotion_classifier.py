@@ -0,0 +1,86 @@
+"""
+Tests — local emotion classification and the LLM fallback switch.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_emotion_classifier.py -v
+"""
+import pytest
+
+from app.core.config import settings
+from app.services import emotion_classifier as ec
+from app.system.emotion_mapper import EmotionMapper
+
+
+# ── Tests: lexicon ────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("text, expected", [
+    ("Haha that's great, thank you!", "happy"),
+    ("I'm so sad, I miss my dog", "sad"),
+    ("This bug is so annoying, I need to fix it before the deadline", "serious"),
+    ("Wow, that's amazing!", "excited"),
+    ("Huh? I don't understand what you mean", "confused"),
+    ("I'm exhausted and overwhelmed", "dizzy"),
+    ("今日は本当に嬉しい", "happy"),
+])
+def test_lexicon_labels(text, expected):
+    assert EmotionMapper().map(text) == expected
+
+
+def test_keywords_respect_word_boundaries():
+    # "missile" must not match "miss", "glade" must not match "glad"
+    assert EmotionMapper().classify("a missile over the glade") == (None, 0.0)
+
+
+def test_confidence_is_share_of_hits():
+    emotion, confidence = EmotionMapper().classify("happy but sad")
+    assert emotion in {"happy", "sad"}
+    assert confidence == pytest.approx(0.5)
+
+
+# ── Tests: engine selection / fallback ────────────────────────────────────────
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def fake_llm(text):
+        calls.append(text)
+        return "serious"
+
+    monkeypatch.setattr(ec, "llm_classify", fake_llm)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_lexicon_hit_skips_llm(monkeypatch, llm_calls):
+    monkeypatch.setattr(settings, "EMOTION_LLM_FALLBACK", True)
+    assert await ec.EmotionClassifier().classify("yay, hello!") == "happy"
+    assert llm_calls == []
+
+
+@pytest.mark.asyncio
+async def test_no_hit_is_neutral_without_fallback(monkeypatch, llm_calls):
+    monkeypatch.setattr(settings, "EMOTION_LLM_FALLBACK", False)
+    assert await ec.EmotionClassifier().classify("The meeting is at noon.") == "neutral"
+    assert llm_calls == []
+
+
+@pytest.mark.asyncio
+async def test_no_hit_uses_llm_when_enabled(monkeypatch, llm_calls):
+    monkeypatch.setattr(settings, "EMOTION_LLM_FALLBACK", True)
+    assert await ec.EmotionClassifier().classify("The meeting is at noon.") == "serious"
+    assert llm_calls == ["The meeting is at noon."]
+
+
+@pytest.mark.asyncio
+async def test_llm_engine_always_calls_llm(monkeypatch, llm_calls):
+    monkeypatch.setattr(settings, "EMOTION_ENGINE", "llm")
+    await ec.EmotionClassifier().classify("yay")
+    assert llm_calls == ["yay"]
+
+
+def test_model_engine_without_path_falls_back_to_lexicon(monkeypatch):
+    monkeypatch.setattr(settings, "EMOTION_ENGINE", "model")
+    monkeypatch.setattr(settings, "EMOTION_MODEL_PATH", "")
+    assert isinstance(ec.EmotionClassifier().engine, ec.LexiconEngine)
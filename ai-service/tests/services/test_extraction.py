@@ -0,0 +1,106 @@
+"""
+Tests — process-pool PDF / PPTX extraction engine.
+PDFs are generated on the fly with benchmarks/pdf_fixture.py.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_extraction.py -v
+"""
+import re
+
+import pypdf
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.extraction import ExtractionEngine
+from app.services.memory_service import memory_service
+from benchmarks.pdf_fixture import make_pdf
+
+PAGES = 23
+
+
+@pytest.fixture(scope="module")
+def pdf(tmp_path_factory):
+    return make_pdf(tmp_path_factory.mktemp("pdf") / "book.pdf", pages=PAGES, lines=8)
+
+
+@pytest.fixture(scope="module")
+def pool_engine():
+    engine = ExtractionEngine(workers=2, pages_per_shard=3)
+    yield engine
+    engine.shutdown()
+
+
+def _serial(path):
+    return [page.extract_text() + "\n" for page in pypdf.PdfReader(path).pages]
+
+
+def _page_numbers(pages):
+    return [int(re.match(r"Page (\d+)", p).group(1)) for p in pages]
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+def test_pool_returns_pages_in_document_order(pool_engine, pdf):
+    pages = list(pool_engine.iter_pages(pdf))
+    assert _page_numbers(pages) == list(range(1, PAGES + 1))
+    assert pages == _serial(pdf)
+
+
+def test_inline_mode_matches_pool(pool_engine, pdf):
+    inline = ExtractionEngine(workers=1, pages_per_shard=3)
+    assert list(inline.iter_pages(pdf)) == list(pool_engine.iter_pages(pdf))
+
+
+def test_consumer_can_stop_early(pool_engine, pdf):
+    pages = pool_engine.iter_pages(pdf)
+    first = next(pages)
+    pages.close()
+    assert first.startswith("Page 1")
+
+
+def test_pptx_slides_are_extracted(pool_engine, tmp_path):
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {i}"
+        slide.shapes.add_textbox(Inches(1), Inches(2), Inches(4), Inches(1)).text = f"body {i}"
+    path = tmp_path / "deck.pptx"
+    prs.save(path)
+
+    slides = list(pool_engine.iter_pages(path))
+    assert slides == [f"Slide {i}\nbody {i}\n" for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_extract_text_concatenates_pages(pool_engine, pdf):
+    text = await pool_engine.extract_text(pdf)
+    assert text == "".join(_serial(pdf))
+
+
+def test_memory_upload_uses_engine(monkeypatch, pdf):
+    stored = []
+
+    async def fake_store_many(texts, metadata=None):
+        stored.extend(texts)
+        return len(texts)
+
+    monkeypatch.setattr(memory_service, "store_many", fake_store_many)
+    monkeypatch.setattr("app.api.v1.memory.extraction_engine", ExtractionEngine(workers=1))
+
+    with open(pdf, "rb") as f:
+        response = TestClient(app).post("/api/v1/memory/upload", files={"file": ("book.pdf", f, "application/pdf")})
+
+    assert response.json()["status"] == "success"
+    assert "Page 1" in stored[0]
+
+
+def test_memory_upload_rejects_invalid_pdf():
+    response = TestClient(app).post(
+        "/api/v1/memory/upload", files={"file": ("bad.pdf", b"not a pdf", "application/pdf")},
+    )
+    assert response.status_code == 400
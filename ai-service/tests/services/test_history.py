@@ -0,0 +1,199 @@
+"""
+Tests — token-budgeted history window and rolling summaries.
+Tokens are counted as words and the summarizer is a local fake, so no
+tiktoken download or LLM call is needed.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_history.py -v
+"""
+import asyncio
+import uuid
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.services.brain.graph import brain
+from app.services.history import HistoryManager
+from app.services.llm import llm_service
+from app.services.memory_service import memory_service
+
+
+def _turns(n, words=10, start=0):
+    messages = []
+    for i in range(start, start + n):
+        messages.append({"id": f"q{i}", "role": "user", "content": f"question {i} " + "word " * (words - 2)})
+        messages.append({"id": f"a{i}", "role": "assistant", "content": f"answer {i} " + "word " * (words - 2)})
+    return messages
+
+
+def _chat(messages):
+    return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+class FakeSummarizer:
+    def __init__(self, fail=False):
+        self.prompts = []
+        self.fail = fail
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("LLM down")
+        return f"summary #{len(self.prompts)}"
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    # 10-word messages cost 14 tokens each with overhead → 5 fit in 70
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_BUDGET", 70)
+    monkeypatch.setattr(settings, "HISTORY_MAX_MESSAGES", 40)
+    monkeypatch.setattr(settings, "HISTORY_SUMMARY_BATCH", 4)
+
+
+@pytest.fixture
+def manager(budget):
+    return HistoryManager(summarize=FakeSummarizer(), count_tokens=lambda text: len(text.split()))
+
+
+# ── Tests: window ─────────────────────────────────────────────────────────────
+
+def test_short_history_is_sent_verbatim(manager):
+    history = _turns(2)
+    window = manager.window("c", history)
+    assert window.messages == history
+    assert window.summary == "" and window.pending == []
+
+
+def test_small_overflow_stays_verbatim_until_a_batch(manager):
+    history = _turns(4)                   # 8 messages: 5 fit, 3 over budget
+    window = manager.window("c", history)
+    assert window.messages == history
+    assert len(window.pending) == 3
+    assert manager.schedule_summary("c", window.summary, window.pending) is None
+
+
+def test_overflow_is_trimmed_to_budget_and_message_cap(manager, monkeypatch):
+    history = _turns(10)
+    window = manager.window("c", history)
+    assert window.messages == history[-5:]
+    assert window.pending == history[:-5]
+
+    monkeypatch.setattr(settings, "HISTORY_MAX_MESSAGES", 2)
+    assert manager.window("c", history).messages == history[-2:]
+
+
+def test_latest_message_is_kept_even_if_over_budget(manager):
+    huge = [{"id": "q0", "role": "user", "content": "word " * 500}]
+    assert manager.window("c", huge).messages == huge
+
+
+# ── Tests: rolling summary ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_summary_covers_dropped_turns_and_advances(manager):
+    history = _turns(10)
+    window = manager.window("c", history)
+    await manager.schedule_summary("c", window.summary, window.pending)
+
+    prompt = manager._summarize.prompts[0][1]["content"]
+    assert "question 0" in prompt and "question 7" in prompt and "answer 7" not in prompt
+
+    # One more turn: the window restarts after the summarized messages
+    history += _turns(1, start=10)
+    window = manager.window("c", history)
+    assert window.summary == "summary #1"
+    assert window.messages == history[-7:]          # 5 recent + 2 pending (< batch) verbatim
+    assert window.pending == history[-7:-5]
+
+
+@pytest.mark.asyncio
+async def test_next_summary_extends_the_previous_one(manager):
+    history = _turns(10)
+    window = manager.window("c", history)
+    await manager.schedule_summary("c", window.summary, window.pending)
+
+    history += _turns(3, start=10)
+    window = manager.window("c", history)
+    await manager.schedule_summary("c", window.summary, window.pending)
+
+    assert "Existing summary:\nsummary #1" in manager._summarize.prompts[1][1]["content"]
+    assert manager.window("c", history).summary == "summary #2"
+
+
+@pytest.mark.asyncio
+async def test_repeated_message_does_not_move_the_boundary(manager):
+    history = _turns(10)
+    history[14]["content"] = "Okay!"           # the last summarized message...
+    window = manager.window("c", history)
+    await manager.schedule_summary("c", window.summary, window.pending)
+
+    history += [{"id": "q10", "role": "user", "content": "Okay!"}]     # ...said again later
+    window = manager.window("c", history)
+    assert window.messages == history[15:]     # nothing after the boundary dropped unsummarized
+    assert window.pending == history[15:16]
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_messages_pending(budget):
+    manager = HistoryManager(summarize=FakeSummarizer(fail=True), count_tokens=lambda t: len(t.split()))
+    history = _turns(10)
+    window = manager.window("c", history)
+    await manager.schedule_summary("c", window.summary, window.pending)
+
+    assert manager.window("c", history).pending == window.pending
+
+
+@pytest.mark.asyncio
+async def test_one_summary_in_flight_per_conversation(manager):
+    window = manager.window("c", _turns(10))
+    first = manager.schedule_summary("c", window.summary, window.pending)
+    assert manager.schedule_summary("c", window.summary, window.pending) is None
+    await first
+    assert len(manager._summarize.prompts) == 1
+
+
+# ── Tests: brain graph ────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_generate_sends_window_and_summary(monkeypatch, manager):
+    history = _turns(10)
+    conversation_id = str(uuid.uuid4())
+    window = manager.window(conversation_id, history)
+    await manager.schedule_summary(conversation_id, window.summary, window.pending)
+
+    async def get_history(cid, n):
+        assert n == settings.HISTORY_FETCH_MESSAGES
+        return history
+
+    async def noop(*args, **kwargs):
+        return None
+
+    prompts = []
+
+    async def generate(messages, **kwargs):
+        prompts.append(messages)
+        return {"text": "Hi!", "emotion": "happy"}
+
+    monkeypatch.setattr("app.services.brain.nodes.context.history_manager", manager)
+    monkeypatch.setattr("app.services.brain.nodes.generate.history_manager", manager)
+    monkeypatch.setattr(memory_service, "get_history", get_history)
+    monkeypatch.setattr(memory_service, "search", noop)
+    monkeypatch.setattr(memory_service, "get_long_term_memories", noop)
+    monkeypatch.setattr(memory_service, "add_interaction", noop)
+    monkeypatch.setattr(memory_service, "store", noop)
+    monkeypatch.setattr(llm_service, "generate", generate)
+
+    await brain.ainvoke({
+        "messages": [HumanMessage(content="hello")],
+        "emotion": "neutral",
+        "conversation_id": conversation_id,
+        "identity": "tester",
+    })
+
+    system, *rest = prompts[-1]
+    assert "summary #1" in system["content"]
+    assert rest[:-1] == _chat(history[-5:])       # row ids stay out of the payload
+    assert rest[-1] == {"role": "user", "content": "hello"}
@@ -0,0 +1,136 @@
+"""
+Tests — per-conversation history ring-buffer cache.
+The in-memory Supabase fake counts `messages` reads, so hits are verifiable.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_history_cache.py -v
+"""
+import uuid
+
+import pytest
+
+from app.services.history_cache import HistoryCache
+
+
+def _msg(i, role="user"):
+    return {"role": role, "content": f"m{i}"}
+
+
+@pytest.fixture
+def service(make_memory_service):
+    return make_memory_service(history=HistoryCache(max_conversations=3, capacity=8), MEMORY_WRITE_BEHIND=False)
+
+
+def _reads(service):
+    return service.client.calls[("messages", "select")]
+
+
+async def _seed(service, conversation_id, n):
+    for i in range(n):
+        await service.client.table("messages").insert({
+            "conversation_id": str(conversation_id), "role": "user" if i % 2 == 0 else "aura", "content": f"old {i}",
+        }).execute()
+
+
+# ── Tests: HistoryCache ───────────────────────────────────────────────────────
+
+def test_ring_keeps_newest_and_tracks_completeness():
+    cache = HistoryCache(capacity=3)
+    cache.start("c")
+    cache.append("c", [_msg(1), _msg(2)])
+    assert cache.get("c", 10) == [_msg(1), _msg(2)]        # complete: any n is a hit
+
+    cache.append("c", [_msg(3), _msg(4)])
+    assert cache.get("c", 3) == [_msg(2), _msg(3), _msg(4)]
+    assert cache.get("c", 4) is None                        # m1 rolled off
+
+
+def test_lru_eviction_across_conversations():
+    cache = HistoryCache(max_conversations=2, capacity=5)
+    for cid in ("a", "b"):
+        cache.start(cid)
+    cache.get("a", 1)
+    cache.start("c")
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == [] and cache.get("c", 1) == []
+
+
+def test_fill_is_dropped_if_written_during_fetch():
+    cache = HistoryCache()
+    stamp = cache.begin_fetch("c")
+    cache.append("c", [_msg(9)])                            # lands after our read started
+    cache.fill("c", stamp, [_msg(1)], complete=True)
+
+    assert cache.get("c", 1) is None
+    assert cache._fetching == {}
+
+
+# ── Tests: MemoryService ──────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_steady_state_turns_skip_the_db(service):
+    conversation_id = uuid.uuid4()
+    await _seed(service, conversation_id, 2)
+
+    assert [(m["role"], m["content"]) for m in await service.get_history(conversation_id, 30)] == [
+        ("user", "old 0"), ("assistant", "old 1"),
+    ]
+    assert _reads(service) == 1
+
+    for turn in range(3):              # 2 + 6 messages: still fits the ring
+        await service.add_interaction(conversation_id, f"q{turn}", f"a{turn}")
+        history = await service.get_history(conversation_id, 30)
+        assert [(m["role"], m["content"]) for m in history[-2:]] == [("user", f"q{turn}"), ("assistant", f"a{turn}")]
+    assert _reads(service) == 1
+
+
+@pytest.mark.asyncio
+async def test_new_conversation_never_reads(service):
+    conversation_id = await service.create_conversation()
+    assert await service.get_history(conversation_id, 30) == []
+    await service.add_interaction(conversation_id, "hi", "hello")
+
+    assert len(await service.get_history(conversation_id, 30)) == 2
+    assert _reads(service) == 0
+
+
+@pytest.mark.asyncio
+async def test_long_conversation_rehydrates_past_ring_capacity(service):
+    conversation_id = uuid.uuid4()
+    await _seed(service, conversation_id, 10)
+
+    assert len(await service.get_history(conversation_id, 4)) == 4
+    assert len(await service.get_history(conversation_id, 4)) == 4
+    assert _reads(service) == 1
+
+    # More than was hydrated, of a conversation that is not complete → DB
+    assert len(await service.get_history(conversation_id, 8)) == 8
+    assert _reads(service) == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_conversation_resets_the_ring(service):
+    conversation_id = uuid.uuid4()
+    await _seed(service, conversation_id, 2)
+    await service.get_history(conversation_id, 30)
+
+    await service.clear_conversation(conversation_id)
+    assert await service.get_history(conversation_id, 30) == []
+    assert _reads(service) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_is_not_cached(service):
+    conversation_id = await service.create_conversation()
+
+    def broken(name):
+        raise RuntimeError("supabase down")
+
+    table = service.client.table
+    service.client.table = broken
+    await service.add_interaction(conversation_id, "lost", "lost too")
+    service.client.table = table
+
+    assert await service.get_history(conversation_id, 30) == []
@@ -0,0 +1,131 @@
+"""
+Tests — BM25 index and hybrid (BM25 + vector, RRF) memory / RAG search.
+Stub embedders give every text the same vector, so anything that ranks
+above the vector order must have come from the lexical side.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_hybrid_search.py -v
+"""
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.services.lexical_index import BM25Index, rrf_fuse, tokenize
+from app.services.partitioned_index import memory_partition
+from app.services.rag_service import RAGService
+from aura_memory.testing import FakeSupabase
+from tests.conftest import StubEmbeddings
+
+FLAT = [1.0, 0.0]     # every text embeds to this vector — vector search cannot tell them apart
+
+
+def _by_insert_order(db, table):
+    """pgvector stand-in: returns the first `match_count` rows (of the searched partitions), ignoring the query."""
+    def match(params):
+        rows = db.rows(table)
+        if "partitions" in params:
+            rows = [row for row in rows if memory_partition(row.get("metadata")) in params["partitions"]]
+        return rows[:params["match_count"]]
+    return match
+
+
+@pytest.fixture
+def memory(make_memory_service):
+    svc = make_memory_service(
+        embeddings=StubEmbeddings(vector=FLAT), HYBRID_CANDIDATES=5, MEMORY_WRITE_BEHIND=False,
+    )
+    svc.client.rpcs["match_memories_partitioned"] = _by_insert_order(svc.client, "memories")
+    return svc
+
+
+FILLER = [f"The student talked about lecture notes and homework, day {i}." for i in range(30)]
+
+
+# ── Tests: tokenizer / BM25 ───────────────────────────────────────────────────
+
+def test_tokenize_splits_codes_and_bigrams_cjk():
+    assert tokenize("ASE-3012 東京大学です") == ["ase", "3012", "東京", "京大", "大学", "学で", "です"]
+    assert tokenize("猫") == ["猫"]
+
+
+def test_exact_code_ranks_first():
+    index = BM25Index()
+    index.add_many((i, text) for i, text in enumerate(FILLER))
+    index.add("hit", "Enrolled in ASE-3012 robotics lab")
+
+    assert index.search("what is ASE-3012", k=3)[0][0] == "hit"
+    assert index.search("zzz unknown") == []
+
+
+def test_japanese_terms_match_by_bigram():
+    index = BM25Index()
+    index.add("tokyo", "私は東京大学の学生です")
+    index.add("kyoto", "京都に住んでいます")
+
+    assert [key for key, _ in index.search("東京")] == ["tokyo"]
+
+
+def test_remove_and_compaction_keep_results_consistent():
+    index = BM25Index()
+    index.add_many((i, f"memory {i} about topic{i % 3}") for i in range(10))
+    for i in range(6):
+        index.remove(i)
+
+    assert len(index) == 4
+    assert {key for key, _ in index.search("topic0", k=10)} == {6, 9}
+    index.add(9, "replaced text")
+    assert {key for key, _ in index.search("topic0", k=10)} == {6}
+
+
+def test_rrf_prefers_items_ranked_by_both():
+    fused = rrf_fuse(["a", "b", "c"], ["c", "d"], limit=3)
+    assert fused[0] == "c"
+    assert set(fused) == {"a", "b", "c"}
+
+
+# ── Tests: MemoryService ──────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_memory_search_is_vector_only_until_warmed(memory):
+    await memory.store_many(FILLER + ["My student id is S-99812"])
+    assert await memory.search("S-99812", limit=2) == FILLER[:2]
+
+
+@pytest.mark.asyncio
+async def test_memory_hybrid_search_finds_exact_ids(memory, monkeypatch):
+    monkeypatch.setattr(settings, "HYBRID_SEARCH", True)
+    await memory.store_many(FILLER)
+    await memory.warm_local_index()
+    # Stored after warm-up: maintained incrementally
+    await memory.store("My student id is S-99812")
+
+    # Top of each ranking makes the cut; vector-only would return FILLER[:2]
+    results = await memory.search("what is my id S-99812", limit=2)
+    assert results == [FILLER[0], "My student id is S-99812"]
+
+
+# ── Tests: RAGService ─────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_rag_hybrid_search_tracks_ingest_and_stale_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "HYBRID_SEARCH", True)
+    monkeypatch.setattr(settings, "HYBRID_CANDIDATES", 5)
+    service = RAGService()
+    service.client = FakeSupabase()
+    service.client.rpcs["match_documents"] = _by_insert_order(service.client, "documents")
+    service.embeddings = StubEmbeddings(vector=FLAT)
+    service.text_splitter = RecursiveCharacterTextSplitter(chunk_size=80, chunk_overlap=0)
+    await service.warm_lexical_index()
+
+    path = tmp_path / "syllabus.txt"
+    path.write_text("\n\n".join(FILLER + ["Course code ASE-3012 covers robot kinematics."]))
+    await service.add_document(path, incremental=True)
+
+    results = await service.search("ASE-3012", limit=2)
+    assert results[1] == "[From syllabus.txt]:\nCourse code ASE-3012 covers robot kinematics."
+
+    path.write_text("\n\n".join(FILLER))
+    await service.add_document(path, incremental=True)
+    assert not any("ASE-3012" in doc for doc in await service.search("ASE-3012", limit=2))
+    assert len(service.lexical) == len(service.client.rows("documents"))
@@ -0,0 +1,140 @@
+"""
+Tests — background compaction of per-turn memories.
+Rows are seeded straight into the in-memory Supabase fake with hand-picked
+embeddings and timestamps.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_memory_compaction.py -v
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services.memory_compaction import MemoryCompactor
+from app.services.partitioned_index import PartitionedVectorIndex, memory_partition
+
+NOW = datetime.now(timezone.utc)
+
+
+def _ago(days: float) -> str:
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def memory(make_memory_service):
+    svc = make_memory_service(
+        MEMORY_COMPACT_BATCH=3,
+        MEMORY_COMPACT_PAUSE=0.0,
+        MEMORY_COMPACT_SIMILARITY=0.95,
+        MEMORY_RETENTION_HALF_LIFE_DAYS=30.0,
+        MEMORY_RETENTION_MIN_IMPORTANCE=0.1,
+    )
+    svc.index = PartitionedVectorIndex()
+    return svc
+
+
+async def _seed(memory, rows: list[tuple[str, list[float], dict, str]]) -> list[int]:
+    ids = []
+    for content, embedding, metadata, created_at in rows:
+        result = await memory.client.table("memories").insert(
+            {"content": content, "embedding": embedding, "metadata": metadata, "created_at": created_at}
+        ).execute()
+        row = result.data[0]
+        memory.index.add_many([memory_partition(metadata)], [row["id"]], [embedding], [content])
+        ids.append(row["id"])
+    memory.client.calls.clear()
+    return ids
+
+
+def _contents(memory) -> list[str]:
+    return [row["content"] for row in memory.client.rows("memories")]
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_near_duplicates_merge_across_batches(memory):
+    alice = {"identity": "alice"}
+    await _seed(memory, [
+        ("User: hi AURA: hello!", [1.0, 0.0, 0.0], alice, _ago(3)),
+        ("User: I like robots", [0.0, 1.0, 0.0], alice, _ago(3)),
+        ("User: bye", [0.0, 0.0, 1.0], alice, _ago(2)),
+        ("User: hello AURA: hi there", [0.99, 0.05, 0.0], alice, _ago(1)),    # next batch
+        ("User: hey AURA: hello", [0.98, 0.0, 0.05], {"identity": "bob"}, _ago(1)),
+    ])
+
+    counts = await MemoryCompactor(memory).compact()
+
+    assert counts == {"scanned": 5, "merged": 1, "expired": 0}
+    assert "User: hello AURA: hi there" not in _contents(memory)
+    keeper = memory.client.rows("memories")[0]
+    assert keeper["metadata"]["merged"] == 2
+    assert keeper["metadata"]["last_seen"] == _ago(1)
+    # Bob's greeting is in another partition: not a duplicate of Alice's
+    assert "User: hey AURA: hello" in _contents(memory)
+    assert len(memory.index) == 4
+
+
+@pytest.mark.asyncio
+async def test_retention_drops_old_one_offs_but_keeps_recurring(memory):
+    await _seed(memory, [
+        ("one-off remark", [1.0, 0.0], {"identity": "alice"}, _ago(200)),
+        ("recurring topic", [0.0, 1.0], {"identity": "alice", "merged": 40}, _ago(200)),
+        ("recent remark", [0.7, 0.7], {"identity": "alice"}, _ago(5)),
+        ("Lab opening hours", [1.0, 0.0], {"type": "document"}, _ago(400)),
+    ])
+
+    counts = await MemoryCompactor(memory).compact()
+
+    assert counts["expired"] == 1
+    assert _contents(memory) == ["recurring topic", "recent remark", "Lab opening hours"]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded(memory, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_RETENTION_MIN_IMPORTANCE", 0.0)
+    await _seed(memory, [(f"turn {i}", [1.0, float(i)], {"identity": "alice"}, _ago(1)) for i in range(7)])
+
+    compactor = MemoryCompactor(memory)
+    await compactor.compact()
+
+    assert memory.client.calls[("memories", "select")] == 3     # 3 + 3 + 1 rows, all at one created_at
+    assert compactor.stats()["passes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_the_lease_holder_compacts(memory):
+    holders = {}
+    memory.client.rpcs["try_maintenance_lease"] = (
+        lambda params: holders.setdefault(params["lease_name"], params["lease_holder"]) == params["lease_holder"]
+    )
+    await _seed(memory, [("turn", [1.0, 0.0], {"identity": "alice"}, _ago(1))])
+
+    first, second = MemoryCompactor(memory), MemoryCompactor(memory)
+    second.holder = "other-host:1"
+    assert await first.compact_if_leader() == {"scanned": 1, "merged": 0, "expired": 0}
+    assert await second.compact_if_leader() is None
+    assert second.stats()["skipped"] == 1
+
+    # Lease RPC not installed: nobody deletes anything
+    del memory.client.rpcs["try_maintenance_lease"]
+    assert await first.compact_if_leader() is None
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_per_page_and_a_lost_lease_stops_the_pass(memory):
+    grants = [True, True, False]         # taken, renewed before page 2, lost before page 3
+    calls = []
+
+    def lease(params):
+        calls.append(params["lease_holder"])
+        return grants.pop(0)
+
+    memory.client.rpcs["try_maintenance_lease"] = lease
+    await _seed(memory, [(f"turn {i}", [1.0, float(i)], {"identity": "alice"}, _ago(1)) for i in range(7)])
+
+    counts = await MemoryCompactor(memory).compact_if_leader()
+    assert len(calls) == 3
+    assert counts["scanned"] == 6        # pages 1 and 2 only
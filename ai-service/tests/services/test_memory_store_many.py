@@ -0,0 +1,73 @@
+"""
+Tests — MemoryService.store_many bulk path.
+A stub embedder and the in-memory Supabase fake stand in for the network.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_memory_store_many.py -v
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.partitioned_index import PartitionedVectorIndex
+from tests.conftest import StubEmbeddings
+
+
+@pytest.fixture
+def service(make_memory_service):
+    return make_memory_service(
+        embeddings=StubEmbeddings(delay=0.01), MEMORY_STORE_BATCH=50, MEMORY_STORE_CONCURRENCY=2,
+    )
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_batches_embeddings_and_inserts(service):
+    texts = [f"chunk {i}" for i in range(220)]
+
+    stored = await service.store_many(texts, metadata={"source": "a.pdf", "type": "document"})
+
+    rows = service.client.rows("memories")
+    assert stored == len(rows) == 220
+    assert service.embeddings.calls == 5
+    assert service.client.calls[("memories", "insert")] == 5
+    assert rows[0]["metadata"] == {"source": "a.pdf", "type": "document"}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(service):
+    await service.store_many([f"chunk {i}" for i in range(500)])
+    assert service.embeddings.max_in_flight == settings.MEMORY_STORE_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_per_item_metadata_and_blank_texts(service):
+    stored = await service.store_many(["a", "  ", "b"], metadata=[{"n": 1}, {"n": 2}, {"n": 3}])
+
+    rows = service.client.rows("memories")
+    assert stored == 2
+    assert [(r["content"], r["metadata"]["n"]) for r in rows] == [("a", 1), ("b", 3)]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_does_not_abort_the_rest(service):
+    service.embeddings.fail_calls = 1
+    stored = await service.store_many([f"chunk {i}" for i in range(120)])
+    assert stored == 70
+
+
+@pytest.mark.asyncio
+async def test_local_index_is_kept_in_sync(service):
+    service.index = PartitionedVectorIndex()
+    await service.store_many(["alpha", "beta"])
+
+    ids = [row["id"] for row in service.client.rows("memories")]
+    assert len(service.index) == 2
+    assert all(i in service.index for i in ids)
+
+
+@pytest.mark.asyncio
+async def test_disabled_service_stores_nothing(service):
+    service.client = None
+    assert await service.store_many(["a"]) == 0
@@ -0,0 +1,136 @@
+"""
+Tests — identity-partitioned memory search.
+Every text embeds to the same vector, so anything another user stored would
+tie with the caller's own memories: only partitioning keeps it out.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_partitioned_search.py -v
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.partitioned_index import (
+    SHARED, PartitionedBM25Index, PartitionedVectorIndex, memory_partition, search_partitions,
+)
+from tests.conftest import StubEmbeddings
+
+CONVERSATION = "7f1c7a4e-0000-0000-0000-000000000001"
+
+
+def _match_partitioned(db):
+    """pgvector stand-in for match_memories_partitioned (insert order, partition filter)."""
+    def match(params):
+        rows = [row for row in db.rows("memories") if memory_partition(row.get("metadata")) in params["partitions"]]
+        return rows[:params["match_count"]]
+    return match
+
+
+@pytest.fixture
+def memory(make_memory_service):
+    svc = make_memory_service(embeddings=StubEmbeddings(vector=[1.0, 0.0]), MEMORY_WRITE_BEHIND=False)
+    svc.client.rpcs["match_memories_partitioned"] = _match_partitioned(svc.client)
+    return svc
+
+
+async def _seed(memory):
+    await memory.store_many(
+        ["alice likes green tea", "alice studies robotics"],
+        {"identity": "alice", "conversation_id": CONVERSATION},
+    )
+    await memory.store_many([f"bob memory {i}" for i in range(20)], {"identity": "bob", "conversation_id": "other"})
+    await memory.store("Lab opening hours are 9 to 5", {"source": "guide.pdf", "type": "document"})
+
+
+# ── Tests: partition keys ─────────────────────────────────────────────────────
+
+def test_partition_keys():
+    assert memory_partition({"identity": "alice", "conversation_id": CONVERSATION}) == "identity:alice"
+    assert memory_partition({"identity": "anonymous", "conversation_id": CONVERSATION}) == f"conversation:{CONVERSATION}"
+    assert memory_partition({"source": "guide.pdf", "type": "document"}) == SHARED
+    assert memory_partition(None) == SHARED
+
+    assert search_partitions("alice", CONVERSATION) == ["identity:alice", f"conversation:{CONVERSATION}", SHARED]
+    assert search_partitions("anonymous") == [SHARED]
+
+
+def test_search_touches_only_named_shards():
+    index = PartitionedVectorIndex()
+    index.add_many(["identity:a", "identity:b", SHARED], ["a1", "b1", "doc"], [[1, 0], [1, 0], [0, 1]], ["A", "B", "D"])
+    assert index.partitions == 3
+    assert [key for key, _, _ in index.search(["identity:a", SHARED], [1, 0], k=5)] == ["a1", "doc"]
+
+    # Re-stored under another identity: the row moves shard
+    index.add_many(["identity:b"], ["a1"], [[1, 0]], ["A"])
+    assert len(index) == 3
+    assert [key for key, _, _ in index.search(["identity:a"], [1, 0], k=5)] == []
+
+
+def test_lexical_shards_rank_separately():
+    index = PartitionedBM25Index()
+    index.add_many(["identity:a", "identity:b"], [("a1", "student id S-1"), ("b1", "student id S-1")])
+    index.add_many([SHARED] * 3, [("d1", "lab rules"), ("d2", "student id S-1 rules"), ("d3", "student handbook")])
+    assert index.rankings(["identity:a"], "S-1") == [["a1"]]
+    # One best-first list per shard, never merged on raw BM25 scores (each shard has its own IDF)
+    assert index.rankings(["identity:a", SHARED], "student S-1") == [["a1"], ["d2", "d3"]]
+    assert index.rankings(["identity:c"], "S-1") == []
+
+
+# ── Tests: MemoryService.search ───────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_pgvector_search_is_scoped_to_identity(memory):
+    await _seed(memory)
+
+    results = await memory.search("tea", limit=5, identity="alice", conversation_id=CONVERSATION)
+    assert results == ["alice likes green tea", "alice studies robotics", "Lab opening hours are 9 to 5"]
+    assert await memory.search("tea", limit=5) == ["Lab opening hours are 9 to 5"]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_match_memories_when_partitioned_rpc_is_missing(memory):
+    class MissingFunction(Exception):
+        code = "PGRST202"
+
+    def missing(params):
+        raise MissingFunction("Could not find the function public.match_memories_partitioned")
+
+    memory.client.rpcs["match_memories_partitioned"] = missing
+    memory.client.rpcs["match_memories"] = lambda params: memory.client.rows("memories")[:params["match_count"]]
+    await _seed(memory)
+
+    for _ in range(2):
+        results = await memory.search("tea", limit=5, identity="alice", conversation_id=CONVERSATION)
+        assert results == ["alice likes green tea", "alice studies robotics"]
+    assert memory.client.calls[("rpc", "match_memories_partitioned")] == 1
+    assert memory.client.calls[("rpc", "match_memories")] == 2
+
+    # A match_memories that returns no metadata: looked up by id, not treated as shared
+    memory.client.rpcs["match_memories"] = lambda params: [
+        {key: value for key, value in row.items() if key != "metadata"}
+        for row in memory.client.rows("memories")[:params["match_count"]]
+    ]
+    results = await memory.search("tea", limit=5, identity="alice", conversation_id=CONVERSATION)
+    assert results == ["alice likes green tea", "alice studies robotics"]
+
+    def lookup_fails(name):
+        raise RuntimeError("connection reset")
+
+    memory.client.table = lookup_fails          # partition unknown: the rows are dropped
+    assert await memory.search("tea", limit=5, identity="alice", conversation_id=CONVERSATION) == []
+
+
+@pytest.mark.asyncio
+async def test_local_index_is_scoped_to_identity(memory, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_LOCAL_INDEX", True)
+    monkeypatch.setattr(settings, "HYBRID_SEARCH", True)
+    await _seed(memory)
+    await memory.warm_local_index()
+    # Stored after warm-up: routed to its shard incrementally
+    await memory.store("alice's student id is S-99812", {"identity": "alice"})
+
+    assert memory.index.partitions == 3
+    results = await memory.search("what is my id S-99812", limit=10, identity="alice")
+    assert "alice's student id is S-99812" in results
+    assert not any(text.startswith("bob") for text in results)
+    assert memory.client.calls[("rpc", "match_memories_partitioned")] == 0
@@ -0,0 +1,205 @@
+"""
+Tests — streaming RAG ingestion pipeline.
+A stub embedder and an in-memory table stand in for OpenRouter and Supabase.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_rag_ingestion.py -v
+"""
+import pytest
+from fastapi.testclient import TestClient
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.main import app
+from app.services.ingestion import IncrementalSplitter, chunk_hash, ingestion_jobs
+from app.services.rag_service import RAGService
+from aura_memory.testing import FakeSupabase
+from tests.conftest import StubEmbeddings
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_EMBED_BATCH", 10)
+    monkeypatch.setattr(settings, "RAG_EMBED_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "RAG_INSERT_BATCH", 25)
+    monkeypatch.setattr(settings, "RAG_INGEST_QUEUE_SIZE", 2)
+    service = RAGService()
+    service.client = FakeSupabase()
+    service.embeddings = StubEmbeddings(delay=0.01)
+    service.text_splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=20)
+    return service
+
+
+def _write_text(tmp_path, paragraphs=200, edited=()):
+    path = tmp_path / "notes.txt"
+    path.write_text("\n\n".join(
+        f"Paragraph {i}: " + ("EDITED " if i in edited else "") + "lorem ipsum " * 10
+        for i in range(paragraphs)
+    ))
+    return path
+
+
+def _documents(service):
+    return service.client.rows("documents")
+
+
+# ── Tests: IncrementalSplitter ────────────────────────────────────────────────
+
+def test_incremental_splitter_covers_every_page():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+    incremental = IncrementalSplitter(splitter, flush_at=300)
+    pages = [f"Page {i} " + "word " * 40 + "\n" for i in range(20)]
+
+    chunks = []
+    for page in pages:
+        chunks.extend(incremental.feed(page))
+    chunks.extend(incremental.flush())
+
+    joined = " ".join(chunks)
+    assert all(f"Page {i} " in joined for i in range(20))
+    assert all(len(c) <= 100 for c in chunks)
+
+
+def test_incremental_splitter_buffers_small_pages():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+    incremental = IncrementalSplitter(splitter, flush_at=1000)
+    assert incremental.feed("short page\n") == []
+    assert incremental.flush() == ["short page"]
+
+
+# ── Tests: pipeline ───────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_every_chunk_is_embedded_and_inserted(pipeline, tmp_path):
+    job = await pipeline.add_document(_write_text(tmp_path))
+
+    assert job.status == "done"
+    assert job.chunks > 50
+    assert job.inserted == job.chunks == len(_documents(pipeline))
+    assert _documents(pipeline)[0]["metadata"]["source"] == "notes.txt"
+    # Inserts are batched, not one call per embedding batch
+    assert pipeline.client.calls[("documents", "insert")] <= job.chunks // settings.RAG_INSERT_BATCH + 1
+
+
+@pytest.mark.asyncio
+async def test_embedding_runs_concurrently_within_bound(pipeline, tmp_path):
+    await pipeline.add_document(_write_text(tmp_path))
+    assert 1 < pipeline.embeddings.max_in_flight <= settings.RAG_EMBED_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_counted_and_ingestion_continues(pipeline, tmp_path):
+    pipeline.embeddings.fail_calls = 1
+    job = await pipeline.add_document(_write_text(tmp_path))
+
+    assert job.status == "done"
+    assert job.failed == settings.RAG_EMBED_BATCH
+    assert job.inserted == job.chunks - job.failed
+
+
+@pytest.mark.asyncio
+async def test_extraction_error_fails_the_job(pipeline, tmp_path):
+    bad = tmp_path / "broken.pdf"
+    bad.write_bytes(b"not a pdf")
+    job = await pipeline.add_document(bad)
+
+    assert job.status == "failed"
+    assert job.error
+
+
+@pytest.mark.asyncio
+async def test_unconfigured_service_fails_fast(tmp_path):
+    service = RAGService()
+    service.client = None
+    job = await service.add_document(_write_text(tmp_path))
+    assert job.status == "failed"
+
+
+# ── Tests: incremental re-indexing ────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_chunks_carry_content_hashes(pipeline, tmp_path):
+    await pipeline.add_document(_write_text(tmp_path))
+    hashes = [row["metadata"]["chunk_hash"] for row in _documents(pipeline)]
+    assert all(len(h) == 64 for h in hashes)
+    assert hashes[0] == chunk_hash(_documents(pipeline)[0]["content"])
+
+
+@pytest.mark.asyncio
+async def test_identical_reupload_embeds_nothing(pipeline, tmp_path):
+    path = _write_text(tmp_path)
+    first = await pipeline.add_document(path)
+    rows_before = len(_documents(pipeline))
+
+    second = await pipeline.add_document(path)
+
+    assert second.unchanged == first.chunks
+    assert second.embedded == second.inserted == second.deleted == 0
+    assert len(_documents(pipeline)) == rows_before
+
+
+@pytest.mark.asyncio
+async def test_edited_reupload_replaces_only_changed_chunks(pipeline, tmp_path):
+    await pipeline.add_document(_write_text(tmp_path))
+    rows_before = len(_documents(pipeline))
+
+    job = await pipeline.add_document(_write_text(tmp_path, edited={5, 150}))
+
+    assert 0 < job.inserted < job.chunks / 4
+    assert job.deleted == job.inserted
+    assert job.unchanged + job.inserted == job.chunks
+    assert len(_documents(pipeline)) == rows_before
+    contents = " ".join(row["content"] for row in _documents(pipeline))
+    assert "Paragraph 5: EDITED" in contents and "Paragraph 150: EDITED" in contents
+
+
+@pytest.mark.asyncio
+async def test_legacy_rows_without_hash_are_replaced(pipeline, tmp_path):
+    await pipeline.client.table("documents").insert(
+        [{"content": "old chunk", "embedding": [0.0], "metadata": {"source": "notes.txt"}}]
+    ).execute()
+    await pipeline.client.table("documents").insert(
+        [{"content": "other file", "embedding": [0.0], "metadata": {"source": "other.txt"}}]
+    ).execute()
+
+    job = await pipeline.add_document(_write_text(tmp_path))
+
+    assert job.deleted == 1
+    assert all(row["content"] != "old chunk" for row in _documents(pipeline))
+    assert any(row["content"] == "other file" for row in _documents(pipeline))
+
+
+@pytest.mark.asyncio
+async def test_failed_reupload_keeps_stale_rows(pipeline, tmp_path):
+    await pipeline.client.table("documents").insert(
+        [{"content": "old chunk", "embedding": [0.0], "metadata": {"source": "notes.txt"}}]
+    ).execute()
+    pipeline.embeddings.fail_calls = 1
+
+    job = await pipeline.add_document(_write_text(tmp_path))
+
+    assert job.failed > 0 and job.deleted == 0
+    assert any(row["content"] == "old chunk" for row in _documents(pipeline))
+
+
+@pytest.mark.asyncio
+async def test_full_mode_keeps_existing_rows(pipeline, tmp_path):
+    path = _write_text(tmp_path)
+    first = await pipeline.add_document(path)
+    second = await pipeline.add_document(path, incremental=False)
+
+    assert second.inserted == first.chunks
+    assert len(_documents(pipeline)) == 2 * first.chunks
+
+
+def test_job_endpoint_reports_progress():
+    job = ingestion_jobs.create("book.pdf")
+    job.chunks, job.inserted = 10, 4
+    client = TestClient(app)
+
+    body = client.get(f"/api/v1/rag/jobs/{job.id}").json()
+    assert body["source"] == "book.pdf"
+    assert (body["chunks"], body["inserted"], body["status"]) == (10, 4, "queued")
+
+    assert client.get("/api/v1/rag/jobs/missing").status_code == 404
@@ -0,0 +1,146 @@
+"""
+Parity tests — in-process VectorIndex vs brute-force cosine.
+Pure NumPy, no network or Supabase needed.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_vector_index.py -v
+"""
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _synthetic_corpus(n=6000, dim=64, clusters=40, seed=7):
+    """Clustered unit vectors — closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    data = centers[labels] + 0.35 * rng.normal(size=(n, dim))
+    return data.astype(np.float32)
+
+
+def _brute_force(data, query, k):
+    normed = data / np.linalg.norm(data, axis=1, keepdims=True)
+    q = query / np.linalg.norm(query)
+    return list(np.argsort(-(normed @ q))[:k])
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return _synthetic_corpus()
+
+
+@pytest.fixture(scope="module")
+def trained_index(corpus):
+    index = VectorIndex(nprobe=8, train_threshold=1000)
+    index.add_many(list(range(len(corpus))), corpus, [f"doc-{i}" for i in range(len(corpus))])
+    return index
+
+
+# ── Tests: exactness ──────────────────────────────────────────────────────────
+
+def test_flat_index_matches_brute_force(corpus):
+    index = VectorIndex(train_threshold=10_000)
+    index.add_many(list(range(len(corpus))), corpus)
+    assert not index.is_trained
+
+    rng = np.random.default_rng(1)
+    for query in rng.normal(size=(20, corpus.shape[1])):
+        got = [key for key, _, _ in index.search(query, 10)]
+        assert got == _brute_force(corpus, query, 10)
+
+
+def test_exhaustive_probe_matches_brute_force(trained_index, corpus):
+    assert trained_index.is_trained
+    rng = np.random.default_rng(2)
+    all_lists = len(trained_index._centroids)
+    for query in rng.normal(size=(20, corpus.shape[1])):
+        got = [key for key, _, _ in trained_index.search(query, 10, nprobe=all_lists)]
+        assert got == _brute_force(corpus, query, 10)
+
+
+def test_scores_are_cosine_similarities(trained_index, corpus):
+    query = corpus[123]
+    key, score, payload = trained_index.search(query, 1)[0]
+    assert key == 123
+    assert payload == "doc-123"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+# ── Tests: approximate recall ─────────────────────────────────────────────────
+
+def test_ivf_recall_at_10(trained_index, corpus):
+    rng = np.random.default_rng(3)
+    # Queries near the data distribution, like real user questions
+    queries = corpus[rng.choice(len(corpus), 50, replace=False)] + 0.2 * rng.normal(size=(50, corpus.shape[1]))
+
+    hits = 0
+    for query in queries:
+        approx = {key for key, _, _ in trained_index.search(query, 10)}
+        exact = {key for key, _, _ in trained_index.search_exact(query, 10)}
+        hits += len(approx & exact)
+
+    assert hits / (10 * len(queries)) >= 0.9
+
+
+# ── Tests: incremental updates ────────────────────────────────────────────────
+
+def test_add_after_training_is_searchable(trained_index, corpus):
+    vec = np.ones(corpus.shape[1], dtype=np.float32)
+    trained_index.add("fresh", vec, "fresh memory")
+    assert trained_index.search(vec, 1)[0][0] == "fresh"
+    trained_index.remove("fresh")
+
+
+@pytest.mark.asyncio
+async def test_training_on_the_loop_runs_in_background(corpus):
+    index = VectorIndex(nprobe=8, train_threshold=1000)
+    index.add_many(list(range(5000)), corpus[:5000])
+    assert not index.is_trained and index._training is not None      # add_many did not block on k-means
+
+    # Written while k-means runs on the snapshot: reassigned when the quantizer is swapped in
+    index.add_many(list(range(5000, len(corpus))), corpus[5000:])
+    index.add(0, corpus[0])
+    index.remove(1)                      # moves the last row into row 1
+    index.add(1, corpus[1])
+    assert index.search(corpus[5500], 1)[0][0] == 5500                # exact scan meanwhile
+    await index._training
+
+    assert index.is_trained and index._training is None
+    all_lists = len(index._centroids)
+    rng = np.random.default_rng(4)
+    for query in rng.normal(size=(20, corpus.shape[1])):
+        got = [key for key, _, _ in index.search(query, 10, nprobe=all_lists)]
+        assert got == _brute_force(corpus, query, 10)
+    assert index.search(corpus[5500], 1)[0][0] == 5500
+
+
+def test_remove_keeps_remaining_rows_consistent():
+    index = VectorIndex()
+    index.add_many(["a", "b", "c"], np.eye(3), ["A", "B", "C"])
+    assert index.remove("a")
+    assert not index.remove("a")
+    assert len(index) == 2
+    assert index.search([0, 0, 1], 1)[0][:1] == ("c",)
+    assert index.search([0, 1, 0], 1)[0][2] == "B"
+
+
+def test_re_adding_a_key_replaces_the_row():
+    index = VectorIndex()
+    index.add("a", [1, 0], "old")
+    index.add("a", [0, 1], "new")
+    assert len(index) == 1
+    key, score, payload = index.search([0, 1], 1)[0]
+    assert (key, payload) == ("a", "new")
+    assert score == pytest.approx(1.0)
+
+
+def test_dimension_mismatch_raises():
+    index = VectorIndex()
+    index.add("a", [1.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        index.add("b", [1.0, 0.0])
@@ -0,0 +1,261 @@
+"""
+Tests — write-behind persistence queue for messages and memories.
+A flaky in-memory Supabase fake fails requests either before or after
+applying them, to check nothing is lost or written twice.
+
+Run:
+    cd ai-service
+    pytest tests/services/test_write_behind.py -v
+"""
+import asyncio
+import uuid
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.services.brain.graph import brain
+from app.services.history_cache import HistoryCache
+from app.services.llm import llm_service
+from app.services.memory_service import memory_service
+from aura_memory.testing import FakeSupabase
+from tests.conftest import StubEmbeddings
+
+
+class FlakySupabase(FakeSupabase):
+    """`failures` is a list of "before" (request lost) / "after" (response lost)."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = []
+
+    def table(self, name):
+        query = super().table(name)
+        execute = query.execute
+
+        async def flaky():
+            if not self.failures:
+                return await execute()
+            if self.failures.pop(0) == "after":
+                await execute()
+                raise RuntimeError("timed out after commit")
+            raise RuntimeError("connection reset")
+
+        query.execute = flaky
+        return query
+
+
+@pytest.fixture(autouse=True)
+def write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_WRITE_BEHIND", True)
+
+
+@pytest.fixture
+def make_service(make_memory_service):
+    def make(batch=200, interval=60.0, retries=5, journal_dir=None):
+        return make_memory_service(
+            FlakySupabase(), StubEmbeddings(),
+            MEMORY_WRITE_BATCH=batch, MEMORY_STORE_BATCH=batch, MEMORY_WRITE_INTERVAL=interval,
+            MEMORY_WRITE_MAX_RETRIES=retries, MEMORY_WRITE_JOURNAL=str(journal_dir) if journal_dir else "",
+        )
+    return make
+
+
+async def _turn(service, conversation_id, i):
+    await service.add_interaction(conversation_id, f"q{i}", None)
+    await service.add_interaction(conversation_id, None, f"a{i}")
+
+
+def _messages(service):
+    return service.client.rows("messages")
+
+
+# ── Tests: batching ───────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_turns_coalesce_into_one_insert_and_one_touch(make_service):
+    service = make_service()
+    conversations = [uuid.uuid4() for _ in range(3)]
+    for i in range(2):
+        for cid in conversations:
+            await _turn(service, cid, i)
+    assert _messages(service) == []
+
+    await service.close()
+
+    assert service.client.calls[("messages", "upsert")] == 1
+    assert service.client.calls[("conversations", "update")] == 1
+    for cid in conversations:
+        rows = sorted((r for r in _messages(service) if r["conversation_id"] == str(cid)), key=lambda r: r["created_at"])
+        assert [(r["role"], r["content"]) for r in rows] == [("user", "q0"), ("aura", "a0"), ("user", "q1"), ("aura", "a1")]
+
+
+@pytest.mark.asyncio
+async def test_history_is_readable_before_the_flush(make_service):
+    service = make_service()
+    conversation_id = uuid.uuid4()
+    service.history.start(str(conversation_id))
+    await _turn(service, conversation_id, 0)
+
+    assert [(m["role"], m["content"]) for m in await service.get_history(conversation_id, 10)] == [
+        ("user", "q0"), ("assistant", "a0"),
+    ]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_history_miss_includes_queued_writes(make_memory_service):
+    # A one-conversation cache: reading b evicts a's ring, so a is read back while its writes are queued
+    service = make_memory_service(FlakySupabase(), StubEmbeddings(), history=HistoryCache(max_conversations=1),
+                                  MEMORY_WRITE_INTERVAL=60.0)
+    a, b = uuid.uuid4(), uuid.uuid4()
+    service.history.start(str(a))
+    await _turn(service, a, 0)
+    await service.get_history(b, 10)
+
+    expected = [("user", "q0"), ("assistant", "a0")]
+    assert [(m["role"], m["content"]) for m in await service.get_history(a, 10)] == expected
+    await service.flush_writes()
+    assert [(m["role"], m["content"]) for m in await service.get_history(a, 10)] == expected
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_threshold(make_service):
+    service = make_service(batch=4)
+    for i in range(2):
+        await _turn(service, uuid.uuid4(), i)
+    await asyncio.sleep(0.05)
+
+    assert len(_messages(service)) == 4
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_time_threshold(make_service):
+    service = make_service(interval=0.05)
+    await _turn(service, uuid.uuid4(), 0)
+    await asyncio.sleep(0.2)
+
+    assert len(_messages(service)) == 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_memories_are_embedded_and_inserted_in_one_batch(make_service):
+    service = make_service()
+    for i in range(5):
+        await service.store(f"User: q{i} \n AURA: a{i}", metadata={"conversation_id": "c"})
+    await service.close()
+
+    rows = service.client.rows("memories")
+    assert len(rows) == 5 and rows[0]["embedding"] == [float(len(rows[0]["content"])), 1.0]
+    assert service.client.calls[("memories", "upsert")] == 1
+
+
+# ── Tests: crash safety ───────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_without_loss(make_service):
+    service = make_service()
+    await _turn(service, uuid.uuid4(), 0)
+    service.client.failures = ["before"]
+
+    assert await service.message_writes.flush() == 0
+    assert len(service.message_writes) == 2
+
+    await service.close()
+    assert len(_messages(service)) == 2
+
+
+@pytest.mark.asyncio
+async def test_lost_response_does_not_duplicate_rows(make_service):
+    service = make_service()
+    await _turn(service, uuid.uuid4(), 0)
+    service.client.failures = ["after"]
+
+    await service.message_writes.flush()
+    await service.close()
+    assert len(_messages(service)) == 2
+
+
+@pytest.mark.asyncio
+async def test_poison_batch_is_dropped_after_max_retries(make_service):
+    service = make_service(retries=2)
+    await _turn(service, uuid.uuid4(), 0)
+    service.client.failures = ["before"] * 2
+
+    await service.message_writes.flush()
+    await service.message_writes.flush()
+    assert len(service.message_writes) == 0
+    assert service.message_writes.stats()["dropped"] == 2
+
+    await _turn(service, uuid.uuid4(), 1)
+    await service.close()
+    assert [r["content"] for r in _messages(service)] == ["q1", "a1"]
+
+
+@pytest.mark.asyncio
+async def test_journal_replays_writes_after_a_crash(make_service, tmp_path):
+    crashed = make_service(journal_dir=tmp_path)
+    conversation_id = uuid.uuid4()
+    await _turn(crashed, conversation_id, 0)
+    crashed.message_writes._worker.cancel()        # process dies before any flush
+    journal = tmp_path / "messages.jsonl"
+    assert len(journal.read_text().splitlines()) == 2
+
+    restarted = make_service(journal_dir=tmp_path)
+    restarted.client = crashed.client
+    assert len(restarted.message_writes) == 2
+
+    await restarted.close()
+    assert [r["content"] for r in _messages(restarted)] == ["q0", "a0"]
+    assert journal.read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_journal_replay_after_partial_flush_is_idempotent(make_service, tmp_path):
+    service = make_service(journal_dir=tmp_path)
+    await _turn(service, uuid.uuid4(), 0)
+    service.client.failures = ["after"]
+    await service.message_writes.flush()            # committed, but the journal still has it
+    service.message_writes._worker.cancel()
+
+    restarted = make_service(journal_dir=tmp_path)
+    restarted.client = service.client
+    await restarted.close()
+    assert len(_messages(restarted)) == 2
+
+
+# ── Tests: generate() ─────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_generate_writes_the_user_message_once(monkeypatch):
+    writes = []
+
+    async def add_interaction(**kwargs):
+        writes.append(kwargs)
+
+    async def nothing(*args, **kwargs):
+        return None
+
+    async def generate(messages, **kwargs):
+        return {"text": "Hi!", "emotion": "happy"}
+
+    monkeypatch.setattr(memory_service, "add_interaction", add_interaction)
+    monkeypatch.setattr(memory_service, "get_history", lambda *a: asyncio.sleep(0, result=[]))
+    monkeypatch.setattr(memory_service, "search", nothing)
+    monkeypatch.setattr(memory_service, "get_long_term_memories", nothing)
+    monkeypatch.setattr(memory_service, "store", nothing)
+    monkeypatch.setattr(llm_service, "generate", generate)
+
+    await brain.ainvoke({
+        "messages": [HumanMessage(content="hello")],
+        "emotion": "neutral",
+        "conversation_id": str(uuid.uuid4()),
+        "identity": "tester",
+    })
+    await asyncio.sleep(0)
+
+    assert [w["user_text"] for w in writes if w["user_text"]] == ["hello"]
+    assert [w["assistant_text"] for w in writes if w["assistant_text"]] == ["Hi!"]
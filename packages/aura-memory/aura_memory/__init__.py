@@ -0,0 +1,40 @@
+"""
+Shared memory access for AURA's ai-service and voice-agent.
+
+    from aura_memory import MemoryStore, create_async_client
+
+    store = MemoryStore(create_async_client(url, key), read_ttl=5.0)
+    facts = await store.get_long_term_memories("alice")
+"""
+from aura_memory.client import close_async_client, create_async_client
+from aura_memory.coalesce import Coalescer
+from aura_memory.models import (
+    Conversation,
+    CreateConversation,
+    CreateMemory,
+    CreateMesssage,
+    Memory,
+    Message,
+    UserProfile,
+)
+from aura_memory.profile import merge_facts, parse_facts, render_facts
+from aura_memory.store import MemoryStore, chat_message, message_timestamp
+
+__all__ = [
+    "Coalescer",
+    "Conversation",
+    "CreateConversation",
+    "CreateMemory",
+    "CreateMesssage",
+    "Memory",
+    "MemoryStore",
+    "Message",
+    "UserProfile",
+    "chat_message",
+    "close_async_client",
+    "create_async_client",
+    "merge_facts",
+    "message_timestamp",
+    "parse_facts",
+    "render_facts",
+]
@@ -0,0 +1,52 @@
+"""
+Pooled async Supabase client.
+
+Builds one supabase AsyncClient whose PostgREST traffic goes through a
+single httpx.AsyncClient:
+
+  • keep-alive pool bounded by max_connections / max_keepalive
+  • HTTP/2 multiplexes concurrent queries over one TLS connection
+  • `timeout` applies to connect / read / write / pool waits
+
+Creating the client does not touch the network; the pool binds to the
+running event loop on first use. Each process builds one and shares it
+between all of its services.
+"""
+from __future__ import annotations
+
+import logging
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions
+
+logger = logging.getLogger(__name__)
+
+
+def create_async_client(
+    url: str | None,
+    key: str | None,
+    *,
+    http2: bool = True,
+    max_connections: int = 20,
+    max_keepalive: int = 10,
+    timeout: float = 10.0,
+) -> AsyncClient | None:
+    """One AsyncClient over a pooled httpx client, or None without credentials."""
+    if not (url and key):
+        logger.warning("Supabase credentials not set. Database access disabled.")
+        return None
+
+    http = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+    )
+    client = AsyncClient(url, key, AsyncClientOptions(httpx_client=http, auto_refresh_token=False))
+    logger.info(f"Supabase async pool ready (http2={http2}, max_connections={max_connections})")
+    return client
+
+
+async def close_async_client(client: AsyncClient | None) -> None:
+    if client is not None and client.options.httpx_client is not None:
+        await client.options.httpx_client.aclose()
@@ -0,0 +1,89 @@
+"""
+Request coalescing for identical concurrent reads.
+
+At the start of a voice session, or when many chat turns for one user
+arrive together, the same query (long-term facts, settings rows, the
+latest messages of a conversation) is issued several times before the
+first answer comes back. Coalescer.run(key, fetch) starts `fetch` for the
+first caller only; everyone who asks for the same key while it is in
+flight awaits that one request (single-flight).
+
+With ttl > 0 a completed result is also reused for `ttl` seconds, LRU-
+bounded to `max_entries` keys. Keys are tuples; invalidate(prefix) drops
+cached results and detaches in-flight reads of every key starting with
+`prefix`, so a read that began before a write is never handed to a caller
+that arrives after it.
+
+Errors are not cached: every waiter of a failed fetch gets the exception.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer:
+    def __init__(self, ttl: float = 0.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._results: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+
+        self.fetches = 0
+        self.coalesced = 0
+        self.hits = 0
+
+    async def run(self, key: tuple, fetch: Callable[[], Awaitable[T]], cache: bool = True) -> T:
+        """`cache=False` coalesces without keeping the result (write-heavy keys)."""
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._fetch(key, fetch, cache))
+            self._inflight[key] = task
+            self.fetches += 1
+        else:
+            self.coalesced += 1
+        # One waiter being cancelled must not cancel the shared request
+        return await asyncio.shield(task)
+
+    def invalidate(self, prefix: tuple) -> None:
+        n = len(prefix)
+        for key in [k for k in self._inflight if k[:n] == prefix]:
+            del self._inflight[key]
+        for key in [k for k in self._results if k[:n] == prefix]:
+            del self._results[key]
+
+    def stats(self) -> dict:
+        return {
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "hits": self.hits,
+            "inflight": len(self._inflight),
+            "cached": len(self._results),
+        }
+
+    async def _fetch(self, key: tuple, fetch: Callable[[], Awaitable[T]], cache: bool) -> T:
+        task = asyncio.current_task()
+        try:
+            value = await fetch()
+        finally:
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+        if current and cache and self.ttl > 0:
+            self._results[key] = (time.monotonic() + self.ttl, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return value
@@ -42,3 +42,11 @@ class CreateMemory(BaseModel):
     content: str
     metadata: dict = Field(default_factory=dict)
 
+# Long-term profile (memories row with metadata.type = "user_profile")
+
+class UserProfile(BaseModel):
+    id: UUID
+    identity: str
+    version: int = 1
+    facts: list[str] = Field(default_factory=list)
+
@@ -0,0 +1,121 @@
+"""
+Consolidated long-term profile per identity.
+
+Memory extraction used to append one `user_facts` blob per session, and
+the prompt got the last N blobs joined with '---', restating the same
+facts over and over. Each identity now has one `user_profile` row: a
+bullet list of facts that every extraction is merged into.
+
+merge_facts() folds new facts into the current list:
+  • update — a fact about the same specific subject ("User's name is ...",
+    "User's favorite game is ...") replaces the old one, and so does a
+    new value of a one-value-at-a-time predicate of the user ("User lives
+    in ...", "User is N years old", "User works at ..."); the extractor can
+    also name the fact it updates: "User lives in Bandung (replaces: User
+    lives in Jakarta)"
+  • dedup — a fact whose words (mostly) repeat a known fact confirms it; the
+    more detailed wording of the two is kept
+  • order / bound — confirmed and new facts move to the end; only the
+    `max_facts` most recently confirmed facts are kept
+
+The row's metadata.version increases with every write; MemoryStore writes
+with compare-and-swap on it, so concurrent merges never lose facts.
+"""
+from __future__ import annotations
+
+import re
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+_WORD = re.compile(r"[\w']+")
+_SUBJECT = re.compile(r"^(.+?)\s+(?:is|are|was|were)\s+", re.IGNORECASE)
+_GENERIC_SUBJECTS = {"user", "the user", "they", "he", "she"}
+_SKIP_LINES = {"---", "NO_FACTS"}
+_SIMILARITY = 0.75
+_GENERIC = re.compile(r"^(?:the user|user|they|he|she)\s+", re.IGNORECASE)
+# Predicates of a generic subject that hold one value at a time → slot name
+_SLOTS = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in [
+    ("age", r"(?:is|turned) \d+(?: years? old\b|\s*\.?$)"),
+    ("home", r"(?:lives|is living|now lives|moved) (?:in|to)\b"),
+    ("employer", r"(?:works|is working) (?:at|for)\b"),
+    ("role", r"(?:works|is working) as\b"),
+    ("school", r"(?:studies|is studying|is enrolled) at\b"),
+    ("partner", r"is (?:married to|dating|engaged to)\b"),
+]]
+_REPLACES = re.compile(r"\s*\(replaces:\s*(.+?)\)\s*$", re.IGNORECASE)
+_REPLACES_SIMILARITY = 0.5
+
+
+def parse_facts(text: str) -> list[str]:
+    """One fact per non-empty line, bullets / numbering stripped."""
+    facts = []
+    for line in (text or "").splitlines():
+        if line.strip() in _SKIP_LINES:
+            continue
+        line = _BULLET.sub("", line).strip()
+        if line:
+            facts.append(line)
+    return facts
+
+
+def render_facts(facts: list[str]) -> str:
+    return "\n".join(f"- {fact}" for fact in facts)
+
+
+def _words(fact: str) -> frozenset[str]:
+    return frozenset(_WORD.findall(fact.lower()))
+
+
+def _subject(fact: str) -> str | None:
+    """What the fact is about, when only one such fact can hold: a slot of the user or a specific subject."""
+    generic = _GENERIC.match(fact)
+    if generic is not None:
+        for name, pattern in _SLOTS:
+            if pattern.match(fact, generic.end()):
+                return f"user:{name}"
+    match = _SUBJECT.match(fact)
+    if match is None:
+        return None
+    subject = match.group(1).strip().lower()
+    return None if subject in _GENERIC_SUBJECTS else subject
+
+
+def _similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _same_fact(a: frozenset[str], b: frozenset[str]) -> bool:
+    if not a or not b:
+        return False
+    return a <= b or b <= a or _similarity(a, b) >= _SIMILARITY
+
+
+def _drop_replaced(facts: list[str], replaced: str) -> None:
+    """Remove the known fact an explicit '(replaces: ...)' names, if one is close enough."""
+    target = _words(replaced)
+    scores = [_similarity(target, _words(known)) for known in facts]
+    if scores and max(scores) >= _REPLACES_SIMILARITY:
+        del facts[scores.index(max(scores))]
+
+
+def merge_facts(current: list[str], new: list[str], max_facts: int = 40) -> list[str]:
+    facts = list(current)
+    for fact in new:
+        marker = _REPLACES.search(fact)
+        if marker is not None:
+            fact = fact[:marker.start()].strip()
+            _drop_replaced(facts, marker.group(1))
+            if not fact:
+                continue
+        subject, words = _subject(fact), _words(fact)
+        for i, known in enumerate(facts):
+            known_words = _words(known)
+            if subject is not None and _subject(known) == subject:
+                del facts[i]
+                break
+            if _same_fact(words, known_words):
+                del facts[i]
+                if words < known_words:
+                    fact = known
+                break
+        facts.append(fact)
+    return facts[-max_facts:] if max_facts > 0 else facts
@@ -0,0 +1,367 @@
+"""
+MemoryStore — the async memory interface shared by ai-service and voice-agent.
+
+Both services talk to the same Supabase tables (conversations, messages,
+memories, personality_settings / api_keys). This class owns those queries
+once: every call is `await ....execute()` on the shared AsyncClient, and
+reads that several callers issue at the same time go through a Coalescer,
+so they cost one request. Long-term facts and settings rows are also
+reused for `read_ttl` seconds and invalidated by this store's own writes.
+
+Long-term facts live in one versioned profile row per identity
+(aura_memory.profile); save_long_term_memory() merges into it.
+
+Public methods log and return an empty value on failure, the way both
+services always have. fetch_history() and write_messages() raise instead,
+for callers that need to know (history cache, write-behind queue).
+
+Subclasses add service-specific behaviour (ai-service: embeddings, local
+indexes, history cache, write-behind; voice-agent: session helpers).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import NAMESPACE_URL, UUID, uuid4, uuid5
+
+from aura_memory.coalesce import Coalescer
+from aura_memory.models import Conversation, CreateConversation, CreateMemory, CreateMesssage, UserProfile
+from aura_memory.profile import merge_facts, parse_facts, render_facts
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_WRITE_ATTEMPTS = 5
+_UNIQUE_VIOLATION = "23505"
+
+_last_timestamp = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def message_timestamp() -> str:
+    """
+    Client-side created_at, strictly increasing. Rows written in one batch
+    would otherwise all get the same now() and lose their turn order.
+    """
+    global _last_timestamp
+    _last_timestamp = max(datetime.now(timezone.utc), _last_timestamp + timedelta(microseconds=1))
+    return _last_timestamp.isoformat()
+
+
+def _profile_id(identity: str) -> str:
+    """One fixed row id per identity, so two concurrent first saves cannot both create a profile."""
+    return str(uuid5(NAMESPACE_URL, f"aura:user_profile:{identity}"))
+
+
+def _chat_role(role: str) -> str:
+    return "assistant" if role == "aura" else role
+
+
+def chat_message(row: dict) -> dict:
+    """A `messages` row as a chat message, keeping the row id and created_at."""
+    return {"id": row["id"], "role": _chat_role(row["role"]), "content": row["content"], "created_at": row["created_at"]}
+
+
+class MemoryStore:
+    def __init__(self, client=None, read_ttl: float = 0.0, profile_max_facts: int = 40):
+        self.client = client
+        self.reads = Coalescer(ttl=read_ttl)
+        self.profile_max_facts = profile_max_facts
+
+    # ── Conversations ─────────────────────────────────────────────────────────
+
+    async def create_conversation(self, title: str = "New Conversation") -> UUID | None:
+        if not self.client:
+            return None
+        try:
+            result = await self.client.table("conversations").insert(
+                CreateConversation(title=title).model_dump()
+            ).execute()
+            if result.data:
+                return UUID(result.data[0]["id"])
+        except Exception as error:
+            logger.error(f"Memory Store Create Conversation Error: {error}")
+        return None
+
+    async def get_conversation(self, conversation_id: UUID) -> Conversation | None:
+        if not self.client:
+            return None
+        try:
+            result = await self.client.table("conversations") \
+                .select("*") \
+                .eq("id", str(conversation_id)) \
+                .single() \
+                .execute()
+            if result.data:
+                return Conversation(**result.data)
+        except Exception as error:
+            logger.error(f"Memory Store Get Conversation Error: {error}")
+        return None
+
+    async def get_or_create_conversation(self, identity: str, title: str = "Voice Session") -> UUID | None:
+        """Resume the conversation this identity's session pointer names, or start a new one."""
+        if not self.client:
+            return None
+        try:
+            result = await self.client.table("memories") \
+                .select("content, created_at") \
+                .eq("metadata->>type", "session_pointer") \
+                .eq("metadata->>identity", identity) \
+                .order("created_at", desc=True) \
+                .limit(1) \
+                .execute()
+
+            if result.data:
+                conversation_id = UUID(result.data[0]["content"])
+                check = await self.client.table("conversations") \
+                    .select("id") \
+                    .eq("id", str(conversation_id)) \
+                    .limit(1) \
+                    .execute()
+                if check.data:
+                    logger.info(f"Memory: Resuming conversation {conversation_id} for {identity}")
+                    return conversation_id
+                logger.warning(f"Memory: Conversation {conversation_id} missing, creating new one.")
+
+            new_id = await self.create_conversation(title=f"{title}: {identity}")
+            if not new_id:
+                return None
+            await self.client.table("memories").insert(
+                CreateMemory(
+                    content=str(new_id),
+                    metadata={"type": "session_pointer", "identity": identity},
+                ).model_dump()
+            ).execute()
+            logger.info(f"Memory: New conversation {new_id} created for {identity}")
+            return new_id
+        except Exception as error:
+            logger.error(f"Memory Store Get or Create Conversation Error: {error}")
+        return None
+
+    # ── Messages ──────────────────────────────────────────────────────────────
+
+    def message_rows(
+        self, conversation_id: UUID, user_text: str | None, assistant_text: str | None,
+        user_emotion: str = "neutral", assistant_emotion: str = "neutral",
+    ) -> list[dict]:
+        """
+        `messages` rows for one or both sides of a turn, with client-side id
+        and created_at so batched writes keep their order and replays are idempotent.
+        """
+        rows = []
+        if user_text:
+            rows.append(CreateMesssage(
+                conversation_id=conversation_id, role="user", content=user_text, emotion=user_emotion,
+            ).model_dump(mode="json"))
+        if assistant_text:
+            rows.append(CreateMesssage(
+                conversation_id=conversation_id, role="aura", content=assistant_text,
+                emotion=assistant_emotion or "neutral",
+            ).model_dump(mode="json"))
+        for row in rows:
+            row["id"] = str(uuid4())
+            row["created_at"] = message_timestamp()
+        return rows
+
+    async def write_messages(self, rows: list[dict]) -> None:
+        """One upsert for all rows, one updated_at touch for their conversations; raises on failure."""
+        if not rows:
+            return
+        await self.client.table("messages").upsert(rows, on_conflict="id", ignore_duplicates=True).execute()
+        touched = sorted({row["conversation_id"] for row in rows})
+        for conversation_id in touched:
+            self.reads.invalidate(("history", conversation_id))
+        await self.client.table("conversations").update({"updated_at": "now()"}).in_("id", touched).execute()
+
+    async def add_interaction(
+        self, conversation_id: UUID, user_text: str | None, assistant_text: str | None,
+        user_emotion: str = "neutral", assistant_emotion: str = "neutral",
+    ) -> None:
+        if not self.client:
+            return
+        try:
+            await self.write_messages(
+                self.message_rows(conversation_id, user_text, assistant_text, user_emotion, assistant_emotion)
+            )
+        except Exception as error:
+            logger.error(f"Memory Store Add Interaction Error: {error}")
+
+    async def fetch_history(self, conversation_id: UUID, n: int) -> list[dict]:
+        """
+        The latest `n` messages, oldest first, as chat messages that keep their
+        row `id` and `created_at`; raises on failure.
+        """
+        key = str(conversation_id)
+
+        async def fetch():
+            result = await self.client.table("messages") \
+                .select("id, role, content, emotion, created_at") \
+                .eq("conversation_id", key) \
+                .order("created_at", desc=True) \
+                .limit(n) \
+                .execute()
+            rows = result.data or []
+            return [chat_message(row) for row in reversed(rows)]
+
+        # Coalesced but never cached: messages change every turn
+        return list(await self.reads.run(("history", key, n), fetch, cache=False))
+
+    async def get_history(self, conversation_id: UUID, n: int = 30) -> List[dict]:
+        if not self.client or n <= 0:
+            return []
+        try:
+            return await self.fetch_history(conversation_id, n)
+        except Exception as error:
+            logger.error(f"Memory Store Get History Error: {error}")
+        return []
+
+    async def get_last_n_message(self, conversation_id: UUID, n: int) -> List[dict]:
+        if not self.client or n <= 0:
+            return []
+        try:
+            result = await self.client.table("messages") \
+                .select("id, role, content, emotion, created_at") \
+                .eq("conversation_id", str(conversation_id)) \
+                .order("created_at", desc=True) \
+                .limit(n) \
+                .execute()
+            rows = result.data or []
+            rows.reverse()
+            return rows
+        except Exception as error:
+            logger.error(f"Memory Store Get Last N Message Error: {error}")
+        return []
+
+    async def get_summary(self, conversation_id: UUID, n: int = 20) -> List[dict]:
+        return await self.get_last_n_message(conversation_id, n)
+
+    async def clear_conversation(self, conversation_id: UUID) -> bool:
+        if not self.client:
+            return False
+        key = str(conversation_id)
+        try:
+            self.reads.invalidate(("history", key))
+            await self.client.table("messages").delete().eq("conversation_id", key).execute()
+            logger.info(f"Memory Store: Conversation {conversation_id} Cleared.")
+            return True
+        except Exception as error:
+            logger.error(f"Memory Store Clear Conversation Error: {error}")
+        return False
+
+    # ── Long-term profile ─────────────────────────────────────────────────────
+
+    async def load_profile(self, identity: str) -> UserProfile | None:
+        """This identity's profile row, uncached; raises on failure."""
+        result = await self.client.table("memories") \
+            .select("id, content, metadata") \
+            .eq("metadata->>type", "user_profile") \
+            .eq("metadata->>identity", identity) \
+            .order("created_at", desc=True) \
+            .limit(1) \
+            .execute()
+        if not result.data:
+            return None
+        row = result.data[0]
+        return UserProfile(
+            id=row["id"], identity=identity,
+            version=int((row.get("metadata") or {}).get("version", 1)),
+            facts=parse_facts(row["content"]),
+        )
+
+    async def _legacy_facts(self, identity: str, limit: int) -> list[str]:
+        """Facts of the last `limit` per-session user_facts blobs (before profiles), merged oldest first."""
+        result = await self.client.table("memories") \
+            .select("content, created_at") \
+            .eq("metadata->>type", "user_facts") \
+            .eq("metadata->>identity", identity) \
+            .order("created_at", desc=True) \
+            .limit(limit) \
+            .execute()
+        facts: list[str] = []
+        for row in reversed(result.data or []):
+            facts = merge_facts(facts, parse_facts(row["content"]), self.profile_max_facts)
+        return facts
+
+    async def save_long_term_memory(self, identity: str, facts: str) -> None:
+        """
+        Merge newly extracted facts about `identity` into its profile.
+        Writes are compare-and-swap on metadata.version, and the first write
+        inserts a fixed row id (_profile_id); a lost race reloads and merges again.
+        """
+        new = parse_facts(facts or "")
+        if not self.client or not new:
+            return
+        try:
+            self.reads.invalidate(("long_term", identity))
+            for _ in range(_PROFILE_WRITE_ATTEMPTS):
+                profile = await self.load_profile(identity)
+                if profile is None:
+                    # First profile: fold in the blobs written before profiles existed
+                    merged = merge_facts(await self._legacy_facts(identity, 10), new, self.profile_max_facts)
+                    row = CreateMemory(
+                        content=render_facts(merged),
+                        metadata={"type": "user_profile", "identity": identity, "version": 1},
+                    ).model_dump()
+                    try:
+                        await self.client.table("memories").insert({"id": _profile_id(identity), **row}).execute()
+                    except Exception as error:
+                        if getattr(error, "code", None) != _UNIQUE_VIOLATION:
+                            raise
+                        continue        # another save created it first: merge into that one
+                    logger.info(f"Long-term profile created for '{identity}' ({len(merged)} facts)")
+                    return
+
+                merged = merge_facts(profile.facts, new, self.profile_max_facts)
+                version = profile.version + 1
+                result = await self.client.table("memories") \
+                    .update({
+                        "content": render_facts(merged),
+                        "metadata": {"type": "user_profile", "identity": identity, "version": version},
+                    }) \
+                    .eq("id", str(profile.id)) \
+                    .eq("metadata->>version", str(profile.version)) \
+                    .execute()
+                if result.data:
+                    logger.info(f"Long-term profile for '{identity}' updated to v{version} ({len(merged)} facts)")
+                    return
+            logger.warning(f"Long-term profile for '{identity}' not saved: too many concurrent updates")
+        except Exception as error:
+            logger.error(f"Memory Store Save Long Term Memory Error: {error}")
+        finally:
+            self.reads.invalidate(("long_term", identity))
+
+    async def get_long_term_memories(self, identity: str, limit: int = 10) -> str:
+        """
+        This identity's profile as '- fact' lines. Identities without a profile
+        yet get their last `limit` legacy user_facts blobs, merged the same way.
+        """
+        if not self.client:
+            return ""
+
+        async def fetch():
+            profile = await self.load_profile(identity)
+            facts = profile.facts if profile is not None else await self._legacy_facts(identity, limit)
+            return render_facts(facts)
+
+        try:
+            return await self.reads.run(("long_term", identity, limit), fetch)
+        except Exception as error:
+            logger.error(f"Memory Store Get Long Term Memories Error: {error}")
+        return ""
+
+    # ── Settings rows ─────────────────────────────────────────────────────────
+
+    async def get_settings_row(self, table: str, columns: str = "*") -> dict | None:
+        """Row id=1 of a single-row settings table (personality_settings, api_keys)."""
+        if not self.client:
+            return None
+
+        async def fetch():
+            result = await self.client.table(table).select(columns).eq("id", 1).single().execute()
+            return result.data or None
+
+        try:
+            row = await self.reads.run(("settings", table, columns), fetch)
+            return dict(row) if row else None
+        except Exception as error:
+            logger.error(f"Memory Store Get Settings Row Error ({table}): {error}")
+        return None
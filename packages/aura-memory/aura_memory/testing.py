@@ -0,0 +1,190 @@
+"""
+In-memory stand-in for the async Supabase client's table query builder,
+shared by the aura-memory, ai-service and voice-agent test suites.
+Covers the subset the services use: select / insert / upsert / update / delete
+with eq, gt, gte, in_, not_.is_ / not_.in_, order (chainable), range, limit and
+single, plus `metadata->>key` JSON paths.
+Inserting an existing id raises postgrest's APIError 23505, like the primary
+key would. `execute()` is a coroutine, like AsyncClient's; `latency` makes every request
+await that many seconds first.
+RPCs return whatever the test registers in `rpcs[name](params)`.
+"""
+import asyncio
+import json
+import uuid
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+
+from postgrest.exceptions import APIError
+
+_UUID_TABLES = {"conversations", "messages", "memories"}     # uuid primary keys, as in models.py; the rest are bigint
+
+
+def _field(row, column):
+    if "->>" in column:
+        # ->> yields text in Postgres: numbers / booleans compare as strings
+        base, key = column.split("->>", 1)
+        value = (row.get(base) or {}).get(key)
+        return value if value is None or isinstance(value, str) else json.dumps(value)
+    return row.get(column)
+
+
+class FakeSupabase:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables = defaultdict(list)
+        self.calls = Counter()          # (table, op) → number of executed requests
+        self._next_id = 1
+        self.rpcs = {}                  # name → callable(params) -> rows
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        async def execute():
+            self.calls[("rpc", name)] += 1
+            await asyncio.sleep(self.latency)
+            return SimpleNamespace(data=self.rpcs[name](params))
+
+        return SimpleNamespace(execute=execute)
+
+    def rows(self, name):
+        return self.tables[name]
+
+
+class _Query:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.op = "select"
+        self.payload = None
+        self.filters = []
+        self._order = []
+        self._range = None
+        self._limit = None
+        self._single = False
+        self._negate = False
+
+    def select(self, columns="*"):
+        self.op = "select"
+        return self
+
+    def insert(self, rows):
+        self.op = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False):
+        self.op = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self._conflict = (on_conflict or "id", ignore_duplicates)
+        return self
+
+    def update(self, values):
+        self.op = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, test):
+        negate, self._negate = self._negate, False
+        self.filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: _field(row, column) == value)
+
+    def is_(self, column, value):
+        expected = None if value == "null" else value
+        return self._filter(lambda row: _field(row, column) is expected)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: _field(row, column) is not None and _field(row, column) > value)
+
+    def gte(self, column, value):
+        return self._filter(lambda row: _field(row, column) is not None and _field(row, column) >= value)
+
+    def in_(self, column, values):
+        wanted = set(values)
+        return self._filter(lambda row: _field(row, column) in wanted)
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))     # chained calls add tie-breakers, as in postgrest-py
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    async def execute(self):
+        self.db.calls[(self.name, self.op)] += 1
+        await asyncio.sleep(self.db.latency)
+        table = self.db.tables[self.name]
+
+        if self.op == "insert":
+            taken = {row["id"] for row in table} & {row["id"] for row in self.payload if "id" in row}
+            if taken:
+                raise APIError({"code": "23505", "message": f'duplicate key value violates unique constraint '
+                                f'"{self.name}_pkey"', "details": f"Key (id)=({taken.pop()}) already exists."})
+            inserted = []
+            for row in self.payload:
+                row_id = str(uuid.uuid4()) if self.name in _UUID_TABLES else self.db._next_id
+                row = {"id": row_id, "created_at": f"2026-01-01T00:00:{self.db._next_id:06d}", **row}
+                self.db._next_id += 1
+                table.append(row)
+                inserted.append(row)
+            return SimpleNamespace(data=inserted)
+
+        if self.op == "upsert":
+            column, ignore = self._conflict
+            existing = {row.get(column): row for row in table}
+            written = []
+            for row in self.payload:
+                current = existing.get(row.get(column))
+                if current is None:
+                    row = {"created_at": f"2026-01-01T00:00:{self.db._next_id:06d}", **row}
+                    self.db._next_id += 1
+                    table.append(row)
+                    written.append(row)
+                elif not ignore:
+                    current.update(row)
+                    written.append(current)
+            return SimpleNamespace(data=written)
+
+        matched = [row for row in table if all(f(row) for f in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=matched)
+        if self.op == "delete":
+            self.db.tables[self.name] = [row for row in table if row not in matched]
+            return SimpleNamespace(data=matched)
+
+        for column, desc in reversed(self._order):
+            # Postgres sorts NULLs last ascending; stable sorts from the last key give a multi-column order
+            matched.sort(key=lambda row: (_field(row, column) is None, _field(row, column) or 0), reverse=desc)
+        if self._range:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._single:
+            if len(matched) != 1:
+                raise RuntimeError(f"single() matched {len(matched)} rows")
+            return SimpleNamespace(data=dict(matched[0]))
+        return SimpleNamespace(data=[dict(row) for row in matched])
@@ -0,0 +1,107 @@
+"""
+Read-coalescing benchmark — identical concurrent reads against one store.
+
+Simulates --waves bursts (a voice session starting, a batch of chat turns
+for one user) of --callers concurrent get_long_term_memories + settings
+reads for the same identity, --gap seconds apart, against the in-memory
+Supabase fake with --latency seconds per request. Three read policies:
+
+  no coalescing       every call is its own request (the old behaviour)
+  single-flight       Coalescer(ttl=0): concurrent identical calls share one
+  single-flight+ttl   Coalescer(ttl=--ttl): later waves reuse the result
+
+Reports the requests the database saw and per-call latency.
+
+Run:
+    cd packages/aura-memory
+    python benchmarks/bench_coalescing.py
+    python benchmarks/bench_coalescing.py --callers 50 --waves 10 --latency 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aura_memory import Coalescer, MemoryStore  # noqa: E402
+from aura_memory.testing import FakeSupabase  # noqa: E402
+
+
+class Passthrough(Coalescer):
+    """Coalescer API without the coalescing."""
+
+    async def run(self, key, fetch, cache=True):
+        self.fetches += 1
+        return await fetch()
+
+
+async def _seed(client: FakeSupabase) -> None:
+    latency, client.latency = client.latency, 0.0
+    for i in range(10):
+        await client.table("memories").insert({
+            "content": f"- fact {i}",
+            "metadata": {"type": "user_facts", "identity": "bench"},
+            "created_at": f"2026-01-01T00:00:{i:02d}",
+        }).execute()
+    await client.table("personality_settings").insert({"id": 1, "model": "bench/model"}).execute()
+    client.latency = latency
+    client.calls.clear()
+
+
+async def _run(store: MemoryStore, args) -> tuple[float, list[float]]:
+    await _seed(store.client)
+    latencies: list[float] = []
+
+    async def call(read):
+        start = time.perf_counter()
+        await read()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.waves):
+        await asyncio.gather(*(
+            call(read)
+            for _ in range(args.callers)
+            for read in (
+                lambda: store.get_long_term_memories("bench", limit=10),
+                lambda: store.get_settings_row("personality_settings"),
+            )
+        ))
+        await asyncio.sleep(args.gap)
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=20, help="concurrent callers per wave")
+    parser.add_argument("--waves", type=int, default=5)
+    parser.add_argument("--gap", type=float, default=0.2, help="seconds between waves")
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per database request")
+    parser.add_argument("--ttl", type=float, default=5.0, help="read cache TTL in seconds")
+    args = parser.parse_args()
+
+    calls = args.callers * args.waves * 2
+    print(f"{args.waves} waves × {args.callers} callers × 2 reads = {calls} calls, "
+          f"db latency {args.latency * 1000:.0f} ms, gap {args.gap * 1000:.0f} ms")
+    print(f"{'policy':<18} {'requests':>9} {'total':>8} {'p50':>9} {'p99':>9}")
+
+    policies = (
+        ("no coalescing", lambda: Passthrough()),
+        ("single-flight", lambda: Coalescer(ttl=0.0)),
+        ("single-flight+ttl", lambda: Coalescer(ttl=args.ttl)),
+    )
+    for name, reads in policies:
+        store = MemoryStore(FakeSupabase(latency=args.latency))
+        store.reads = reads()
+        elapsed, latencies = asyncio.run(_run(store, args))
+        latencies_ms = sorted(lat * 1000 for lat in latencies)
+        p99 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))]
+        requests = sum(store.client.calls.values())
+        print(f"{name:<18} {requests:>9d} {elapsed:7.2f}s {statistics.median(latencies_ms):7.1f}ms {p99:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
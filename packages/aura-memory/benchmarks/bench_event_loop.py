@@ -0,0 +1,162 @@
+"""
+Concurrency benchmark — event-loop responsiveness under database load.
+
+Fires --requests history reads (the get_history query) with --concurrency
+in flight, while a ticker coroutine wakes every --tick ms and records how
+late it ran. Three ways of issuing the same query are compared:
+
+  sync on loop     sync supabase client, `.execute()` inside async code
+                   (what the ai-service services used to do)
+  sync in threads  sync client via run_in_executor / asyncio.to_thread
+                   (the old voice-agent and write paths)
+  shared async     aura_memory.create_async_client(): AsyncClient over
+                   one pooled httpx.AsyncClient, `await ....execute()`
+
+A threaded HTTP server in a child process (so it does not hold our GIL)
+stands in for PostgREST and answers every request after --latency
+seconds, so no database is needed. (It speaks plain HTTP/1.1; HTTP/2
+multiplexing only kicks in over TLS.)
+
+Run:
+    cd packages/aura-memory
+    python benchmarks/bench_event_loop.py
+    python benchmarks/bench_event_loop.py --requests 500 --concurrency 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supabase import create_client  # noqa: E402
+
+from aura_memory import close_async_client, create_async_client  # noqa: E402
+
+SERVICE_KEY = "bench-service-key"
+
+_ROWS = json.dumps([
+    {"role": "user" if i % 2 == 0 else "aura", "content": f"message {i}", "emotion": "neutral",
+     "created_at": f"2026-01-01T00:00:{i:02d}"}
+    for i in range(30)
+]).encode()
+
+
+def _serve(latency: float, port) -> None:
+    class PostgREST(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real thing
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(_ROWS)))
+            self.end_headers()
+            self.wfile.write(_ROWS)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgREST)
+    server.daemon_threads = True
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def _history(client):
+    return client.table("messages") \
+        .select("role, content, emotion, created_at") \
+        .eq("conversation_id", "bench") \
+        .order("created_at", desc=True) \
+        .limit(30)
+
+
+async def _ticker(interval: float, lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(query, requests: int, concurrency: int, tick: float) -> tuple[float, list[float]]:
+    limit = asyncio.Semaphore(concurrency)
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def one():
+        async with limit:
+            await query()
+
+    ticker = asyncio.create_task(_ticker(tick, lags, stop))
+    await asyncio.sleep(tick * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return elapsed, lags
+
+
+def _report(name: str, requests: int, elapsed: float, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(f"{name:<16} {elapsed:7.2f} s  {requests / elapsed:8.1f} req/s  "
+          f"{len(lags):6d} ticks  lag p50 {statistics.median(lags_ms):7.1f} ms  "
+          f"p99 {p99:7.1f} ms  max {lags_ms[-1]:7.1f} ms")
+
+
+async def _async_mode(url: str, args) -> tuple[float, list[float]]:
+    database = create_async_client(
+        url, SERVICE_KEY, max_connections=args.concurrency, max_keepalive=args.concurrency,
+    )
+
+    async def query():
+        await _history(database).execute()
+
+    try:
+        return await _run(query, args.requests, args.concurrency, args.tick / 1000)
+    finally:
+        await close_async_client(database)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per database request")
+    parser.add_argument("--tick", type=float, default=5.0, help="ticker interval in ms")
+    args = parser.parse_args()
+
+    port = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=_serve, args=(args.latency, port), daemon=True)
+    server.start()
+    while not port.value:
+        time.sleep(0.01)
+    url = f"http://127.0.0.1:{port.value}"
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"db latency {args.latency * 1000:.0f} ms, tick {args.tick:.0f} ms")
+
+    sync_client = create_client(url, SERVICE_KEY)
+
+    async def on_loop():
+        _history(sync_client).execute()
+
+    async def in_threads():
+        await asyncio.to_thread(_history(sync_client).execute)
+
+    for name, query in (("sync on loop", on_loop), ("sync in threads", in_threads)):
+        elapsed, lags = asyncio.run(_run(query, args.requests, args.concurrency, args.tick / 1000))
+        _report(name, args.requests, elapsed, lags)
+
+    elapsed, lags = asyncio.run(_async_mode(url, args))
+    _report("shared async", args.requests, elapsed, lags)
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Prompt-size benchmark — long-term memory injected at session start.
+
+Simulates --sessions voice sessions for one returning user. Each session's
+extraction restates a few facts the user already shared, updates some
+(a new favorite game, a new job) and adds new ones, the way the extraction
+LLM tends to. Compared at the start of every session:
+
+  blobs      the old get_long_term_memories: last --limit user_facts blobs
+             joined with '---'
+  profile    the consolidated profile (merge_facts, --max-facts bound)
+
+Sizes are in characters and ≈tokens (chars / 4).
+
+Run:
+    cd packages/aura-memory
+    python benchmarks/bench_profile.py
+    python benchmarks/bench_profile.py --sessions 100 --max-facts 30
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aura_memory.profile import merge_facts, parse_facts, render_facts  # noqa: E402
+
+ATTRIBUTES = ["favorite game", "job", "favorite food", "study field", "pet's name", "home town", "favorite band"]
+VALUES = ["Elden Ring", "Rafi's Café", "robotics", "Tokyo", "Mochi", "curry", "Radwimps", "Hollow Knight",
+          "the ASE Lab", "Bandung", "ramen", "Yorushika", "Kiki", "machine learning"]
+HOBBIES = ["anime", "coding", "guitar", "chess", "hiking", "drawing", "cooking", "photography", "running",
+           "karaoke", "gardening", "calligraphy", "cycling", "baking", "origami", "swimming"]
+
+
+def _session(rng: random.Random, known: list[str]) -> str:
+    facts = rng.sample(known, min(len(known), rng.randint(2, 5)))          # restated
+    facts += [f"User's {rng.choice(ATTRIBUTES)} is {rng.choice(VALUES)}." for _ in range(rng.randint(0, 2))]
+    facts += [f"User enjoys {rng.choice(HOBBIES)} with friends." for _ in range(rng.randint(0, 2))]
+    rng.shuffle(facts)
+    known.extend(fact for fact in facts if fact not in known)
+    return "\n".join(f"- {fact}" for fact in facts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10, help="blobs read by the old query")
+    parser.add_argument("--max-facts", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    known = ["User's name is Rafi.", "User likes anime and coding."]
+    blobs: list[str] = []
+    profile: list[str] = []
+
+    print(f"{'session':>7}  {'blobs chars':>11} {'≈tok':>6}  {'profile chars':>13} {'≈tok':>6}  {'facts':>5}")
+    for session in range(1, args.sessions + 1):
+        old = "\n---\n".join(blobs[-args.limit:])
+        new = render_facts(profile)
+        if session in (1, 2, 5) or session % 10 == 0:
+            print(f"{session:>7}  {len(old):>11,d} {len(old) // 4:>6,d}  {len(new):>13,d} {len(new) // 4:>6,d}  "
+                  f"{len(profile):>5d}")
+        extracted = _session(rng, known)
+        blobs.append(extracted)
+        profile = merge_facts(profile, parse_facts(extracted), args.max_facts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Shared pytest setup for aura-memory tests."""
+import sys
+from pathlib import Path
+
+# ── Import the package from the source tree without installing it ─────────────
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,116 @@
+"""
+Tests — Coalescer (single-flight reads with an optional TTL cache).
+
+Run:
+    cd packages/aura-memory
+    pytest tests/test_coalesce.py -v
+"""
+import asyncio
+
+import pytest
+
+from aura_memory import Coalescer
+
+
+class Source:
+    def __init__(self, delay=0.01, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        n = self.calls
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("db down")
+        return f"value {n}"
+
+
+# ── Tests: single-flight ──────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_fetch():
+    reads = Coalescer()
+    source = Source()
+
+    results = await asyncio.gather(*(reads.run(("facts", "alice"), source) for _ in range(10)))
+
+    assert results == ["value 1"] * 10
+    assert source.calls == 1
+    assert reads.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_different_keys_and_later_reads_fetch_again():
+    reads = Coalescer()
+    source = Source()
+
+    await asyncio.gather(reads.run(("facts", "alice"), source), reads.run(("facts", "bob"), source))
+    assert source.calls == 2
+    assert await reads.run(("facts", "alice"), source) == "value 3"     # ttl=0: nothing kept
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_are_not_cached():
+    reads = Coalescer(ttl=60)
+    source = Source(fail=True)
+
+    results = await asyncio.gather(*(reads.run(("k",), source) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    source.fail = False
+    assert await reads.run(("k",), source) == "value 2"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_shared_read():
+    reads = Coalescer()
+    source = Source(delay=0.05)
+
+    first = asyncio.create_task(reads.run(("k",), source))
+    second = asyncio.create_task(reads.run(("k",), source))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "value 1"
+    assert source.calls == 1
+
+
+# ── Tests: TTL cache ──────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_ttl_reuses_results_until_expiry():
+    reads = Coalescer(ttl=0.05)
+    source = Source(delay=0)
+
+    assert await reads.run(("k",), source) == "value 1"
+    assert await reads.run(("k",), source) == "value 1"
+    await asyncio.sleep(0.06)
+    assert await reads.run(("k",), source) == "value 2"
+    assert reads.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_detaches_reads_that_started_before_a_write():
+    reads = Coalescer(ttl=60)
+    source = Source(delay=0.05)
+
+    stale = asyncio.create_task(reads.run(("facts", "alice", 10), source))
+    await asyncio.sleep(0.01)
+    reads.invalidate(("facts", "alice"))                  # a write lands here
+    fresh = await reads.run(("facts", "alice", 10), source)
+
+    assert await stale == "value 1" and fresh == "value 2"
+    assert await reads.run(("facts", "alice", 10), source) == "value 2"   # the fresh one is cached
+
+
+def test_cache_is_lru_bounded():
+    reads = Coalescer(ttl=60, max_entries=2)
+
+    async def fill():
+        for name in ("a", "b", "c"):
+            await reads.run((name,), Source(delay=0))
+
+    asyncio.run(fill())
+    assert list(reads._results) == [("b",), ("c",)]
@@ -0,0 +1,132 @@
+"""
+Tests — consolidated long-term profile (merge rules and versioned writes).
+
+Run:
+    cd packages/aura-memory
+    pytest tests/test_profile.py -v
+"""
+import asyncio
+
+import pytest
+
+from aura_memory import MemoryStore, merge_facts, parse_facts
+from aura_memory.testing import FakeSupabase
+
+
+def _profiles(store, identity="alice"):
+    return [
+        row for row in store.client.rows("memories")
+        if row["metadata"].get("type") == "user_profile" and row["metadata"]["identity"] == identity
+    ]
+
+
+# ── Tests: merge rules ────────────────────────────────────────────────────────
+
+def test_parse_strips_bullets_and_separators():
+    assert parse_facts("- User's name is Rafi.\n---\n2. User likes anime\n\nNO_FACTS") == [
+        "User's name is Rafi.", "User likes anime",
+    ]
+
+
+def test_restated_facts_are_deduplicated():
+    facts = merge_facts(["User likes anime and coding.", "User studies robotics."],
+                        ["User likes anime.", "User studies robotics."])
+    assert facts == ["User likes anime and coding.", "User studies robotics."]
+
+
+def test_same_subject_is_updated_and_moves_last():
+    facts = merge_facts(["User's name is Rafi.", "User likes tea."], ["User's name is Budi."])
+    assert facts == ["User likes tea.", "User's name is Budi."]
+
+
+def test_generic_subject_does_not_overwrite():
+    facts = merge_facts(["User is a student."], ["User is 20 years old."])
+    assert facts == ["User is a student.", "User is 20 years old."]
+
+
+def test_generic_subject_updates_replace_one_value_predicates():
+    assert merge_facts(["User lives in Jakarta."], ["User lives in Bandung."]) == ["User lives in Bandung."]
+    assert merge_facts(["User is 20 years old.", "User is a student."], ["User is 21 years old."]) == [
+        "User is a student.", "User is 21 years old.",
+    ]
+    assert merge_facts(["User works at Google.", "User works as an engineer."], ["User works at Tokopedia."]) == [
+        "User works as an engineer.", "User works at Tokopedia.",
+    ]
+    # Predicates that can hold many values still accumulate
+    assert merge_facts(["User has a cat.", "User likes tea."], ["User has a dog.", "User likes coffee."]) == [
+        "User has a cat.", "User likes tea.", "User has a dog.", "User likes coffee.",
+    ]
+
+
+def test_explicit_replacement_drops_the_named_fact():
+    facts = merge_facts(["User likes green tea.", "User plays chess."],
+                        ["User likes black tea. (replaces: User likes green tea.)"])
+    assert facts == ["User plays chess.", "User likes black tea."]
+
+
+def test_profile_is_bounded_to_most_recent_facts():
+    facts = merge_facts([f"User visited city {i}." for i in range(10)], ["User visited city 3.", "User has a cat."],
+                        max_facts=4)
+    assert facts == ["User visited city 8.", "User visited city 9.", "User visited city 3.", "User has a cat."]
+
+
+# ── Tests: MemoryStore ────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_sessions_merge_into_one_versioned_row():
+    store = MemoryStore(FakeSupabase())
+    await store.save_long_term_memory("alice", "- User's name is Rafi.\n- User likes anime.")
+    await store.save_long_term_memory("alice", "- User likes anime.\n- User has a cat.")
+    await store.save_long_term_memory("alice", "- User's name is Budi.")
+
+    [row] = _profiles(store)
+    assert row["metadata"]["version"] == 3
+    assert await store.get_long_term_memories("alice") == (
+        "- User likes anime.\n- User has a cat.\n- User's name is Budi."
+    )
+
+
+@pytest.mark.asyncio
+async def test_legacy_blobs_are_folded_into_the_first_profile():
+    store = MemoryStore(FakeSupabase())
+    for blob in ("- User likes tea.\n- User's name is Rafi.", "- User likes tea.\n- User plays chess."):
+        await store.client.table("memories").insert(
+            {"content": blob, "metadata": {"type": "user_facts", "identity": "alice"}}
+        ).execute()
+
+    assert await store.get_long_term_memories("alice") == (
+        "- User's name is Rafi.\n- User likes tea.\n- User plays chess."
+    )
+    await store.save_long_term_memory("alice", "- User has a cat.")
+    assert (await store.load_profile("alice")).facts == [
+        "User's name is Rafi.", "User likes tea.", "User plays chess.", "User has a cat.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_merges_do_not_lose_facts():
+    store = MemoryStore(FakeSupabase(latency=0.01))
+    await store.save_long_term_memory("alice", "- User likes tea.")
+
+    await asyncio.gather(
+        store.save_long_term_memory("alice", "- User has a cat."),
+        store.save_long_term_memory("alice", "- User plays chess."),
+    )
+
+    profile = await store.load_profile("alice")
+    assert set(profile.facts) == {"User likes tea.", "User has a cat.", "User plays chess."}
+    assert profile.version == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_saves_create_one_profile():
+    store = MemoryStore(FakeSupabase(latency=0.01))
+
+    await asyncio.gather(
+        store.save_long_term_memory("alice", "- User has a cat."),
+        store.save_long_term_memory("alice", "- User plays chess."),
+    )
+
+    [row] = _profiles(store)
+    assert row["metadata"]["version"] == 2
+    assert set(parse_facts(row["content"])) == {"User has a cat.", "User plays chess."}
@@ -0,0 +1,121 @@
+"""
+Tests — MemoryStore against the in-memory Supabase fake.
+The fake counts executed requests per (table, op), so coalesced reads are visible.
+
+Run:
+    cd packages/aura-memory
+    pytest tests/test_store.py -v
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from aura_memory import MemoryStore
+from aura_memory.testing import FakeSupabase
+
+
+@pytest.fixture
+def store():
+    return MemoryStore(FakeSupabase(latency=0.01))
+
+
+def _selects(store, table):
+    return store.client.calls[(table, "select")]
+
+
+# ── Tests: long-term facts ────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_session_start_reads_of_the_same_facts_cost_one_request(store):
+    await store.save_long_term_memory("alice", "- Likes tea")
+    await store.save_long_term_memory("bob", "- Plays chess")
+    store.client.calls.clear()
+
+    results = await asyncio.gather(*(store.get_long_term_memories("alice") for _ in range(8)))
+
+    assert results == ["- Likes tea"] * 8
+    assert _selects(store, "memories") == 1
+
+
+@pytest.mark.asyncio
+async def test_saving_facts_invalidates_cached_reads():
+    store = MemoryStore(FakeSupabase(), read_ttl=60)
+    await store.save_long_term_memory("alice", "- Likes tea")
+    store.client.calls.clear()
+    assert await store.get_long_term_memories("alice") == "- Likes tea"
+    assert await store.get_long_term_memories("alice") == "- Likes tea"
+    assert _selects(store, "memories") == 1
+
+    await store.save_long_term_memory("alice", "- Studies robotics")
+    assert await store.get_long_term_memories("alice") == "- Likes tea\n- Studies robotics"
+
+
+# ── Tests: conversations and messages ─────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_interactions_round_trip_in_order(store):
+    conversation_id = await store.create_conversation("Test")
+    await store.add_interaction(conversation_id, "hi", "hello!", assistant_emotion="happy")
+    await store.add_interaction(conversation_id, "how are you?", None)
+
+    history = await store.get_history(conversation_id, 10)
+    assert [(m["role"], m["content"]) for m in history] == [
+        ("user", "hi"), ("assistant", "hello!"), ("user", "how are you?"),
+    ]
+    rows = await store.get_last_n_message(conversation_id, 3)
+    assert [m["id"] for m in history] == [row["id"] for row in rows]      # row ids kept for the summary boundary
+    assert [row["emotion"] for row in await store.get_last_n_message(conversation_id, 2)] == ["happy", "neutral"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_history_reads_are_coalesced_and_copies(store):
+    conversation_id = await store.create_conversation()
+    await store.add_interaction(conversation_id, "hi", "hello")
+
+    first, second = await asyncio.gather(store.get_history(conversation_id, 10), store.get_history(conversation_id, 10))
+    first.append({"role": "user", "content": "mutated"})
+
+    assert len(second) == 2
+    assert _selects(store, "messages") == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_conversation(store):
+    conversation_id = await store.create_conversation()
+    await store.add_interaction(conversation_id, "hi", "hello")
+
+    assert await store.clear_conversation(conversation_id) is True
+    assert await store.get_history(conversation_id, 10) == []
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_conversation_resumes_the_session_pointer(store):
+    first = await store.get_or_create_conversation("alice")
+    assert await store.get_or_create_conversation("alice") == first
+    assert await store.get_or_create_conversation("bob") != first
+
+    store.client.tables["conversations"] = [r for r in store.client.rows("conversations") if r["id"] != str(first)]
+    assert await store.get_or_create_conversation("alice") not in (None, first)
+
+
+# ── Tests: settings rows and failure handling ─────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_settings_row(store):
+    store.client.tables["personality_settings"].append({"id": 1, "model": "test/model"})
+
+    rows = await asyncio.gather(*(store.get_settings_row("personality_settings") for _ in range(3)))
+    assert rows[0] == {"id": 1, "model": "test/model"} and rows[0] is not rows[1]
+    assert _selects(store, "personality_settings") == 1
+    assert await store.get_settings_row("api_keys") is None
+
+
+@pytest.mark.asyncio
+async def test_without_a_client_everything_is_empty():
+    store = MemoryStore(None)
+    assert await store.create_conversation() is None
+    assert await store.get_history(uuid.uuid4()) == []
+    assert await store.get_long_term_memories("alice") == ""
+    assert await store.get_settings_row("api_keys") is None
+    await store.add_interaction(uuid.uuid4(), "hi", "hello")
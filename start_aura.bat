@@ -25,6 +25,7 @@ if not exist "ai-service\venv" (
 echo Installing/Updating AI Service dependencies...
 call ai-service\venv\Scripts\activate
 pip install -r ai-service\requirements.txt
+pip install -e packages\aura-memory
 call deactivate
 
 :: Voice Agent
@@ -35,6 +36,7 @@ if not exist "voice-agent\venv" (
 echo Installing/Updating Voice Agent dependencies...
 call voice-agent\venv\Scripts\activate
 pip install -r voice-agent\requirements.txt
+pip install -e packages\aura-memory
 call deactivate
 
 echo.
@@ -29,6 +29,7 @@ fi
 echo "Installing/Updating AI Service dependencies..."
 source ai-service/venv/bin/activate || exit 1
 pip install -r ai-service/requirements.txt
+pip install -e packages/aura-memory
 deactivate
 
 # Voice Agent
@@ -39,6 +40,7 @@ fi
 echo "Installing/Updating Voice Agent dependencies..."
 source voice-agent/venv/bin/activate || exit 1
 pip install -r voice-agent/requirements.txt
+pip install -e packages/aura-memory
 deactivate
 
 echo ""
@@ -24,6 +24,8 @@ import openai as _openai_sdk  # raw AsyncOpenAI, not livekit.plugins.openai
 from vtube_controller import VTUBE
 from avatar_bridge import BRIDGE
 from memory_service import memory_service
+from fact_recall import FactRecall
+from session_bootstrap import StartupTimer, participant_info, wait_for_participant
 
 logging.basicConfig(level=logging.INFO)
 logging.getLogger("hpack").setLevel(logging.WARNING)
@@ -140,9 +142,11 @@ Focus on:
 - Any personal details they shared
 
 Rules:
-- Write each fact as a short, clear statement (e.g. "User's name is Rafi.", "User likes anime and coding.")
+- Write each fact as a short, clear statement on its own line starting with "- " (e.g. "- User's name is Rafi.", "- User likes anime and coding.")
 - Only include facts that are clearly stated or strongly implied — do NOT infer or assume
-- If no meaningful facts were shared, respond with exactly: NO_FACTS
+- You are also given what is already known about the user. Output only facts that are NEW or that CHANGE a known fact. Do not repeat known facts.
+- For a changed fact, write the updated fact in full followed by the known fact it replaces, copied exactly (e.g. "- User lives in Bandung. (replaces: User lives in Jakarta.)")
+- If no new or changed facts were shared, respond with exactly: NO_FACTS
 - Do NOT include anything about AURA's behavior or responses
 - Keep the total output under 200 words
 """
@@ -155,20 +159,10 @@ async def _fetch_personality_settings() -> dict:
         "temperature": 0.8,
         "max_tokens": 300,
     }
-    if not memory_service.client:
-        return defaults
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: memory_service.client.table("personality_settings")
-                .select("system_prompt, model, temperature, max_tokens")
-                .eq("id", 1)
-                .single()
-                .execute()
-        )
-        if result.data:
-            return {**defaults, **{k: v for k, v in result.data.items() if v is not None}}
+        row = await memory_service.get_personality_settings("system_prompt, model, temperature, max_tokens")
+        if row:
+            return {**defaults, **{k: v for k, v in row.items() if v is not None}}
     except Exception as e:
         logger.warning(f"Could not fetch personality settings: {e}")
     return defaults
@@ -181,22 +175,12 @@ async def _fetch_api_keys() -> dict:
         "deepgram_api_key": DEEPGRAM_KEY,
         "cartesia_api_key": CARTESIA_KEY,
     }
-    if not memory_service.client:
-        return defaults
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: memory_service.client.table("api_keys")
-                .select("openrouter_api_key, deepgram_api_key, cartesia_api_key")
-                .eq("id", 1)
-                .single()
-                .execute()
-        )
-        if result.data:
+        row = await memory_service.get_api_keys("openrouter_api_key, deepgram_api_key, cartesia_api_key")
+        if row:
             # Only override if DB value is non-empty
             merged = dict(defaults)
-            for k, v in result.data.items():
+            for k, v in row.items():
                 if v and v.strip():
                     merged[k] = v
             return merged
@@ -250,6 +234,26 @@ def _resolve_llm_client():
     # Ollama — no key needed, always attempted last
     return (_openai_sdk.AsyncOpenAI(api_key="ollama", base_url=f"{OLLAMA_URL}/v1"), "llama3.2")
 
+RECALL_TOP_K = int(os.getenv("RECALL_TOP_K", "5"))
+# Facts scoring below this cosine are not recalled; tune per embedding model
+RECALL_MIN_SIMILARITY = float(os.getenv("RECALL_MIN_SIMILARITY", "0.25"))
+
+def _resolve_embedder():
+    """Async texts → vectors for FactRecall, from the first available embedding provider.
+    Same provider order as the ai-service memory embeddings."""
+    if OPENAI_KEY:
+        client, model = _openai_sdk.AsyncOpenAI(api_key=OPENAI_KEY), "text-embedding-3-small"
+    elif OPENROUTER_KEY:
+        client, model = _openai_sdk.AsyncOpenAI(api_key=OPENROUTER_KEY, base_url=OPENROUTER_BASE_URL), "openai/text-embedding-3-small"
+    else:
+        client, model = _openai_sdk.AsyncOpenAI(api_key="ollama", base_url=f"{OLLAMA_URL}/v1"), "nomic-embed-text"
+
+    async def embed(texts: list[str]) -> list[list[float]]:
+        response = await client.embeddings.create(model=model, input=texts)
+        return [item.embedding for item in response.data]
+
+    return embed
+
 tts_type = os.getenv("TTS_TYPE", "qwen").lower()
 
 if tts_type == "qwen":
@@ -307,8 +311,9 @@ def prewarm(proc: agents.JobProcess):
 _EXTRACT_MAX_ATTEMPTS = 3
 _EXTRACT_BACKOFF_BASE = 2.0  # seconds
 
-async def _extract_facts_once(client, model: str, chat_text: str) -> str:
+async def _extract_facts_once(client, model: str, chat_text: str, known_facts: str = "") -> str:
     """Single attempt to call the LLM for memory extraction. Returns raw text."""
+    user_content = f"Already known about the user:\n{known_facts or 'Nothing yet.'}\n\nConversation:\n{chat_text}"
     if client is None:
         try:
             import anthropic as _anthropic_sdk
@@ -317,7 +322,7 @@ async def _extract_facts_once(client, model: str, chat_text: str) -> str:
                 model="claude-haiku-4-5-20251001",
                 max_tokens=300,
                 system=MEMORY_EXTRACTION_PROMPT,
-                messages=[{"role": "user", "content": f"Conversation:\n{chat_text}"}],
+                messages=[{"role": "user", "content": user_content}],
             )
             return response.content[0].text.strip()
         except ImportError:
@@ -328,16 +333,19 @@ async def _extract_facts_once(client, model: str, chat_text: str) -> str:
             max_tokens=300,
             messages=[
                 {"role": "system", "content": MEMORY_EXTRACTION_PROMPT},
-                {"role": "user", "content": f"Conversation:\n{chat_text}"},
+                {"role": "user", "content": user_content},
             ],
         )
         return response.choices[0].message.content.strip()
 
 
-# Extract this session message to LLM and save in memory table
+# Extract this session's new / changed facts and merge them into the user's profile
 async def extract_and_save_memory(identity: str, conversation_id):
     try:
-        messages = await memory_service.get_history(conversation_id, n=50)
+        messages, known_facts = await asyncio.gather(
+            memory_service.get_history(conversation_id, n=50),
+            memory_service.get_long_term_memories(identity=identity),
+        )
         if not messages:
             logger.info("Memory extraction: no messages to process.")
             return
@@ -352,7 +360,7 @@ async def extract_and_save_memory(identity: str, conversation_id):
         facts = None
         for attempt in range(_EXTRACT_MAX_ATTEMPTS):
             try:
-                facts = await _extract_facts_once(client, model, chat_text)
+                facts = await _extract_facts_once(client, model, chat_text, known_facts)
                 break
             except Exception as e:
                 status = getattr(e, "status_code", None)
@@ -399,21 +407,27 @@ class AURAAssistant(Agent):
         self._last_user_text       = ""
         self._last_activity_time   = asyncio.get_event_loop().time()
         self._last_aura_spoke_time = asyncio.get_event_loop().time()
+        # Per-session: fact vectors + answers cached for this user only
+        self._recall = FactRecall(
+            memory_service, _resolve_embedder(), k=RECALL_TOP_K, min_similarity=RECALL_MIN_SIMILARITY,
+        )
 
     @llm.function_tool(description="Recalls specific facts or memories about the user from the long-term knowledge base.")
     async def recall_memories(self, query: Annotated[str, "The specific topic or fact to recall about the user"] = ""):
         """Called when you need to remember something specific about the user."""
         logger.info(f"AURA is recalling memories for query: '{query}'")
-        memories = await memory_service.get_long_term_memories(identity=self._user_identity, limit=20)
-        if not memories.strip():
+        facts = await self._recall.recall(self._user_identity, query)
+        if not facts:
             return "No specific memories found for this user yet."
-        return f"Here are the memories I found:\n{memories}"
+        return "Here are the most relevant memories I found:\n" + "\n".join(f"- {fact}" for fact in facts)
 
 
     def reset_activity(self):
         self._last_activity_time = asyncio.get_event_loop().time()
 
     async def on_enter(self):
+        # Embed the user's facts while the greeting plays, so the first recall only embeds the query
+        self._recall_warmup = asyncio.create_task(self._recall.warm(self._user_identity))
         self._vtube_connected = await VTUBE.connect()
 
     async def on_exit(self):
@@ -493,72 +507,55 @@ class AURAAssistant(Agent):
 # Called When user join the room
 async def voice_session(ctx: agents.JobContext):
     logger.info(f"Voice session starting (Job assigned) for room: {ctx.room.name}")
-    await ctx.connect()
+    timer = StartupTimer()
+    await timer.time("connect", ctx.connect())
     logger.info(f"User connected: {ctx.room.name}")
+    # Runs after the session closed (and on_exit saved memory)
+    ctx.add_shutdown_callback(memory_service.aclose)
 
-    vtube_connected = await VTUBE.connect()
-    if vtube_connected:
-        logger.info("VTube Studio connected")
-
-    user_identity = "aura-user"  
-    conversation_id_str = None
+    # Identity-independent setup runs while we wait for the participant
+    settings_task = asyncio.create_task(timer.time("settings", memory_service.get_personality_settings()))
+    vad_task = asyncio.create_task(timer.time("vad", asyncio.to_thread(
+        silero.VAD.load,
+        min_silence_duration=0.4,
+        min_speech_duration=0.1,
+    )))
 
     # Wait up to 30s for the participant to join so we get the correct identity
-    for i in range(300): # 30s (0.1s steps)
-        # 1. Check Job Participant (Direct)
-        if ctx.job and getattr(ctx.job, 'participant', None):
-            user_identity = ctx.job.participant.identity or user_identity
-            if ctx.job.participant.metadata:
-                try:
-                    meta = json.loads(ctx.job.participant.metadata)
-                    conversation_id_str = meta.get("conversation_id")
-                    logger.info(f"Identity from Job Participant: {user_identity}")
-                except: pass
-            break
-        
-        # 2. Check Room Participants
-        participants = [p for p in ctx.room.remote_participants.values() if not p.identity.startswith("agent-")]
-        if participants:
-            p = participants[0]
-            user_identity = p.identity
-            if p.metadata:
-                try:
-                    meta = json.loads(p.metadata)
-                    conversation_id_str = meta.get("conversation_id")
-                    logger.info(f"Identity from Room Participant: {user_identity}")
-                except: pass
-            break
-        
-        if i % 10 == 0:
-            logger.info("Waiting for participant to join room...")
-        await asyncio.sleep(0.1)
+    job_participant = getattr(ctx.job, "participant", None) if ctx.job else None
+    vtube_connected, participant = await asyncio.gather(
+        timer.time("vtube", VTUBE.connect()),
+        timer.time("participant", wait_for_participant(ctx.room, job_participant, timeout=30.0)),
+    )
+    if vtube_connected:
+        logger.info("VTube Studio connected")
 
+    user_identity, conversation_id_str = participant_info(participant)
     logger.info(f"Resolved identity: '{user_identity}', conversation: '{conversation_id_str}'")
 
-    # 1. Fetch Dynamic Personality
-    settings = await memory_service.get_personality_settings()
-    custom_system_prompt = None
+    # Fetch personality, long-term memory and a new conversation (always new for voice) concurrently
+    settings, long_term_memory, conversation_id, vad = await asyncio.gather(
+        settings_task,
+        timer.time("memory", memory_service.get_long_term_memories(identity=user_identity, limit=10)),
+        timer.time("conversation", memory_service.create_conversation(title=f"Voice Session: {user_identity}")),
+        vad_task,
+    )
+    timer.mark("bootstrap")
+
     if settings:
-        custom_system_prompt = settings.get("system_prompt")
         logger.info(f"Loaded personality settings: model={settings.get('model')}")
 
-    # 2. Fetch Long-term Memory
-    long_term_memory = await memory_service.get_long_term_memories(identity=user_identity, limit=10)
     is_returning_user = bool(long_term_memory.strip())
-
     if is_returning_user:
         logger.info(f"Long-term memory loaded for '{user_identity}'")
     else:
         logger.info(f"No long-term memory found for {user_identity}")
 
-    # 3. Build System Prompt (Always New conversation for voice session in historical pattern)
-    conversation_id = await memory_service.create_conversation(title=f"Voice Session: {user_identity}")
     if conversation_id:
         logger.info(f"Memory: new conversation {conversation_id} for {user_identity}")
     else:
         logger.warning("Memory: Can't connect to Supabase, running without memory")
 
-    base_prompt = custom_system_prompt if custom_system_prompt else AURA_BASE_PROMPT
     # Historical version injected long term memory into the prompt builder
     system_prompt = build_system_prompt(long_term_memory)
     if is_returning_user:
@@ -608,10 +605,7 @@ async def voice_session(ctx: agents.JobContext):
         stt=stt_plugin,
         llm=llm_plugin,
         tts=TTS_PLUGIN,
-        vad=silero.VAD.load(
-            min_silence_duration=0.4,
-            min_speech_duration=0.1
-        ),
+        vad=vad,
     )
 
     async def spontaneous_pulse():
@@ -622,10 +616,10 @@ async def voice_session(ctx: agents.JobContext):
             # The previous attempt had it but it was a bit complex
             break
 
-    await session.start(
+    await timer.time("session_start", session.start(
         room=ctx.room,
         agent=agent_instance,
-    )
+    ))
 
     if vtube_connected:
         await VTUBE.set_expression("happy")
@@ -643,7 +637,7 @@ async def voice_session(ctx: agents.JobContext):
     if not _tts_ready_event.is_set():
         logger.info("Waiting for background TTS warmup to finish...")
         try:
-            await asyncio.wait_for(_tts_ready_event.wait(), timeout=60.0)
+            await timer.time("tts_warmup", asyncio.wait_for(_tts_ready_event.wait(), timeout=60.0))
         except asyncio.TimeoutError:
             logger.warning("TTS warmup timed out after 60s, proceeding anyway...")
 
@@ -651,8 +645,10 @@ async def voice_session(ctx: agents.JobContext):
         logger.info("TTS ready, generating greeting via LLM")
         try:
             await session.generate_reply(instructions=instruction)
+            timer.mark("greeting")
         except Exception as e:
             logger.warning(f"Could not deliver dynamic greeting: {e}")
+    logger.info(timer.summary())
 
     # Wait for session to finish
     try:
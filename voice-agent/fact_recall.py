@@ -0,0 +1,131 @@
+"""
+FactRecall — query-aware recall over a user's long-term profile.
+
+The recall_memories tool used to hand the LLM every stored fact, whatever
+it asked for, and the follow-up LLM call paid for all of them. Now:
+
+  1. The identity's profile facts (MemoryStore.get_long_term_memories,
+     coalesced and TTL-cached) are embedded in one batched request and
+     kept as a small per-identity index. Vectors are cached by fact text,
+     so a profile update only embeds the new facts.
+  2. The tool's query is embedded and the top `k` facts by cosine
+     similarity are returned. Facts scoring below `min_similarity` are
+     dropped, so a query that matches nothing gets no facts (an empty
+     query gets the most recently confirmed ones).
+  3. Answers are cached per (identity, profile, query) for the session.
+
+`embed` is any async callable texts → vectors (see agent._resolve_embedder).
+Without one, or after it fails once, facts are ranked by word overlap with
+the query instead, so a dead embedding endpoint costs one timeout, not one
+per tool call.
+
+Usage (agent.py):
+    recall = FactRecall(memory_service, embed, k=5, min_similarity=0.25)
+    asyncio.create_task(recall.warm(identity))     # session start
+    facts = await recall.recall(identity, query)   # in the tool
+"""
+
+import logging
+import math
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from aura_memory import MemoryStore, parse_facts
+
+logger = logging.getLogger("aura")
+
+Embedder = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _overlap(query: str, fact: str) -> float:
+    words = set(_WORD.findall(query.lower()))
+    return len(words & set(_WORD.findall(fact.lower()))) / (len(words) or 1)
+
+
+class FactRecall:
+    def __init__(
+        self, store: MemoryStore, embed: Embedder | None = None, k: int = 5,
+        min_similarity: float = 0.0, cache_size: int = 64,
+    ):
+        self.store = store
+        self.embed = embed
+        self.k = k
+        self.min_similarity = min_similarity
+        self.cache_size = cache_size
+        self._vectors: dict[str, list[float]] = {}
+        self._answers: OrderedDict[tuple, list[str]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.embedded = 0
+
+    async def warm(self, identity: str) -> None:
+        """Embed this identity's facts ahead of the first tool call (fire-and-forget)."""
+        facts = parse_facts(await self.store.get_long_term_memories(identity=identity))
+        try:
+            await self._embed_facts(facts)
+        except Exception as e:
+            logger.warning(f"Fact recall: embeddings unavailable, using word overlap: {e}")
+            self.embed = None
+
+    async def recall(self, identity: str, query: str) -> list[str]:
+        facts = parse_facts(await self.store.get_long_term_memories(identity=identity))
+        if not facts:
+            return []
+        query = " ".join(query.split())
+        if not query:
+            return facts[-self.k:]          # most recently confirmed
+
+        key = (identity, hash(tuple(facts)), query.lower())
+        cached = self._answers.get(key)
+        if cached is not None:
+            self._answers.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        scores = await self._semantic_scores(facts, query)
+        floor = self.min_similarity
+        if scores is None:
+            scores = [_overlap(query, fact) for fact in facts]
+            floor = 0.0                     # the threshold is a cosine, not a word-overlap share
+        ranked = sorted(range(len(facts)), key=lambda i: scores[i], reverse=True)[:self.k]
+        ranked = [i for i in ranked if scores[i] > 0 and scores[i] >= floor]
+        answer = [facts[i] for i in sorted(ranked)]     # keep profile order
+
+        self._answers[key] = answer
+        while len(self._answers) > self.cache_size:
+            self._answers.popitem(last=False)
+        return answer
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "embedded": self.embedded, "facts": len(self._vectors)}
+
+    async def _semantic_scores(self, facts: list[str], query: str) -> list[float] | None:
+        if self.embed is None:
+            return None
+        try:
+            await self._embed_facts(facts)
+            [query_vector] = await self.embed([query])
+        except Exception as e:
+            logger.warning(f"Fact recall: embeddings unavailable, using word overlap: {e}")
+            self.embed = None
+            return None
+        return [_cosine(query_vector, self._vectors[fact]) for fact in facts]
+
+    async def _embed_facts(self, facts: list[str]) -> None:
+        missing = [fact for fact in dict.fromkeys(facts) if fact not in self._vectors]
+        if not missing or self.embed is None:
+            return
+        vectors = await self.embed(missing)
+        self._vectors.update(zip(missing, vectors))
+        self.embedded += len(missing)
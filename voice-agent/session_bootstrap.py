@@ -0,0 +1,110 @@
+"""
+Session bootstrap — what voice_session needs before AURA can greet.
+
+voice_session used to run its startup one step at a time: poll the room for
+a participant every 100 ms, then load personality settings, then long-term
+memory, then create the conversation, and only then build STT / LLM / VAD.
+Time-to-greeting was the sum of every round-trip. Now:
+
+  1. wait_for_participant() resolves on the room's `participant_connected`
+     event (or at once if the user is already on the job / in the room)
+     instead of polling.
+  2. Work that does not need the identity (settings, VAD model load,
+     VTube connect) starts while we wait for the participant; the
+     identity-scoped calls (long-term memory, create_conversation) then
+     run concurrently with it via asyncio.gather.
+  3. StartupTimer records each stage, so one log line per session shows
+     where time-to-greeting goes.
+
+Stages overlap, so their durations add up to more than the total.
+
+Usage (agent.py):
+    timer = StartupTimer()
+    participant = await timer.time("participant", wait_for_participant(ctx.room))
+    ...
+    timer.mark("greeting")
+    logger.info(timer.summary())
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, TypeVar
+
+logger = logging.getLogger("aura")
+
+T = TypeVar("T")
+
+AGENT_PREFIX = "agent-"
+
+
+# ── Participant ───────────────────────────────────────────────────────────────
+
+def participant_info(participant, default_identity: str = "aura-user") -> tuple[str, str | None]:
+    """(identity, conversation_id from metadata) — defaults when no participant joined."""
+    if participant is None:
+        return default_identity, None
+    conversation_id = None
+    if participant.metadata:
+        try:
+            conversation_id = json.loads(participant.metadata).get("conversation_id")
+        except (ValueError, AttributeError):
+            logger.warning(f"Ignoring malformed metadata for participant '{participant.identity}'")
+    return participant.identity or default_identity, conversation_id
+
+
+async def wait_for_participant(room, job_participant=None, timeout: float = 30.0):
+    """
+    The first non-agent participant: the job's own participant if set, one
+    already in the room, or the next `participant_connected` event.
+    Returns None after `timeout` seconds.
+    """
+    if job_participant is not None:
+        return job_participant
+
+    joined = asyncio.get_running_loop().create_future()
+
+    def on_connected(participant):
+        if not participant.identity.startswith(AGENT_PREFIX) and not joined.done():
+            joined.set_result(participant)
+
+    # Subscribe before looking, so a join between the two is not missed
+    room.on("participant_connected", on_connected)
+    try:
+        for participant in room.remote_participants.values():
+            on_connected(participant)
+        if not joined.done():
+            logger.info("Waiting for participant to join room...")
+        return await asyncio.wait_for(joined, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"No participant joined within {timeout:.0f}s")
+        return None
+    finally:
+        room.off("participant_connected", on_connected)
+
+
+# ── Timing ────────────────────────────────────────────────────────────────────
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}     # name → seconds
+
+    async def time(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await and record how long it took (recorded even if it raises)."""
+        t = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = time.perf_counter() - t
+
+    def mark(self, name: str) -> float:
+        """Record time since the session started."""
+        self.stages[name] = elapsed = time.perf_counter() - self.started
+        return elapsed
+
+    def summary(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        parts = " · ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.stages.items())
+        return f"Startup {total:.0f} ms | {parts}"
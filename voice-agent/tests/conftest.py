@@ -1,5 +1,10 @@
 """Shared pytest fixtures and helpers for voice-agent tests."""
 import asyncio
+import sys
+from pathlib import Path
+
+# ── Shared memory package (installed with pip -e in the venv / Docker image) ──
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "packages" / "aura-memory"))
 
 
 async def aiter(items):
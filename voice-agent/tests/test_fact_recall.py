@@ -0,0 +1,126 @@
+"""
+Tests — FactRecall (query-aware recall_memories).
+A bag-of-words stub stands in for the embedding API; the profile lives in
+the in-memory Supabase fake.
+
+Run:
+    cd voice-agent
+    pytest tests/test_fact_recall.py -v
+"""
+import re
+
+import pytest
+
+from aura_memory import MemoryStore
+from aura_memory.testing import FakeSupabase
+from fact_recall import FactRecall
+
+VOCAB = ["name", "rafi", "cat", "mochi", "pet", "tea", "drink", "robotics", "study", "anime"]
+PROFILE = "\n".join([
+    "- User's name is Rafi.",
+    "- User has a cat named Mochi.",
+    "- User likes green tea.",
+    "- User studies robotics.",
+    "- User watches anime.",
+])
+
+
+class StubEmbeddings:
+    """Counts requests; 'pet' / 'drink' map onto cat / tea so recall is not just word overlap."""
+
+    def __init__(self, fail=False):
+        self.requests = 0
+        self.texts = 0
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.requests += 1
+        self.texts += len(texts)
+        if self.fail:
+            raise RuntimeError("embedding endpoint down")
+        synonyms = {"pet": "cat", "drink": "tea"}
+        vectors = []
+        for text in texts:
+            words = [synonyms.get(w, w) for w in re.findall(r"[a-z]+", text.lower())]
+            vectors.append([float(words.count(v)) for v in VOCAB])
+        return vectors
+
+
+class FixedEmbeddings:
+    """Fixed vectors: the query sits at cosine 0.8 to the tea fact and 0.6 to the cat fact."""
+
+    VECTORS = {
+        "User's name is Rafi.": [0.0, 0.0, 1.0],
+        "User has a cat named Mochi.": [1.0, 0.0, 0.0],
+        "User likes green tea.": [0.0, 1.0, 0.0],
+        "User studies robotics.": [0.0, 0.0, -1.0],
+        "User watches anime.": [-1.0, 0.0, 0.0],
+        "something to sip": [0.6, 0.8, 0.0],
+    }
+
+    async def __call__(self, texts):
+        return [self.VECTORS[text] for text in texts]
+
+
+@pytest.fixture
+async def store():
+    store = MemoryStore(FakeSupabase(), read_ttl=60)
+    await store.save_long_term_memory("alice", PROFILE)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_returns_top_k_relevant_facts(store):
+    recall = FactRecall(store, StubEmbeddings(), k=2)
+    assert await recall.recall("alice", "what pet do I have") == ["User has a cat named Mochi."]
+    assert await recall.recall("alice", "favorite drink?") == ["User likes green tea."]
+    # Nothing related: no facts, rather than unrelated ones
+    assert await recall.recall("alice", "weather") == []
+
+
+@pytest.mark.asyncio
+async def test_min_similarity_drops_weak_matches(store):
+    assert await FactRecall(store, FixedEmbeddings(), k=2).recall("alice", "something to sip") == [
+        "User has a cat named Mochi.", "User likes green tea.",
+    ]
+    assert await FactRecall(store, FixedEmbeddings(), k=2, min_similarity=0.7).recall("alice", "something to sip") == [
+        "User likes green tea.",
+    ]
+    # Nothing clears the threshold: nothing is recalled
+    assert await FactRecall(store, FixedEmbeddings(), k=2, min_similarity=0.9).recall("alice", "something to sip") == []
+
+
+@pytest.mark.asyncio
+async def test_facts_embedded_once_and_answers_cached(store):
+    embed = StubEmbeddings()
+    recall = FactRecall(store, embed, k=2)
+    await recall.warm("alice")
+    assert (embed.requests, embed.texts) == (1, 5)
+
+    first = await recall.recall("alice", "what pet do I have")
+    again = await recall.recall("alice", "What  pet do I have")
+    assert first == again
+    assert (embed.requests, embed.texts) == (2, 6)      # one query embed, no re-embedding of facts
+    assert recall.stats()["hits"] == 1
+
+    # A profile update embeds only the new fact
+    await store.save_long_term_memory("alice", "- User plays chess.")
+    await recall.recall("alice", "what pet do I have")
+    assert embed.texts == 8
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_word_overlap_once_embeddings_fail(store):
+    embed = StubEmbeddings(fail=True)
+    recall = FactRecall(store, embed, k=1)
+
+    assert await recall.recall("alice", "robotics study") == ["User studies robotics."]
+    assert await recall.recall("alice", "anime") == ["User watches anime."]
+    assert embed.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_and_empty_query(store):
+    recall = FactRecall(store, StubEmbeddings(), k=2)
+    assert await recall.recall("bob", "anything") == []
+    assert await recall.recall("alice", "") == ["User studies robotics.", "User watches anime."]
@@ -0,0 +1,64 @@
+"""
+Tests — voice-agent MemoryService on the shared aura_memory store.
+Runs against the in-memory Supabase fake; no database needed.
+
+Run:
+    cd voice-agent
+    pytest tests/test_memory_service.py -v
+"""
+import asyncio
+
+import pytest
+
+from aura_memory.testing import FakeSupabase
+from memory_service import MemoryService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("MEMORY_READ_TTL", "5")
+    svc = MemoryService()
+    svc.client = FakeSupabase(latency=0.02)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_session_start_reads_cost_one_request_each(service):
+    await service.save_long_term_memory("alice", "- likes tea")
+    await service.client.table("personality_settings").insert({"id": 1, "model": "test/model"}).execute()
+    service.client.calls.clear()
+
+    facts = await asyncio.gather(*(service.get_long_term_memories("alice", limit=10) for _ in range(5)))
+    rows = await asyncio.gather(*(service.get_personality_settings() for _ in range(5)))
+
+    assert set(facts) == {"- likes tea"}
+    assert all(row["model"] == "test/model" for row in rows)
+    assert service.client.calls[("memories", "select")] == 1
+    assert service.client.calls[("personality_settings", "select")] == 1
+
+
+@pytest.mark.asyncio
+async def test_saving_facts_invalidates_cached_read(service):
+    await service.save_long_term_memory("alice", "- likes tea")
+    assert await service.get_long_term_memories("alice") == "- likes tea"
+
+    await service.save_long_term_memory("alice", "- has a cat")
+    assert await service.get_long_term_memories("alice") == "- likes tea\n- has a cat"
+
+
+@pytest.mark.asyncio
+async def test_missing_settings_row_returns_none(service):
+    assert await service.get_api_keys("openrouter_api_key") is None
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_the_pool_and_replaces_the_client(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_SERVICE_KEY", "service-key")
+    service = MemoryService()
+    http = service.client.options.httpx_client
+
+    await service.aclose()
+
+    assert http.is_closed
+    assert service.client.options.httpx_client is not http
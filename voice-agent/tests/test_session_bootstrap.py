@@ -0,0 +1,89 @@
+"""
+Tests — session bootstrap (event-driven participant wait, startup timing).
+
+Run:
+    cd voice-agent
+    pytest tests/test_session_bootstrap.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from session_bootstrap import StartupTimer, participant_info, wait_for_participant
+
+
+class FakeRoom:
+    """The slice of rtc.Room the bootstrap uses: remote_participants + on/off."""
+
+    def __init__(self, *participants):
+        self.remote_participants = {p.identity: p for p in participants}
+        self.handlers = {}
+
+    def on(self, event, callback):
+        self.handlers.setdefault(event, []).append(callback)
+
+    def off(self, event, callback):
+        self.handlers[event].remove(callback)
+
+    def join(self, participant):
+        self.remote_participants[participant.identity] = participant
+        for callback in list(self.handlers.get("participant_connected", [])):
+            callback(participant)
+
+
+def _participant(identity, metadata=""):
+    return SimpleNamespace(identity=identity, metadata=metadata)
+
+
+# ── Tests: participant wait ───────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_resolves_on_participant_connected_event():
+    room = FakeRoom(_participant("agent-123"))
+    waiter = asyncio.create_task(wait_for_participant(room))
+    await asyncio.sleep(0.01)
+
+    room.join(_participant("agent-456"))
+    room.join(_participant("alice", '{"conversation_id": "c-1"}'))
+    participant = await asyncio.wait_for(waiter, 1.0)
+
+    assert participant_info(participant) == ("alice", "c-1")
+    assert room.handlers["participant_connected"] == []      # unsubscribed
+
+
+@pytest.mark.asyncio
+async def test_participant_already_present_or_on_job():
+    alice = _participant("alice")
+    assert await wait_for_participant(FakeRoom(alice)) is alice
+
+    bob = _participant("bob")
+    assert await wait_for_participant(FakeRoom(alice), job_participant=bob) is bob
+
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back_to_default_identity():
+    room = FakeRoom()
+    participant = await wait_for_participant(room, timeout=0.05)
+
+    assert participant is None
+    assert participant_info(participant) == ("aura-user", None)
+    assert participant_info(_participant("alice", "not json")) == ("alice", None)
+    assert room.handlers["participant_connected"] == []
+
+
+# ── Tests: timing ─────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_concurrent_stages_overlap_in_timer():
+    timer = StartupTimer()
+    await asyncio.gather(
+        timer.time("settings", asyncio.sleep(0.05)),
+        timer.time("memory", asyncio.sleep(0.05)),
+        timer.time("conversation", asyncio.sleep(0.05)),
+    )
+    total = timer.mark("bootstrap")
+
+    assert set(timer.stages) == {"settings", "memory", "conversation", "bootstrap"}
+    assert total < 0.12          # sequential would be ≥ 0.15
+    assert timer.summary().startswith("Startup ")